@@ -0,0 +1,286 @@
+"""
+Materialized per-pubkey covenant totals and access levels.
+
+A login only needs ``in_total``/``out_total`` for one pubkey, but computing
+them means sweeping every covenant in the wallet. ``AccessTable`` runs that
+sweep once per chain tip, for all pubkeys at once, in a background thread:
+
+* the table is rebuilt whenever ``ChainTipWatcher`` reports a new tip (or the
+  app calls ``invalidate`` after changing the wallet itself)
+* ``lookup`` is a dictionary read; pubkeys that appear in no covenant get zero
+  totals, exactly what a live scan would return
+* once the chain moves past the installed table's tip, that table keeps
+  serving for up to ``max_lag`` seconds, counted from the first tip change
+  after it rather than the latest one; after that (or while the tip is
+  unknown) ``lookup`` returns None and callers fall back to a live scan. A
+  sweep that finishes after the tip moved on is still installed, so a chain
+  that moves faster than one sweep never leaves the table unusable
+* after ``invalidate`` the table is known to be wrong, so it does not serve
+  at all until rebuilt
+* with Redis, the finished table is shared so other gunicorn workers can adopt
+  it for the same tip instead of sweeping the wallet again, and ``invalidate``
+  bumps a shared generation counter (part of the table key) so every worker
+  stops serving its table, not just the one that changed the wallet
+"""
+
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Any, Callable, Dict, Mapping, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+Totals = Tuple[Decimal, Decimal]
+# (local invalidate() count, shared Redis counter or None without Redis)
+Generation = Tuple[int, Optional[int]]
+
+SHARED_TABLE_TTL = 24 * 3600
+_LEFT_AT_SIZE = 64
+
+
+def access_level_for(in_total: Decimal, out_total: Decimal) -> str:
+    """The login rule: ``full`` once a pubkey has sent out at least what it put in."""
+    ratio = (out_total / in_total) if in_total > 0 else 0
+    return "full" if ratio >= 1 else "limited"
+
+
+@dataclass(frozen=True)
+class AccessEntry:
+    in_total: Decimal
+    out_total: Decimal
+
+    @property
+    def access_level(self) -> str:
+        return access_level_for(self.in_total, self.out_total)
+
+
+_EMPTY = AccessEntry(Decimal(0), Decimal(0))
+
+
+class AccessTable:
+    """
+    Per-pubkey ``(in_total, out_total)`` rebuilt in the background on tip changes.
+
+    Args:
+        scan: Wallet sweep returning ``{pubkey_hex_lower: (in_total, out_total)}``
+        watcher: ``ChainTipWatcher`` (anything with ``current`` and ``subscribe``)
+        redis_client: Optional Redis client for sharing tables between workers
+        max_lag: Seconds the previous tip's table may keep serving after a tip change
+        retry_interval: Seconds between attempts while a rebuild keeps failing
+        prefix: Redis key prefix
+    """
+
+    def __init__(
+        self,
+        scan: Callable[[], Mapping[str, Totals]],
+        watcher: Any,
+        redis_client: Any = None,
+        max_lag: float = 30.0,
+        retry_interval: float = 5.0,
+        prefix: str = "hodlxxi:access:",
+    ):
+        self.scan = scan
+        self.watcher = watcher
+        self.max_lag = max_lag
+        self.retry_interval = retry_interval
+        self.prefix = prefix
+        self._redis = redis_client
+        self._entries: Dict[str, AccessEntry] = {}
+        self._tip: Optional[str] = None
+        self._dirty = False
+        self._dirty_local = False  # invalidated, but the shared counter could not be bumped
+        self._generation = 0  # bumped by invalidate()
+        self._built_generation: Generation = (0, None)  # generation the installed table was swept at
+        self._left_at: "OrderedDict[str, float]" = OrderedDict()  # tip -> when the chain last moved off it
+        self._built_at = 0.0
+        self._build_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.refreshes = 0
+        self.shared_loads = 0
+        self.errors = 0
+        self.hits = 0
+        self.misses = 0
+        self.last_duration: Optional[float] = None
+        watcher.subscribe(self._on_tip_change)
+
+    def _on_tip_change(self, old: Optional[str], new: str) -> None:
+        if old is not None:
+            self._left_at[old] = time.monotonic()
+            self._left_at.move_to_end(old)
+            while len(self._left_at) > _LEFT_AT_SIZE:
+                self._left_at.popitem(last=False)
+        self._wakeup.set()
+
+    @property
+    def ready(self) -> bool:
+        """True if ``lookup`` will answer from the table right now."""
+        current = self.watcher.current
+        if current is None or self._tip is None:
+            return False
+        local, shared = self._built_generation
+        if local != self._generation:
+            return False  # invalidated: the wallet changed under this table
+        latest = self._shared_generation()
+        if latest is not None and latest != shared:
+            # Another worker invalidated; rebuild here too
+            self._dirty = True
+            self._wakeup.set()
+            return False
+        if current == self._tip and not self._dirty:
+            return True
+        left_at = self._left_at.get(self._tip)
+        return left_at is not None and time.monotonic() - left_at <= self.max_lag
+
+    def lookup(self, pubkey_hex: str) -> Optional[AccessEntry]:
+        """Totals for ``pubkey_hex``, or None if the table cannot answer (caller scans live)."""
+        if not self.ready:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return self._entries.get(pubkey_hex.lower(), _EMPTY)
+
+    def refresh(self) -> bool:
+        """
+        Rebuild the table for the current tip (single-flight).
+
+        Returns:
+            True if a table for the current tip is in place afterwards.
+        """
+        with self._build_lock:
+            tip = self.watcher.current
+            if tip is None:
+                return False
+            if tip == self._tip and not self._dirty:
+                return True
+            # Read before sweeping: a shared table at this generation was swept after any invalidate()
+            generation = (self._generation, self._shared_generation())
+            if not self._dirty_local and self._load_shared(tip, generation):
+                return True
+
+            self._dirty = self._dirty_local = False  # a wallet change during the sweep sets them again
+            start = time.monotonic()
+            try:
+                totals = self.scan()
+            except Exception as e:
+                self.errors += 1
+                self._dirty = self._dirty or tip == self._tip
+                logger.warning(f"Access table refresh failed: {e}")
+                return False
+            entries = {pk.lower(): AccessEntry(Decimal(i), Decimal(o)) for pk, (i, o) in totals.items()}
+            self.last_duration = round(time.monotonic() - start, 3)
+
+            # Installed even if the chain moved during the sweep: it is newer than the table it replaces,
+            # and max_lag then runs from when its own tip was left
+            self._install(tip, entries, generation)
+            self.refreshes += 1
+            if self.watcher.current != tip:
+                self._wakeup.set()
+                return False
+            self._store_shared(tip, entries, generation)
+            return True
+
+    def invalidate(self) -> None:
+        """Rebuild after the app changed the wallet (e.g. imported a covenant) without a tip change."""
+        self._dirty = True
+        self._generation += 1
+        self._dirty_local = not self._bump_shared_generation()
+        self._wakeup.set()
+
+    def _install(self, tip: str, entries: Dict[str, AccessEntry], generation: Generation) -> None:
+        self._entries = entries
+        self._tip = tip
+        self._built_generation = generation
+        self._built_at = time.monotonic()
+
+    def start(self) -> None:
+        """Start the background rebuild thread (idempotent)."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._wakeup.set()  # the watcher may have seen its first tip before we subscribed
+        self._thread = threading.Thread(target=self._run, name="access-table", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._wakeup.set()
+
+    def _run(self) -> None:
+        pending = False
+        while not self._stop.is_set():
+            # Without a new tip nothing would wake us again, so failed rebuilds retry on a timer
+            self._wakeup.wait(self.retry_interval if pending else None)
+            self._wakeup.clear()
+            if self._stop.is_set():
+                break
+            pending = not self.refresh()
+
+    def stats(self) -> Dict[str, Any]:
+        """State for the metrics endpoint."""
+        return {
+            "pubkeys": len(self._entries),
+            "tip": self._tip,
+            "dirty": self._dirty,
+            "ready": self.ready,
+            "refreshes": self.refreshes,
+            "shared_loads": self.shared_loads,
+            "errors": self.errors,
+            "hits": self.hits,
+            "misses": self.misses,
+            "last_refresh_seconds": self.last_duration,
+            "age_seconds": round(time.monotonic() - self._built_at, 3) if self._built_at else None,
+            "shared": self._redis is not None,
+        }
+
+    def _shared_generation(self) -> Optional[int]:
+        if self._redis is None:
+            return None
+        try:
+            return int(self._redis.get(self.prefix + "generation") or 0)
+        except Exception as e:
+            logger.debug(f"Access table redis generation read failed: {e}")
+            return None
+
+    def _bump_shared_generation(self) -> bool:
+        if self._redis is None:
+            return False
+        try:
+            self._redis.incr(self.prefix + "generation")
+            return True
+        except Exception as e:
+            logger.warning(f"Access table invalidation not shared with other workers: {e}")
+            return False
+
+    def _load_shared(self, tip: str, generation: Generation) -> bool:
+        if self._redis is None or generation[1] is None:
+            return False
+        try:
+            raw = self._redis.get(f"{self.prefix}table:{generation[1]}")
+            if raw is None:
+                return False
+            data = json.loads(raw)
+        except Exception as e:
+            logger.debug(f"Access table redis get failed: {e}")
+            return False
+        if data.get("tip") != tip:
+            return False
+        entries = {pk: AccessEntry(Decimal(i), Decimal(o)) for pk, (i, o) in data.get("entries", {}).items()}
+        self._install(tip, entries, generation)
+        self._dirty = False  # a table at this generation was swept after every invalidate() so far
+        self.shared_loads += 1
+        return True
+
+    def _store_shared(self, tip: str, entries: Dict[str, AccessEntry], generation: Generation) -> None:
+        if self._redis is None or generation[1] is None:
+            return
+        payload = {"tip": tip, "entries": {pk: [str(e.in_total), str(e.out_total)] for pk, e in entries.items()}}
+        try:
+            self._redis.set(f"{self.prefix}table:{generation[1]}", json.dumps(payload), ex=SHARED_TABLE_TTL)
+        except Exception as e:
+            logger.debug(f"Access table redis set failed: {e}")
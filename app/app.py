@@ -10,20 +10,66 @@ from datetime import datetime, timedelta, timezone
 from decimal import Decimal
 from functools import wraps
 from hashlib import sha256
-from io import BytesIO
 from logging.handlers import RotatingFileHandler
 from typing import Dict, List, Optional, Set, Tuple
 
 import base58
-import qrcode
-import requests
+from access_table import AccessTable, access_level_for
 from audit_logger import get_audit_logger, init_audit_logger
-from bech32 import bech32_decode, bech32_encode, convertbits
-from bitcoinrpc.authproxy import AuthServiceProxy
+from bip32 import XpubDeriver, add_checksum
+from bech32_codec import Bech32Error, decode_bytes, encode_lnurl, hex_to_npub, npub_to_hex
+from bech32_codec import stats as bech32_codec_stats
+from chain_watcher import ChainTipWatcher, RPCTipSource, TipCache, ZMQWakeup
 from config import get_config
-from flask import Flask, abort, g, jsonify, redirect, render_template_string, request, send_file, session, url_for
+from covenant_index import CovenantIndex
+from covenant_listing import (
+    CARD_FIELDS,
+    FIELD_GROUPS,
+    ListingError,
+    covenant_id,
+    paginate,
+    parse_fields,
+    parse_ids,
+    parse_limit,
+    script_from_id,
+)
+from covenant import mask_descriptor, parse_covenant
+from covenant import stats as covenant_parser_stats
+from cpu_offload import CPUOffload
+from flask import (
+    Flask,
+    abort,
+    g,
+    jsonify,
+    redirect,
+    render_template_string,
+    request,
+    send_file,
+    session,
+    stream_with_context,
+    url_for,
+)
 from flask_socketio import SocketIO, emit
+from message_verify import SignerIndex, verify_message
+from ndjson_stream import NDJSON_MIMETYPE, StreamError, covenant_card_events, ndjson_lines, stream_requested
+from price_feed import PriceFeed, sources_from_spec
+from qr_cache import QRCache, QRTokenError, parse_qr_token, qr_key, sign_qr_token
+from qr_render import decode_qr_payload, render_qr
+from rpc_cache import ScriptCache, redis_client_from_url
+from rpc_client import (
+    CircuitBreaker,
+    RPCUnavailable,
+    current_rpc_deadline,
+    get_pool_stats,
+    get_rpc_client,
+    reset_rpc_deadline,
+    set_rpc_deadline,
+)
+from rpc_executor import DeadlineExceeded, RPCExecutor, deadline_after
+from script_decoder import decode_script
 from storage import get_storage, init_storage
+from utxo_service import UTXOService
+from wallet_index import GroupingsIndex, LabelIndex, indexed_label
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
@@ -227,11 +273,19 @@ def health_check():
             "chat_history_size": len(CHAT_HISTORY),
         }
 
-        # Try to ping RPC (optional)
+        # RPC status comes from the circuit breaker and the chain-tip watcher; probes never hit the node
         try:
             rpc = get_rpc_connection()
-            rpc.getblockchaininfo()
-            health_status["rpc"] = "connected"
+            breaker_state = rpc.breaker.state if rpc.breaker else CircuitBreaker.CLOSED
+            health_status["rpc_circuit"] = breaker_state
+            if breaker_state == CircuitBreaker.OPEN:
+                health_status["rpc"] = "error"
+                health_status["rpc_error"] = "circuit open"
+            elif CHAIN_WATCHER.current is None:
+                health_status["rpc"] = "error"
+                health_status["rpc_error"] = "no recent chain tip update"
+            else:
+                health_status["rpc"] = "connected"
         except Exception as e:
             health_status["rpc"] = "error"
             health_status["rpc_error"] = str(e)
@@ -255,6 +309,19 @@ def metrics():
             "active_challenges": len(ACTIVE_CHALLENGES),
             "lnurl_sessions": len(LNURL_SESSIONS),
         }
+        metrics_data.update(get_pool_stats())
+        metrics_data["rpc_script_cache"] = RPC_SCRIPT_CACHE.stats()
+        metrics_data["covenant_index"] = COVENANT_INDEX.stats()
+        metrics_data["chain_tip"] = CHAIN_WATCHER.stats()
+        metrics_data["balance_cache"] = BALANCE_CACHE.stats()
+        metrics_data["rpc_executor"] = RPC_EXECUTOR.stats()
+        metrics_data["xpub_deriver"] = XPUB_DERIVER.stats()
+        metrics_data["access_table"] = ACCESS_TABLE.stats()
+        metrics_data["btc_price"] = BTC_PRICE_FEED.stats()
+        metrics_data["qr_cache"] = QR_CACHE.stats()
+        metrics_data["cpu_offload"] = CPU_OFFLOAD.stats()
+        metrics_data["bech32_codec"] = bech32_codec_stats()
+        metrics_data["covenant_parser"] = covenant_parser_stats()
         return jsonify(metrics_data), 200
     except Exception as e:
         logger.error(f"Metrics endpoint failed: {e}", exc_info=True)
@@ -301,15 +368,6 @@ def turn_credentials():
     )
 
 
-def extract_script_from_any_descriptor(descriptor: str) -> str | None:
-    """
-    Find the innermost raw(<HEX>) no matter how it's wrapped:
-    raw(...), wsh(raw(...)), sh(wsh(raw(...))), etc.
-    """
-    m = re.search(r"raw\(([0-9A-Fa-f]+)\)", descriptor)
-    return m.group(1) if m else None
-
-
 def classify_presence(pubkey: str | None, access_level: str | None) -> str:
     """
     Decide chip color role for a user:
@@ -432,47 +490,83 @@ from decimal import Decimal
 
 def get_save_and_check_balances_for_pubkey(pubkey_hex: str) -> tuple[Decimal, Decimal]:
     """
-    For every raw(...) descriptor in the wallet:
+    Tip-cached wrapper around _scan_balances_for_pubkey(): the wallet is only
+    rescanned when a new block or mempool transaction arrives.
+    """
+    in_total, out_total, neutral_cards = BALANCE_CACHE.get_or_compute(
+        ("pubkey_balances", pubkey_hex.lower()), lambda: _scan_balances_for_pubkey(pubkey_hex)
+    )
+
+    # Expose neutral cards to the current request (no API change)
+    try:
+        g.neutral_cards = list(neutral_cards)
+    except Exception:
+        pass
+
+    return in_total, out_total
+
+
+def _covenant_balances() -> list[dict]:
+    """
+    One sweep over every raw(...) descriptor in the wallet:
       - decode it,
-      - get its address (segwit → p2sh → deriveaddresses fallback),
-      - list unspent on that address,
-      - sum those UTXOs into in_total if pubkey in OP_IF, out_total if pubkey in OP_ELSE.
-    Also collects "neutral" (non-matching) contracts into g.neutral_cards for display.
+      - get its address (segwit → p2sh → deriveaddresses fallback, run alongside the UTXO fetch),
+      - sum the unspent outputs on that address into ``balance``.
+
+    Each step is a single JSON-RPC batch, so the number of round trips does not
+    grow with the number of descriptors in the wallet.
     """
     rpc_conn = get_rpc_connection()
-    in_total = Decimal(0)
-    out_total = Decimal(0)
-    neutral_cards: list[dict] = []
 
-    for desc_item in rpc_conn.listdescriptors().get("descriptors", []):
-        raw_desc = desc_item["desc"]
+    # The covenant index tolerates wrappers like wsh(raw(...)) and only decodes scripts it hasn't seen
+    COVENANT_INDEX.sync(rpc_conn)
+    covenants = [
+        {
+            "desc": entry.descriptor,
+            "op_if": entry.op_if_pub,
+            "op_else": entry.op_else_pub,
+            # Address: segwit -> p2sh -> derive from descriptor
+            "addr": entry.segwit_address or entry.p2sh_address,
+        }
+        for entry in COVENANT_INDEX.entries()
+    ]
 
-        # tolerate wrappers like wsh(raw(...))
-        script = extract_script_from_any_descriptor(raw_desc)
-        if not script:
-            continue
+    missing = [c for c in covenants if not c["addr"]]
+    utxo_service = get_utxo_service(rpc_conn)
 
-        decoded = rpc_conn.decodescript(script)
-        asm = decoded.get("asm", "")
-        op_if = extract_pubkey_from_op_if(asm)
-        op_else = extract_pubkey_from_op_else(asm)
+    def _derive_missing():
+        infos = rpc_conn.batch([("getdescriptorinfo", [c["desc"]]) for c in missing], return_exceptions=True)
+        derivable = [(c, info["descriptor"]) for c, info in zip(missing, infos) if isinstance(info, dict)]
+        derived = rpc_conn.batch([("deriveaddresses", [d]) for _, d in derivable], return_exceptions=True)
+        for (cov, _), addrs in zip(derivable, derived):
+            if isinstance(addrs, list) and addrs:
+                cov["addr"] = addrs[0]
 
-        # Address: segwit -> p2sh -> derive from descriptor
-        addr = (decoded.get("segwit") or {}).get("address")
-        if not addr:
-            addr = (decoded.get("p2sh") or {}).get("address")
-        if not addr:
-            try:
-                info = rpc_conn.getdescriptorinfo(raw_desc)
-                addrs = rpc_conn.deriveaddresses(info["descriptor"])
-                addr = addrs[0] if addrs else None
-            except Exception:
-                addr = None
-        if not addr:
-            continue
+    # Known addresses' UTXOs are fetched while the missing ones are still being derived
+    tasks = [lambda: utxo_service.prefetch(c["addr"] for c in covenants if c["addr"])]
+    if missing:
+        tasks.append(_derive_missing)
+    rpc_fanout(tasks, rpc_conn)
+
+    covenants = [c for c in covenants if c["addr"]]
+    utxo_service.prefetch(c["addr"] for c in covenants)
+    for cov in covenants:
+        cov["balance"] = utxo_service.balance(cov["addr"])
+    return covenants
 
-        utxos = rpc_conn.listunspent(0, 9_999_999, [addr])
-        sum_btc = sum(Decimal(u["amount"]) for u in utxos)
+
+def _scan_balances_for_pubkey(pubkey_hex: str) -> tuple[Decimal, Decimal, tuple]:
+    """
+    Sum covenant balances into in_total if pubkey is in OP_IF, out_total if it is in OP_ELSE.
+    Also collects "neutral" (non-matching) contracts for display.
+    """
+    in_total = Decimal(0)
+    out_total = Decimal(0)
+    neutral_cards: list[dict] = []
+
+    for cov in _covenant_balances():
+        sum_btc = cov["balance"]
+        op_if, op_else = cov["op_if"], cov["op_else"]
 
         matched = False
         if op_if and op_if.lower() == pubkey_hex.lower():
@@ -486,19 +580,38 @@ def get_save_and_check_balances_for_pubkey(pubkey_hex: str) -> tuple[Decimal, De
         if not matched and sum_btc > 0:
             neutral_cards.append(
                 {
-                    "addr": addr,
+                    "addr": cov["addr"],
                     "amount_btc": f"{sum_btc:.8f}",
-                    "desc": mask_raw_descriptor(raw_desc),
+                    "desc": mask_raw_descriptor(cov["desc"]),
                 }
             )
 
-    # Expose neutral cards to the current request (no API change)
-    try:
-        g.neutral_cards = neutral_cards
-    except Exception:
-        pass
+    return in_total, out_total, tuple(neutral_cards)
 
-    return in_total, out_total
+
+def _scan_access_totals() -> dict[str, tuple[Decimal, Decimal]]:
+    """(in_total, out_total) for every covenant pubkey, from a single wallet sweep (same rules as above)."""
+    totals: dict[str, list[Decimal]] = {}
+    for cov in _covenant_balances():
+        op_if = (cov["op_if"] or "").lower()
+        op_else = (cov["op_else"] or "").lower()
+        if op_if:
+            totals.setdefault(op_if, [Decimal(0), Decimal(0)])[0] += cov["balance"]
+        if op_else and op_else != op_if:
+            totals.setdefault(op_else, [Decimal(0), Decimal(0)])[1] += cov["balance"]
+    return {pk: (t[0], t[1]) for pk, t in totals.items()}
+
+
+def get_access_totals(pubkey_hex: str) -> tuple[Decimal, Decimal, str]:
+    """
+    (in_total, out_total, access_level) for a login: a lookup in the materialized
+    access table, or a live scan while the table is not ready.
+    """
+    entry = ACCESS_TABLE.lookup(pubkey_hex)
+    if entry is not None:
+        return entry.in_total, entry.out_total, entry.access_level
+    in_total, out_total = get_save_and_check_balances_for_pubkey(pubkey_hex)
+    return in_total, out_total, access_level_for(in_total, out_total)
 
 
 def require_full_access():
@@ -509,17 +622,154 @@ def require_full_access():
 
 import os
 
-from bitcoinrpc.authproxy import AuthServiceProxy
+RPC_POOL_SIZE = int(os.getenv("RPC_POOL_SIZE", "10"))
+RPC_TIMEOUT = float(os.getenv("RPC_TIMEOUT", "60"))
+
+# decodescript/getdescriptorinfo results depend only on their input; share them across requests (and workers via Redis)
+RPC_SCRIPT_CACHE = ScriptCache(
+    maxsize=int(os.getenv("RPC_CACHE_SIZE", "4096")),
+    redis_client=redis_client_from_url(os.getenv("RPC_CACHE_REDIS_URL")),
+    redis_ttl=int(os.getenv("RPC_CACHE_REDIS_TTL", str(7 * 24 * 3600))),
+)
+
+# Independent RPC calls that cannot share a batch run concurrently, at most
+# RPC_NODE_CONCURRENCY at a time per node and within RPC_REQUEST_DEADLINE seconds
+RPC_EXECUTOR = RPCExecutor(
+    max_workers=int(os.getenv("RPC_FANOUT_WORKERS", "16")),
+    per_node_limit=int(os.getenv("RPC_NODE_CONCURRENCY", "4")),
+)
+RPC_REQUEST_DEADLINE = float(os.getenv("RPC_REQUEST_DEADLINE", "30"))
+
+# CPU-bound work (QR rendering, signature checks) runs on native threads so the gevent hub keeps serving sockets
+CPU_OFFLOAD = CPUOffload(
+    max_workers=int(os.getenv("CPU_OFFLOAD_WORKERS", "4")),
+    max_queue=int(os.getenv("CPU_OFFLOAD_MAX_QUEUE", "64")),
+)
 
 
 def get_rpc_connection():
+    """Return the process-wide pooled RPC client for the configured wallet."""
     rpc_user = os.getenv("RPC_USER", "hodlwatch")
     rpc_pass = os.getenv("RPC_PASSWORD", "")  # <— use RPC_PASSWORD consistently
     rpc_host = os.getenv("RPC_HOST", "127.0.0.1")
     rpc_port = os.getenv("RPC_PORT", "8332")
     rpc_wallet = os.getenv("RPC_WALLET", "")
-    url = f"http://{rpc_user}:{rpc_pass}@{rpc_host}:{rpc_port}/wallet/{rpc_wallet}"
-    return AuthServiceProxy(url, timeout=60)
+    return get_rpc_client(
+        rpc_host,
+        int(rpc_port),
+        rpc_user,
+        rpc_pass,
+        rpc_wallet,
+        pool_size=RPC_POOL_SIZE,
+        timeout=RPC_TIMEOUT,
+        cache=RPC_SCRIPT_CACHE,
+        breaker_factory=_rpc_breaker,
+    )
+
+
+def _rpc_breaker() -> CircuitBreaker:
+    return CircuitBreaker(
+        window=int(os.getenv("RPC_BREAKER_WINDOW", "20")),
+        min_calls=int(os.getenv("RPC_BREAKER_MIN_CALLS", "5")),
+        failure_threshold=float(os.getenv("RPC_BREAKER_FAILURE_RATE", "0.5")),
+        slow_call_seconds=float(os.getenv("RPC_BREAKER_SLOW_CALL_SECONDS", "5")),
+        slow_call_threshold=float(os.getenv("RPC_BREAKER_SLOW_CALL_RATE", "0.8")),
+        reset_timeout=float(os.getenv("RPC_BREAKER_RESET_TIMEOUT", "15")),
+    )
+
+
+@app.before_request
+def _start_rpc_deadline():
+    # Every RPC made while serving this request (fan-out workers included) shares one deadline
+    g.rpc_deadline_token = set_rpc_deadline(deadline_after(RPC_REQUEST_DEADLINE))
+
+
+@app.teardown_request
+def _clear_rpc_deadline(exc=None):
+    token = g.pop("rpc_deadline_token", None)
+    if token is not None:
+        try:
+            reset_rpc_deadline(token)
+        except ValueError:  # token created in another context
+            set_rpc_deadline(None)
+
+
+def rpc_unavailable_payload(e):
+    """Body of the 503 for RPCUnavailable or DeadlineExceeded (streamed listings send it in-band)."""
+    if isinstance(e, DeadlineExceeded):
+        # Raised by RPC_EXECUTOR when fan-out work misses the request deadline; same answer as the client's own
+        e = RPCUnavailable(str(e), reason="deadline_exceeded")
+    retry_after = max(1, int(e.retry_after))
+    return {"error": "bitcoin_rpc_unavailable", "reason": e.reason, "message": e.message, "retry_after": retry_after}
+
+
+@app.errorhandler(RPCUnavailable)
+@app.errorhandler(DeadlineExceeded)
+def _rpc_unavailable(e):
+    payload = rpc_unavailable_payload(e)
+    resp = jsonify(payload)
+    resp.status_code = 503
+    resp.headers["Retry-After"] = str(payload["retry_after"])
+    return resp
+
+
+def rpc_deadline() -> float:
+    """Absolute RPC deadline for the current request (or a fresh one outside requests)."""
+    return current_rpc_deadline() or deadline_after(RPC_REQUEST_DEADLINE)
+
+
+def rpc_fanout(tasks, rpc=None, return_exceptions=False):
+    """Run independent RPC-bound callables concurrently under the node limit and request deadline."""
+    node = getattr(rpc, "url", None)
+    return RPC_EXECUTOR.run(tasks, node=node, deadline=rpc_deadline(), return_exceptions=return_exceptions)
+
+
+def get_utxo_service(rpc=None) -> UTXOService:
+    """Per-request bulk UTXO view; every caller in the request shares one listunspent fetch."""
+    try:
+        svc = g.get("utxo_service")
+        if svc is None:
+            svc = g.utxo_service = UTXOService(rpc or get_rpc_connection())
+        return svc
+    except RuntimeError:  # outside a request context
+        return UTXOService(rpc or get_rpc_connection())
+
+
+def get_wallet_indexes(rpc=None) -> tuple[GroupingsIndex, LabelIndex]:
+    """
+    Address/label indexes built from one listlabels + listaddressgroupings batch,
+    cached until the chain tip moves (or the app changes labels).
+    """
+
+    def _build():
+        labels, groupings = (rpc or get_rpc_connection()).batch([("listlabels", []), ("listaddressgroupings", [])])
+        groupings_index = GroupingsIndex(groupings)
+        return groupings_index, LabelIndex(labels, groupings_index)
+
+    return BALANCE_CACHE.get_or_compute("wallet_indexes", _build)
+
+
+# Balance/UTXO results are cached until the best block moves (or, opted in, the debounced mempool summary)
+CHAIN_TIP_MEMPOOL = _as_bool(os.getenv("CHAIN_TIP_MEMPOOL"), default=False)
+CHAIN_WATCHER = ChainTipWatcher(
+    RPCTipSource(
+        get_rpc_connection,
+        include_mempool=CHAIN_TIP_MEMPOOL,
+        mempool_interval=float(os.getenv("CHAIN_TIP_MEMPOOL_INTERVAL", "30")),
+    ),
+    interval=float(os.getenv("CHAIN_POLL_INTERVAL", "2")),
+    zmq_endpoint=os.getenv("BITCOIN_ZMQ_URL") or None,
+    zmq_topics=ZMQWakeup.TOPICS if CHAIN_TIP_MEMPOOL else ZMQWakeup.BLOCK_TOPICS,
+)
+BALANCE_CACHE = TipCache(CHAIN_WATCHER, maxsize=int(os.getenv("BALANCE_CACHE_SIZE", "1024")))
+
+# Per-pubkey in/out totals for logins, rebuilt in the background on every tip change
+ACCESS_TABLE = AccessTable(
+    _scan_access_totals,
+    CHAIN_WATCHER,
+    redis_client=redis_client_from_url(os.getenv("ACCESS_TABLE_REDIS_URL")),
+    max_lag=float(os.getenv("ACCESS_TABLE_MAX_LAG", "30")),
+)
 
 
 def derive_legacy_address_from_pubkey(pubkey_hex):
@@ -562,6 +812,7 @@ def check_auth():
         or p.startswith("/oauthdemo/")
         or p.startswith("/socket.io/")
         or p.startswith("/static/")
+        or p.startswith("/qr/")  # HMAC-signed image tokens, handed out by public endpoints too
         or p == "/dashboard"
         or p == "/playground"
     ):
@@ -2440,16 +2691,27 @@ def login():
     # Optional node stats (safe if node unreachable)
     from datetime import datetime, timedelta, timezone
 
-    try:
+    def _node_stats():
         rpc = get_rpc_connection()
-        wallet_balance = rpc.getbalance()
-        block_height = rpc.getblockcount()
+        uptime_sec = rpc.uptime()
+        return {
+            "wallet_balance": rpc.getbalance(),
+            "block_height": rpc.getblockcount(),
+            "startup_time": (datetime.now(timezone.utc) - timedelta(seconds=uptime_sec)).strftime(
+                "%Y-%m-%d %H:%M:%S UTC"
+            ),
+            "mempool_info": rpc.getmempoolinfo(),
+        }
+
+    try:
+        stats = BALANCE_CACHE.get_or_compute("login_node_stats", _node_stats)
+        wallet_balance = stats["wallet_balance"]
+        block_height = stats["block_height"]
         remaining = 1777777 - block_height
 
-        uptime_sec = rpc.uptime()
-        startup_time = (datetime.now(timezone.utc) - timedelta(seconds=uptime_sec)).strftime("%Y-%m-%d %H:%M:%S UTC")
+        startup_time = stats["startup_time"]
 
-        mp_info = rpc.getmempoolinfo()
+        mp_info = stats["mempool_info"]
         mempool_txs = mp_info.get("size", 0)
         mempool_usage = mp_info.get("usage", 0)
     except Exception:
@@ -2963,10 +3225,7 @@ def hex_to_wif(hex_priv, compressed=True, testnet=False):
 
 
 def make_qr_base64(data):
-    img = qrcode.make(data)
-    buf = BytesIO()
-    img.save(buf, format="PNG")
-    return base64.b64encode(buf.getvalue()).decode()
+    return CPU_OFFLOAD.run(render_qr, data, box_size=10, border=4, ecc="M")
 
 
 @app.route("/verify_signature", methods=["POST"])
@@ -2984,7 +3243,6 @@ def verify_signature():
     if not signature:
         return jsonify({"verified": False, "error": "Signature is required"}), 400
 
-    rpc_conn = get_rpc_connection()
     matched_pubkey = None
 
     if pubkey_hex:
@@ -2992,22 +3250,15 @@ def verify_signature():
             return jsonify({"verified": False, "error": "PubKey must be 66 hex chars."}), 400
         try:
             derived_addr = derive_legacy_address_from_pubkey(pubkey_hex)
-            if rpc_conn.verifymessage(derived_addr, signature, challenge):
+            if CPU_OFFLOAD.run(verify_message, derived_addr, signature, challenge):
                 matched_pubkey = pubkey_hex
             else:
                 return jsonify({"verified": False, "error": "Invalid signature"}), 403
         except Exception as e:
             return jsonify({"verified": False, "error": str(e)}), 500
     else:
-        # No pubkey: try SPECIAL_USERS
-        for candidate in SPECIAL_USERS:
-            try:
-                derived_addr = derive_legacy_address_from_pubkey(candidate)
-                if rpc_conn.verifymessage(derived_addr, signature, challenge):
-                    matched_pubkey = candidate
-                    break
-            except Exception:
-                continue
+        # No pubkey: recover the signer and look it up among SPECIAL_USERS
+        matched_pubkey = CPU_OFFLOAD.run(SPECIAL_SIGNERS.match, signature, challenge)
         if not matched_pubkey:
             return jsonify({"verified": False, "error": "Invalid signature"}), 403
 
@@ -3016,9 +3267,7 @@ def verify_signature():
     if not pubkey_hex:  # matched a special user
         session["access_level"] = "full"
     else:
-        in_bal, out_bal = get_save_and_check_balances_for_pubkey(matched_pubkey)
-        ratio = (out_bal / in_bal) if in_bal > 0 else 0
-        session["access_level"] = "full" if ratio >= 1 else "limited"
+        _, _, session["access_level"] = get_access_totals(matched_pubkey)
     session.permanent = True
 
     # Notify chat clients
@@ -3069,6 +3318,8 @@ def guest_login():
 
 # ---- Special Login ----
 SPECIAL_USERS = [p.strip() for p in os.getenv("SPECIAL_USERS", "").split(",") if p.strip()]
+# Special users are matched by recovering the signer's key once, not by trying each candidate
+SPECIAL_SIGNERS = SignerIndex(SPECIAL_USERS)
 
 
 @app.route("/guest_login2", methods=["POST"])
@@ -3093,10 +3344,11 @@ def guest_login2():
 
 
 def get_save_and_check_balances(
-    script_hex: str, groupings: list[list[tuple[str, Decimal, str]]]
+    script_hex: str, groupings: "GroupingsIndex | list[list[tuple[str, Decimal, str]]]"
 ) -> tuple[Decimal, Decimal]:
     """
     Accepts a witness program scriptPubKey hex or a redeem/witness script hex.
+    `groupings` is a GroupingsIndex (or a raw listaddressgroupings result, indexed on the fly).
     Returns (saving_total, checking_total).
     - We match addresses by LABEL that startswith the script hex (to allow "HEX [i]" labels).
     - Classification:
@@ -3134,25 +3386,17 @@ def get_save_and_check_balances(
         if looks_like_segwit_spk(lower):
             expected_spk_lower = lower
         else:
-            # decode to get segwit.hex if possible
-            rpc = get_rpc_connection()
-            decoded = rpc.decodescript(script_hex)
+            # decode (locally) to get segwit.hex if possible
+            decoded = decode_script(script_hex)
             seg_hex = (decoded.get("segwit") or {}).get("hex")
             expected_spk_lower = (seg_hex or decoded.get("hex") or script_hex).lower()
     except Exception:
         expected_spk_lower = script_hex.lower()
 
-    # 2) Collect matches where the LABEL begins with the hex (handles "HEX [i]")
-    matches: list[tuple[str, Decimal]] = []
-    for group in groupings:
-        for triple in group:
-            try:
-                addr, bal = triple[0], Decimal(triple[1])
-                lbl = triple[2] or ""
-                if isinstance(lbl, str) and lbl.lower().startswith(expected_spk_lower):
-                    matches.append((addr, bal))
-            except Exception:
-                continue
+    # 2) Collect addresses labelled "HEX" or "HEX [i]" from the label index
+    if not isinstance(groupings, GroupingsIndex):
+        groupings = GroupingsIndex(groupings)
+    matches: list[tuple[str, Decimal]] = groupings.label_index().addresses_for_covenant(expected_spk_lower)
 
     if not matches:
         return Decimal("0"), Decimal("0")
@@ -3189,93 +3433,95 @@ def get_save_and_check_balances(
     return save_total, check_total
 
 
+# BTC/USD refreshed in the background; requests read the last good quote instead of calling out
+BTC_PRICE_FEED = PriceFeed(
+    sources_from_spec(os.getenv("PRICE_SOURCES", "coingecko")),
+    interval=float(os.getenv("PRICE_REFRESH_INTERVAL", "60")),
+    max_age=float(os.getenv("PRICE_MAX_AGE", "900")),
+)
+BTC_PRICE_FEED.start()
+PRICE_FIRST_WAIT = float(os.getenv("PRICE_FIRST_WAIT", "2"))
+
+
 def fetch_btc_price():
-    try:
-        resp = requests.get(
-            "https://api.coingecko.com/api/v3/simple/price",
-            params={"ids": "bitcoin", "vs_currencies": "usd"},
-            timeout=5,
-        )
-        resp.raise_for_status()
-        j = resp.json()
-        return j.get("bitcoin", {}).get("usd")
-    except Exception as e:
-        print(f"[WARN] fetch_btc_price failed: {e}")
-        return None
+    """Latest BTC/USD price (None if unknown or older than PRICE_MAX_AGE); never waits on the upstream API."""
+    return BTC_PRICE_FEED.price(wait=PRICE_FIRST_WAIT)
+
+
+# "png" (1-bit PNG, base64) or "svg" (data URI); see qr_render
+QR_FORMAT = os.getenv("QR_FORMAT", "png")
+
+
+def _render_qr(data, box_size, border):
+    return CPU_OFFLOAD.run(render_qr, data, box_size, border, fmt=QR_FORMAT)
+
+
+# Rendered QR codes keyed by (data, box_size, border); the same code is never rasterized twice
+QR_CACHE = QRCache(
+    _render_qr,
+    max_bytes=int(os.getenv("QR_CACHE_MAX_BYTES", str(32 * 1024 * 1024))),
+    redis_client=redis_client_from_url(os.getenv("QR_CACHE_REDIS_URL")),
+    disk_dir=os.getenv("QR_CACHE_DIR") or None,
+    variant=QR_FORMAT,
+    redis_ttl=int(os.getenv("QR_CACHE_REDIS_TTL", str(7 * 24 * 3600))),
+    disk_max_bytes=int(os.getenv("QR_CACHE_DIR_MAX_BYTES", str(256 * 1024 * 1024))),
+)
 
 
 def generate_qr_code(data, *, box_size=12, border=4):
-    # Use a decent error correction, auto-fit version, proper quiet zone
-    qr = qrcode.QRCode(
-        version=None,  # let it grow as needed
-        error_correction=qrcode.constants.ERROR_CORRECT_Q,  # Q is plenty; H is okay too
-        box_size=box_size,  # module size in pixels
-        border=border,  # quiet zone in modules (4 is the ISO minimum)
-    )
-    qr.add_data(data)
-    qr.make(fit=True)
-    img = qr.make_image(fill_color="black", back_color="white").convert("RGB")
+    """QR code for ``data`` in QR_FORMAT, served from QR_CACHE when already rendered."""
+    return QR_CACHE.get(str(data), box_size, border)
 
-    # Save at a print-friendly DPI
-    buf = BytesIO()
-    img.save(buf, format="PNG", dpi=(300, 300))
-    return base64.b64encode(buf.getvalue()).decode("utf-8")
 
+# /qr/<token> URLs are signed with a key derived from the Flask secret
+QR_TOKEN_KEY = hashlib.sha256(b"hodlxxi-qr-token:" + str(app.secret_key).encode("utf-8")).digest()
+QR_IMAGE_MAX_AGE = 365 * 24 * 3600  # a token always names the same image
 
-def to_npub(hex_pubkey):
-    if len(hex_pubkey) == 130:
-        x = int(hex_pubkey[2:66], 16)
-        y = int(hex_pubkey[66:], 16)
-        compressed_pubkey = bytes.fromhex(f"{'02' if y % 2 == 0 else '03'}{x:064x}")
-    elif len(hex_pubkey) == 66:
-        compressed_pubkey = bytes.fromhex(hex_pubkey)
-    else:
-        raise ValueError("Invalid public key length")
 
-    x_only_pub = compressed_pubkey[1:]
-    return bech32_encode("npub", convertbits(x_only_pub, 8, 5))
+def qr_inline_requested():
+    """Old clients keep base64 images in the JSON with ?inline_qr=1 (or "inline_qr": true in a JSON body)."""
+    flag = request.args.get("inline_qr")
+    if flag is None and request.is_json:
+        flag = (request.get_json(silent=True) or {}).get("inline_qr")
+    return str(flag).lower() in ("1", "true", "yes")
 
 
-def extract_pubkey_from_op_if(asm):
-    ops = asm.split()
-    for i, op in enumerate(ops):
-        if op == "OP_IF":
-            for j in range(i + 1, min(i + 6, len(ops))):
-                if re.fullmatch(r"[0-9a-fA-F]{66}", ops[j]) or re.fullmatch(r"[0-9a-fA-F]{130}", ops[j]):
-                    return ops[j]
-    return None
+def ndjson_response(events):
+    """Send each event dict as one JSON line, flushed as soon as it is produced."""
+    resp = app.response_class(stream_with_context(ndjson_lines(events)), mimetype=NDJSON_MIMETYPE)
+    resp.headers["Cache-Control"] = "no-store"
+    resp.headers["X-Accel-Buffering"] = "no"  # nginx would otherwise hold lines back until its buffer fills
+    return resp
 
 
-def extract_pubkey_from_op_else(asm):
-    ops = asm.split()
-    try:
-        idx = ops.index("OP_ELSE")
-        for token in ops[idx + 1 :]:
-            if re.fullmatch(r"[0-9a-fA-F]{66}", token) or re.fullmatch(r"[0-9a-fA-F]{130}", token):
-                return token
-    except ValueError:
-        return None
-    return None
+def qr_ref(data, *, box_size=12, border=4):
+    """URL of the QR image for ``data`` (loaded lazily by the browser), or the inline image if requested."""
+    if qr_inline_requested():
+        return generate_qr_code(data, box_size=box_size, border=border)
+    return url_for("qr_image", token=sign_qr_token(QR_TOKEN_KEY, str(data), box_size, border))
 
 
-def format_asm(asm):
-    ops = asm.split()
-    formatted_ops = []
-    in_op_if = False
+@app.route("/qr/<token>")
+def qr_image(token):
+    try:
+        data, box_size, border = parse_qr_token(QR_TOKEN_KEY, token)
+    except QRTokenError:
+        abort(404)
 
-    for op in ops:
-        if op == "OP_IF":
-            in_op_if = True
-        elif op == "OP_ENDIF":
-            in_op_if = False
+    etag = qr_key(data, box_size, border, QR_FORMAT)
+    if request.if_none_match.contains(etag):
+        resp = app.response_class(status=304)
+    else:
+        body, mimetype = decode_qr_payload(generate_qr_code(data, box_size=box_size, border=border))
+        resp = app.response_class(body, mimetype=mimetype)
+    resp.set_etag(etag)
+    resp.headers["Cache-Control"] = f"private, max-age={QR_IMAGE_MAX_AGE}, immutable"
+    return resp
 
-        if in_op_if and re.fullmatch(r"[0-9a-fA-F]{66}", op):
-            formatted_ops.append(f'<span class="clickable-pubkey" onclick="handlePubKeyClick(\'{op}\');">{op}</span>')
-        else:
-            formatted_ops.append(op)
 
-    grouped_ops = [" ".join(formatted_ops[i : i + 4]) for i in range(0, len(formatted_ops), 4)]
-    return "\n".join(grouped_ops)
+def to_npub(hex_pubkey):
+    """npub for a compressed or uncompressed hex pubkey (memoized in bech32_codec)."""
+    return hex_to_npub(hex_pubkey)
 
 
 def extract_script_from_raw_descriptor(descriptor):
@@ -3288,62 +3534,21 @@ def extract_script_from_raw_descriptor(descriptor):
 def is_valid_pubkey(pubkey):
     if pubkey.startswith("npub"):
         try:
-            hrp, data = bech32_decode(pubkey)
-            if hrp != "npub" or data is None:
-                return False
+            decode_bytes(pubkey, "npub")
             return True
-        except Exception:
+        except Bech32Error:
             return False
     return bool(re.fullmatch(r"[0-9a-fA-F]{66}", pubkey) or re.fullmatch(r"[0-9a-fA-F]{130}", pubkey))
 
 
-def mask_timelocks(text):
-    tokens = text.split()
-    masked_tokens = []
-    for i, token in enumerate(tokens):
-        if token in ["OP_CHECKLOCKTIMEVERIFY", "OP_CHECKSEQUENCEVERIFY"]:
-            if masked_tokens and masked_tokens[-1].isdigit():
-                masked_tokens[-1] = "*****"
-            masked_tokens.append(token)
-        else:
-            masked_tokens.append(token)
-    return " ".join(masked_tokens)
-
-
-def shorten_pubkey(pubkey):
-    byte_len = len(pubkey) // 2
-    if byte_len > 31:
-        n = (byte_len - 31) * 2
-    else:
-        n = 4
-    return pubkey[-n:]
-
-
 def mask_hex_value(hex_value, num_visible=4):
     if len(hex_value) <= num_visible:
         return hex_value
     return "*****" + hex_value[-num_visible:]
 
 
-def clickable_trunc(pubkey):
-    short = shorten_pubkey(pubkey)
-    return f'<span class="clickable-pubkey" onclick="handlePubKeyClick(\'{pubkey}\');"><span style="color:red;">{short}</span></span>'
-
-
 def mask_raw_descriptor(text):
-    m = re.match(r"raw\((?P<hex>[0-9a-fA-F]+)\)(?P<suffix>.*)", text)
-    if m:
-        hex_data = m.group("hex")
-        suffix = m.group("suffix")
-        masked_hex = re.sub(r"(03)[0-9a-fA-F]{6}(?=b1)", r"\1*****", hex_data)
-        masked_hex = re.sub(
-            r"(b17521)((?:[0-9a-fA-F]{66}|[0-9a-fA-F]{130}))",
-            lambda match_obj: match_obj.group(1) + clickable_trunc(match_obj.group(2)),
-            masked_hex,
-        )
-        return f"raw({masked_hex}){suffix}"
-    else:
-        return text
+    return mask_descriptor(text) if text.startswith("raw(") else text
 
 
 def truncate_address(addr, first=6, last=4):
@@ -3352,34 +3557,55 @@ def truncate_address(addr, first=6, last=4):
     return addr
 
 
-def label_for_index(script_hex: str, i: int) -> str:
-    """Canonical label for P2WPKH derived from a zpub for this covenant."""
-    return f"{script_hex} [{i}]"
+# pubkey/npub -> covenants; built at startup and kept in sync incrementally
+COVENANT_INDEX = CovenantIndex(parse_covenant, npub_decoder=npub_to_hex, decoder=decode_script)
+
+# zpub/xpub -> derived child keys and P2WPKH addresses, memoized per extended key
+XPUB_DERIVER = XpubDeriver(max_keys=int(os.getenv("XPUB_DERIVER_KEYS", "64")))
+
+
+def _warm_covenant_index():
+    try:
+        added = COVENANT_INDEX.sync(get_rpc_connection())
+        logger.info(f"Covenant index built with {added} covenants")
+    except Exception as e:
+        logger.warning(f"Covenant index warm-up skipped (built on first use): {e}")
+
+
+threading.Thread(target=_warm_covenant_index, name="covenant-index-warmup", daemon=True).start()
+# Background pollers start here rather than next to their definitions: the first access-table sweep
+# needs the covenant index above, and the tip watcher it follows should start alongside it
+CHAIN_WATCHER.start()
+ACCESS_TABLE.start()
 
 
 def find_first_unused_labeled_address(rpc, script_hex: str, max_scan: int = 20) -> str | None:
     """
     Look for the first address whose label matches '<script_hex> [i]' and has never received & has no UTXOs.
+    Cached until the chain tip moves.
     """
+    return BALANCE_CACHE.get_or_compute(
+        ("first_unused", script_hex, max_scan), lambda: _scan_first_unused_labeled_address(rpc, script_hex, max_scan)
+    )
+
+
+def _scan_first_unused_labeled_address(rpc, script_hex: str, max_scan: int) -> str | None:
     try:
-        labels = set(rpc.listlabels())
+        _, labels = get_wallet_indexes(rpc)
     except Exception:
-        labels = set()
+        return None
 
-    for i in range(max_scan):
-        wanted = label_for_index(script_hex, i)
-        if wanted not in labels:
-            # label wasn't created yet → definitely unused from our PoV
-            continue
+    # Labels with transaction history are skipped without asking the node; only
+    # candidates the index believes unused are confirmed (usually just the first).
+    utxo_service = get_utxo_service(rpc)
+    for i in labels.unused_indexes(script_hex, max_scan):
         try:
-            addr_map = rpc.getaddressesbylabel(wanted)  # {addr: {...}}
+            addr_map = rpc.getaddressesbylabel(labels.label(script_hex, i))  # {addr: {...}}
         except Exception:
             continue
         for addr in addr_map.keys():
             try:
-                never_received = rpc.getreceivedbyaddress(addr, 0) == 0
-                utxos = rpc.listunspent(0, 9999999, [addr])
-                if never_received and not utxos:
+                if rpc.getreceivedbyaddress(addr, 0) == 0 and not utxo_service.utxos(addr):
                     return addr
             except Exception:
                 continue
@@ -3396,11 +3622,11 @@ def zpub_to_xpub(zpub):
 
 
 def fetch_balance_via_rpc(address):
-    rpc = get_rpc_connection()
-    utxos = rpc.listunspent(0, 9999999, [address])
-    total_btc = sum(Decimal(u["amount"]) for u in utxos)
-    total_sats = int(total_btc * Decimal("100000000"))
-    return total_sats
+    def _fetch():
+        total_btc = get_utxo_service().balance(address)
+        return int(total_btc * Decimal("100000000"))
+
+    return BALANCE_CACHE.get_or_compute(("address_balance", address), _fetch)
 
 
 @app.route("/home", methods=["GET"], endpoint="home")  # 👈 alias keeps url_for('home') working
@@ -4345,37 +4571,21 @@ function verifyAndListContracts(clickedPubKey = null) {
     return;
   }
   showLoading();
-  fetch(`/verify_pubkey_and_list?pubkey=${encodeURIComponent(pubKey)}`)
-    .then(r => r.json())
-    .then(data => {
-      hideLoading();
-      if (!data.valid) {
-        alert(data.error || "No descriptor found matching the public key.");
-        return;
-      }
 
-// Sort: 1) counterparty online first, 2) then by total USD (desc)
-const sorted = data.descriptors.slice().sort((a, b) => {
-  const aOnline = !!a.counterparty_online;
-  const bOnline = !!b.counterparty_online;
-  if (aOnline !== bOnline) return aOnline ? -1 : 1;
-
-  const totalA = (parseFloat(a.saving_balance_usd) || 0) + (parseFloat(a.checking_balance_usd) || 0);
-  const totalB = (parseFloat(b.saving_balance_usd) || 0) + (parseFloat(b.checking_balance_usd) || 0);
-  return totalB - totalA;
-});
-
-      const container = document.getElementById('contracts-container');
-      container.innerHTML = '';
-
-      let inputTotal = 0;
-      let outputTotal = 0;
-
-      const entered   = pubKey.trim();
-      const isNpub    = entered.startsWith('npub');
-      const enteredLC = entered.toLowerCase();
+  const container = document.getElementById('contracts-container');
+  const entered   = pubKey.trim();
+  const enteredNpub = entered.startsWith('npub');
+  const enteredLC = entered.toLowerCase();
+  let inputTotal  = 0;
+  let outputTotal = 0;
+
+  function resetContracts() {
+    container.innerHTML = '';
+    inputTotal = 0;
+    outputTotal = 0;
+  }
 
-      sorted.forEach(descriptor => {
+  function addContract(descriptor) {
         const save  = parseFloat(descriptor.saving_balance_usd) || 0;
         const check = parseFloat(descriptor.checking_balance_usd) || 0;
         const total = save + check;
@@ -4386,7 +4596,7 @@ const sorted = data.descriptors.slice().sort((a, b) => {
         const elNpub = descriptor.op_else_npub|| null;
 
         let role = null;
-        if (isNpub) {
+        if (enteredNpub) {
           if (ifNpub && ifNpub === entered)        role = 'input';
           else if (elNpub && elNpub === entered)   role = 'output';
           // fallback if backend doesn't provide *_npub fields:
@@ -4449,7 +4659,7 @@ const deeplink = (accessLevel === "full" && (descriptor.onboard_link || descript
   : null;
 
 const imgTag = descriptor.qr_code
-  ? `<img src="data:image/png;base64,${descriptor.qr_code}" alt="Address QR"
+  ? `<img src="${/^(data:|\/)/.test(descriptor.qr_code) ? descriptor.qr_code : `data:image/png;base64,${descriptor.qr_code}`}" alt="Address QR" loading="lazy"
        style="max-width:180px;border:1px solid #333;border-radius:8px;box-shadow:0 0 10px rgba(0,255,0,.15);" />`
   : '';
 
@@ -4478,12 +4688,49 @@ ${counterpartyNote}
 ${nostrSection}
 <div style="text-align:center; margin-top:1rem;"><div style="display:inline-block;"><strong>Save:</strong> $${descriptor.saving_balance_usd}  <strong>Check:</strong> $${descriptor.checking_balance_usd}</div></div>`;
 
-        container.appendChild(box);
-      });
+        // Keep the order stable as cards arrive: counterparty online first, then by total USD (desc)
+        box.dataset.online = descriptor.counterparty_online ? '1' : '0';
+        box.dataset.total  = total;
+        const next = Array.from(container.children).find(el =>
+          box.dataset.online > el.dataset.online ||
+          (box.dataset.online === el.dataset.online && total > parseFloat(el.dataset.total)));
+        container.insertBefore(box, next || null);
+
+        document.getElementById('input-balance').innerText  = '$' + inputTotal.toFixed(2);
+        document.getElementById('output-balance').innerText = '$' + outputTotal.toFixed(2);
+  }
 
-      // Update totals
-      document.getElementById('input-balance').innerText  = '$' + inputTotal.toFixed(2);
-      document.getElementById('output-balance').innerText = '$' + outputTotal.toFixed(2);
+  // Cards are streamed as NDJSON so the first one renders before the whole scan finishes
+  fetch(`/verify_pubkey_and_list?pubkey=${encodeURIComponent(pubKey)}&stream=1`,
+        { headers: { 'Accept': 'application/x-ndjson' } })
+    .then(async r => {
+      if (!(r.headers.get('Content-Type') || '').includes('application/x-ndjson')) {
+        const data = await r.json();
+        hideLoading();
+        if (!data.valid) {
+          alert(data.error || "No descriptor found matching the public key.");
+          return;
+        }
+        resetContracts();
+        data.descriptors.forEach(addContract);
+        return;
+      }
+      resetContracts();
+      let failed = null;
+      await readNdjson(r, event => {
+        if (event.event === 'descriptor') {
+          hideLoading();
+          addContract(event.descriptor);
+        } else if (event.event === 'error') {
+          failed = event;
+        }
+      });
+      hideLoading();
+      if (failed) {
+        // start is sent before the node is queried, so "nothing matched" and RPC outages arrive in-band
+        if (failed.count) throw new Error(failed.error);
+        alert(failed.error || "No descriptor found matching the public key.");
+      }
     })
     .catch(err => {
       hideLoading();
@@ -4492,6 +4739,24 @@ ${nostrSection}
     });
 }
 
+async function readNdjson(response, onEvent) {
+  const reader  = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffered  = '';
+  for (;;) {
+    const { done, value } = await reader.read();
+    buffered += decoder.decode(value || new Uint8Array(), { stream: !done });
+    let nl;
+    while ((nl = buffered.indexOf('\n')) >= 0) {
+      const line = buffered.slice(0, nl).trim();
+      buffered = buffered.slice(nl + 1);
+      if (line) onEvent(JSON.parse(line));
+    }
+    if (done) break;
+  }
+  if (buffered.trim()) onEvent(JSON.parse(buffered));
+}
+
         function handlePubKeyClick(pubKey) {
           verifyAndListContracts(pubKey);
         }
@@ -4549,7 +4814,7 @@ function updateScript() {
         if (!b64) return '';
         return `
           <figure>
-            <img src="data:image/png;base64,${b64}" alt="${label} QR"/>
+            <img src="${/^(data:|\/)/.test(b64) ? b64 : `data:image/png;base64,${b64}`}" alt="${label} QR" loading="lazy"/>
             <figcaption>${label}</figcaption>
           </figure>`;
       }
@@ -4635,7 +4900,7 @@ function jumpOnboard(rawHex) {
 
       if (res && res.qr) {
         const qrContainer = document.getElementById('qr-codes');
-        const label = (t,b64) => (b64?`<figure><img src="data:image/png;base64,${b64}"><figcaption>${t}</figcaption></figure>`:"");
+        const label = (t,b64) => (b64?`<figure><img src="${/^(data:|\/)/.test(b64) ? b64 : `data:image/png;base64,${b64}`}" loading="lazy"><figcaption>${t}</figcaption></figure>`:"");
         qrContainer.innerHTML =
           label('Receiver Pubkey', res.qr.pubkey_if) +
           label('Giver Pubkey',    res.qr.pubkey_else) +
@@ -4704,10 +4969,10 @@ function setLabelsFromZpub() {
         const idx  = (obj.index !== undefined) ? `[${obj.index}] ` : "";
         const addr = obj.address || "";
         const b64  = obj.qr || obj.qr_base64 || null;
-        const src  = b64 ? (b64.startsWith("data:") ? b64 : `data:image/png;base64,${b64}`) : null;
+        const src  = b64 ? (/^(data:|\/)/.test(b64) ? b64 : `data:image/png;base64,${b64}`) : null;
         const lab  = obj.label ? `<br><small>${obj.label}</small>` : "";
         msg += `<li>${idx}${addr}${lab}${
-          src ? `<br><img src="${src}" alt="QR for ${addr}" style="max-width:140px;border:1px solid #333;border-radius:6px;margin-top:4px;" />` : ""
+          src ? `<br><img src="${src}" alt="QR for ${addr}" loading="lazy" style="max-width:140px;border:1px solid #333;border-radius:6px;margin-top:4px;" />` : ""
         }</li>`;
       });
       msg += "</ul>";
@@ -4912,6 +5177,84 @@ def logout():
     return redirect(url_for("login"))
 
 
+def _covenant_card(cov, pubkey, groupings, btc_price, is_full, fields=None):
+    """
+    One covenant as shown on the home page (masked script, address QR, npubs and USD balances).
+
+    ``fields`` restricts the card to those names (see ``covenant_listing.FIELD_GROUPS``);
+    groups with no requested field are not computed. ``id`` is always included.
+    """
+    want = CARD_FIELDS if fields is None else fields
+    segwit_addr = cov.segwit_address
+    op_if_pub = cov.op_if_pub
+    op_else_pub = cov.op_else_pub
+    card = {"id": covenant_id(cov.script)}
+
+    if not want.isdisjoint(FIELD_GROUPS["summary"]):
+        # Determine which pubkey is the covenant partner (not the user)
+        user_pubkey = pubkey.lower()
+        counterparty_pubkey = None
+        if op_if_pub and op_if_pub.lower() != user_pubkey:
+            counterparty_pubkey = op_if_pub
+        elif op_else_pub and op_else_pub.lower() != user_pubkey:
+            counterparty_pubkey = op_else_pub
+
+        card.update(
+            {
+                "address": segwit_addr,
+                "truncated_address": truncate_address(segwit_addr) if segwit_addr else None,
+                "op_if_pub": op_if_pub,
+                "op_else_pub": op_else_pub,
+                "counterparty_pubkey": counterparty_pubkey,
+                "counterparty_online": counterparty_pubkey in ONLINE_USERS if counterparty_pubkey else False,
+            }
+        )
+
+    if not want.isdisjoint(FIELD_GROUPS["balances"]):
+        save_bal, check_bal = get_save_and_check_balances(cov.script_hex, groupings)
+        addr_bal = groupings.balance(segwit_addr) if segwit_addr else Decimal("0")
+        card.update(
+            {
+                "balance_usd": f"{float(addr_bal * btc_price):.2f}",
+                "saving_balance_usd": f"{float(save_bal * btc_price):.2f}",
+                "checking_balance_usd": f"{float(check_bal * btc_price):.2f}",
+            }
+        )
+
+    if not want.isdisjoint(FIELD_GROUPS["npubs"]):
+        op_if_npub = to_npub(op_if_pub) if op_if_pub else None
+        op_else_npub = to_npub(op_else_pub) if op_else_pub else None
+        card.update(
+            {
+                "nostr_npub": op_if_npub,
+                "nostr_npub_truncated": truncate_address(op_if_npub) if op_if_npub else None,
+                "op_if_npub": op_if_npub,
+                "op_else_npub": op_else_npub,
+            }
+        )
+
+    if not want.isdisjoint(FIELD_GROUPS["details"]):
+        script = cov.script
+        script_raw = script if (isinstance(script, str) and script) else cov.script_hex
+        card.update(
+            {
+                "raw": mask_descriptor(cov.descriptor),
+                "asm": parse_covenant(cov.asm).formatted_asm,
+                "script_hex": mask_hex_value(cov.script_hex),
+                # full-access only
+                "raw_script": script_raw if is_full else None,
+                "onboard_link": f"#onboard?raw={script_raw}&autoverify=1" if is_full and script_raw else None,
+            }
+        )
+
+    if "qr_code" in want:
+        card["qr_code"] = qr_ref(segwit_addr) if segwit_addr else None
+
+    if fields is not None:
+        card = {k: v for k, v in card.items() if k == "id" or k in fields}
+    return card
+
+
 @app.route("/verify_pubkey_and_list", methods=["GET"])
 def verify_pubkey_and_list():
     import re
@@ -4925,121 +5268,73 @@ def verify_pubkey_and_list():
         return jsonify({"valid": False, "error": "Invalid public key format."}), 400
 
     try:
-        rpc = get_rpc_connection()
-        descriptors = rpc.listdescriptors().get("descriptors", [])
-        btc_price_val = fetch_btc_price()
-        btc_price = Decimal(str(btc_price_val)) if btc_price_val is not None else Decimal("0")
-        all_groupings = rpc.listaddressgroupings()
-
-        def get_balance_by_address(address):
-            for group in all_groupings:
-                for addr_item, bal, scr in group:
-                    if addr_item == address:
-                        return Decimal(str(bal))
-            return Decimal("0")
-
-        matched = []
-
-        for d in descriptors:
-            raw_desc = d["desc"]
-
-            if raw_desc.startswith("raw("):
-                masked_raw = mask_raw_descriptor(raw_desc)
-            else:
-                masked_raw = mask_timelocks(raw_desc)
-
-            script = extract_script_from_raw_descriptor(raw_desc)
-            if not script:
-                continue
-
-            decoded = rpc.decodescript(script)
-            asm = decoded.get("asm", "") or ""
-            script_hex_val = decoded.get("hex") or decoded.get("segwit", {}).get("hex")
-            if not script_hex_val:
-                continue
-
-            found = False
-            for tok in asm.split():
-                if re.fullmatch(r"[0-9A-Fa-f]{66,130}", tok):
-                    if pubkey.startswith("npub"):
-                        try:
-                            if to_npub(tok) == pubkey:
-                                found = True
-                                break
-                        except Exception:
-                            pass
-                    else:
-                        if tok.lower() == pubkey.lower():
-                            found = True
-                            break
-            if not found:
-                continue
-
-            segwit_addr = decoded.get("segwit", {}).get("address") or (decoded.get("addresses") or [None])[0]
-
-            addr_bal = get_balance_by_address(segwit_addr) if segwit_addr else Decimal("0")
-            save_bal, check_bal = get_save_and_check_balances(script_hex_val, all_groupings)
-
-            bal_btc = float(addr_bal)
-            bal_usd = float(addr_bal * btc_price)
-            save_btc = float(save_bal)
-            save_usd = float(save_bal * btc_price)
-            check_btc = float(check_bal)
-            check_usd = float(check_bal * btc_price)
-
-            op_if_pub = extract_pubkey_from_op_if(asm)
-            op_else_pub = extract_pubkey_from_op_else(asm)
-            op_if_npub = to_npub(op_if_pub) if op_if_pub else None
-            op_else_npub = to_npub(op_else_pub) if op_else_pub else None
-
-            nostr_npub = to_npub(op_if_pub) if op_if_pub else None
-            truncated_npub = truncate_address(nostr_npub) if nostr_npub else None
-
-            # Determine which pubkey is the covenant partner (not the user)
-            user_pubkey = pubkey.lower()
-            counterparty_pubkey = None
-            if op_if_pub and op_if_pub.lower() != user_pubkey:
-                counterparty_pubkey = op_if_pub
-            elif op_else_pub and op_else_pub.lower() != user_pubkey:
-                counterparty_pubkey = op_else_pub
+        fields = parse_fields(request.args.get("fields"))
+        limit = parse_limit(request.args.get("limit"))
+        ids = parse_ids(request.args.get("ids"))
+        cursor = request.args.get("cursor") or None
+        if cursor:
+            script_from_id(cursor)
+    except ListingError as e:
+        return jsonify({"valid": False, "error": str(e)}), 400
+
+    is_full = session.get("access_level") == "full"
+    btc_price_val = fetch_btc_price()
+    btc_price = btc_price_val if btc_price_val is not None else Decimal("0")
+    quote = BTC_PRICE_FEED.latest()
+    price_info = {
+        "usd": str(btc_price_val) if btc_price_val is not None else None,
+        "source": quote.source if quote else None,
+        "age_seconds": round(quote.age) if quote else None,
+    }
 
-            counterparty_online = counterparty_pubkey in ONLINE_USERS if counterparty_pubkey else False
+    def load_page():
+        """``(cards, next_cursor)`` for this request, or None if no covenant matches; all RPC work is here."""
+        rpc = get_rpc_connection()
+        # Descriptors and the address/label indexes are independent: fetch them concurrently
+        listed, (groupings, _) = rpc_fanout([rpc.listdescriptors, lambda: get_wallet_indexes(rpc)], rpc)
+
+        # Only covenants that contain this key are touched; new scripts are decoded once, in one batch
+        COVENANT_INDEX.sync(rpc, listed.get("descriptors", []))
+        covenants = [cov for cov in COVENANT_INDEX.lookup(pubkey) if cov.script_hex]
+        if ids is not None:
+            covenants = [cov for cov in covenants if cov.script in ids]
+        if not covenants:
+            return None
+        if limit is not None or cursor:
+            covenants, next_cursor = paginate(covenants, lambda cov: cov.script, limit, cursor)
+        else:
+            next_cursor = None
+        return (_covenant_card(cov, pubkey, groupings, btc_price, is_full, fields) for cov in covenants), next_cursor
 
-            is_full = session.get("access_level") == "full"
-            script_raw = script if (isinstance(script, str) and script) else script_hex_val
-            raw_script_for_ui = script_raw if is_full else None
-            onboard_link = f"#onboard?raw={script_raw}&autoverify=1" if is_full and script_raw else None
+    if stream_requested(request.args, request.headers.get("Accept")):
 
-            matched.append(
-                {
-                    "raw": masked_raw,
-                    "asm": format_asm(asm),
-                    "address": segwit_addr,
-                    "truncated_address": truncate_address(segwit_addr) if segwit_addr else None,
-                    "qr_code": generate_qr_code(segwit_addr) if segwit_addr else None,
-                    "balance_usd": f"{bal_usd:.2f}",
-                    "nostr_npub": nostr_npub,
-                    "nostr_npub_truncated": truncated_npub,
-                    "op_if_pub": op_if_pub,
-                    "op_else_pub": op_else_pub,
-                    "script_hex": mask_hex_value(script_hex_val),
-                    "saving_balance_usd": f"{save_usd:.2f}",
-                    "checking_balance_usd": f"{check_usd:.2f}",
-                    "counterparty_online": counterparty_online,
-                    "counterparty_pubkey": counterparty_pubkey,
-                    "op_if_npub": op_if_npub,
-                    "op_else_npub": op_else_npub,
-                    # full-access only
-                    "raw_script": raw_script_for_ui,
-                    "onboard_link": onboard_link,
-                }
-            )
+        def load_streamed_page():
+            try:
+                page = load_page()
+            except (RPCUnavailable, DeadlineExceeded) as e:
+                payload = rpc_unavailable_payload(e)
+                raise StreamError(
+                    payload["message"], reason=payload["reason"], retry_after=payload["retry_after"]
+                ) from e
+            if page is None:
+                raise StreamError("No matching descriptors found.")
+            return page
+
+        # start goes out before listdescriptors and the index sync, then cards follow as they are built
+        return ndjson_response(covenant_card_events(load_streamed_page, price_info))
 
-        if not matched:
+    try:
+        page = load_page()
+        if page is None:
             return jsonify({"valid": False, "error": "No matching descriptors found."}), 404
+        cards, next_cursor = page
+        return (
+            jsonify({"valid": True, "descriptors": list(cards), "btc_price": price_info, "next_cursor": next_cursor}),
+            200,
+        )
 
-        return jsonify({"valid": True, "descriptors": matched}), 200
-
+    except (RPCUnavailable, DeadlineExceeded):
+        raise
     except Exception as e:
         print(f"Error in verify_pubkey_and_list: {str(e)}")
         return jsonify({"valid": False, "error": str(e)}), 500
@@ -5058,13 +5353,10 @@ def decode_raw_script():
 
     try:
         rpc = get_rpc_connection()
-        decoded = rpc.decodescript(raw_script)
-        info = rpc.getdescriptorinfo(f"raw({raw_script})")
-        full_desc = info["descriptor"]
+        decoded = decode_script(raw_script)
+        full_desc = add_checksum(f"raw({raw_script.lower()})")
 
-        asm = decoded.get("asm", "")
-        op_if = extract_pubkey_from_op_if(asm)
-        op_else = extract_pubkey_from_op_else(asm)
+        op_if, op_else = parse_covenant(decoded.get("asm", "")).branches
         npub_if = to_npub(op_if) if op_if else None
         npub_else = to_npub(op_else) if op_else else None
 
@@ -5090,18 +5382,20 @@ def decode_raw_script():
             {
                 "decoded": decoded,
                 "qr": {
-                    "full_descriptor": generate_qr_code(full_desc) if full_desc else None,
-                    "segwit_address": generate_qr_code(seg_addr) if seg_addr else None,
-                    "pubkey_if": generate_qr_code(npub_if) if npub_if else None,
-                    "pubkey_else": generate_qr_code(npub_else) if npub_else else None,
-                    "first_unused_addr": generate_qr_code(first_unused_addr) if first_unused_addr else None,
-                    "raw_script_hex": generate_qr_code(raw_script) if raw_script else None,
+                    "full_descriptor": qr_ref(full_desc) if full_desc else None,
+                    "segwit_address": qr_ref(seg_addr) if seg_addr else None,
+                    "pubkey_if": qr_ref(npub_if) if npub_if else None,
+                    "pubkey_else": qr_ref(npub_else) if npub_else else None,
+                    "first_unused_addr": qr_ref(first_unused_addr) if first_unused_addr else None,
+                    "raw_script_hex": qr_ref(raw_script) if raw_script else None,
                 },
                 "first_unused_addr_text": first_unused_addr,
                 "script_hex": script_hex,
                 "warning": warning_message,
             }
         )
+    except (RPCUnavailable, DeadlineExceeded):
+        raise
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -5122,7 +5416,8 @@ def import_descriptor():
 
         if raw_descriptor.startswith("raw("):
             script = extract_script_from_raw_descriptor(raw_descriptor)
-            decoded = rpc.decodescript(script)
+            decoded = decode_script(script)
+            COVENANT_INDEX.add(raw_descriptor, decoded)
             segwit = decoded.get("segwit", {})
             address = segwit.get("address")
             script_hex = segwit.get("hex")
@@ -5132,8 +5427,7 @@ def import_descriptor():
                     {"success": False, "error": "Could not extract address or script hex from decoded script."}
                 )
 
-            descriptor_info = rpc.getdescriptorinfo(f"addr({address})")
-            address_descriptor = descriptor_info["descriptor"]
+            address_descriptor = add_checksum(f"addr({address})")
             label_import_result = rpc.importdescriptors(
                 [
                     {
@@ -5145,6 +5439,9 @@ def import_descriptor():
                     }
                 ]
             )
+            # New watch-only addresses and labels don't move the tip; drop cached balances explicitly
+            BALANCE_CACHE.clear()
+            ACCESS_TABLE.invalidate()
             return jsonify(
                 {
                     "success": True,
@@ -5162,6 +5459,8 @@ def import_descriptor():
                 "note": "Descriptor was not raw(), so address import skipped.",
             }
         )
+    except (RPCUnavailable, DeadlineExceeded):
+        raise
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -5190,13 +5489,14 @@ def set_labels_from_zpub():
         xpub = zpub_to_xpub(zpub)  # your helper that converts zpub → xpub
 
         # --- Import/activate the first 20 external P2WPKH addrs for this xpub
-        info = rpc.getdescriptorinfo(f"wpkh({xpub}/0/*)")
-        wpkh_desc = info["descriptor"]
+        # Checksum and child keys are computed locally; only the import itself goes to the node
+        wpkh_desc = add_checksum(f"wpkh({xpub}/0/*)")
         rng = [0, 19]
         rpc.importdescriptors(
             [{"desc": wpkh_desc, "timestamp": "now", "active": True, "range": rng, "watchonly": True}]
         )
-        addrs = rpc.deriveaddresses(wpkh_desc, rng)
+        derived = XPUB_DERIVER.derive(xpub, rng[0], rng[1])
+        addrs = [d.address for d in derived]
 
         # --------- Determine script_hex robustly ----------
         # 1) If provided explicitly, honor it
@@ -5204,11 +5504,6 @@ def set_labels_from_zpub():
             # Back-compat: if "label" looks like hex, treat as script_hex
             script_hex = label_input
 
-        # Helper: extract inner raw(...) even if wrapped (wsh(raw(...)), etc.)
-        def _extract_raw_hex_any(desc: str) -> str | None:
-            m = re.search(r"raw\(([0-9A-Fa-f]+)\)", desc)
-            return m.group(1) if m else None
-
         if not script_hex:
             # 2) Prefer a covenant already labeled by exact segwit hex
             try:
@@ -5216,53 +5511,27 @@ def set_labels_from_zpub():
             except Exception:
                 existing_labels = set()
 
-            for desc_obj in rpc.listdescriptors().get("descriptors", []):
-                d = desc_obj.get("desc", "")
-                raw = _extract_raw_hex_any(d)
-                if not raw:
-                    continue
-                try:
-                    dec = rpc.decodescript(raw)
-                except Exception:
-                    continue
-                seg_hex = (dec.get("segwit") or {}).get("hex")
-                if seg_hex and (seg_hex in existing_labels):
-                    script_hex = seg_hex
+            COVENANT_INDEX.sync(rpc)
+            for cov in COVENANT_INDEX.entries():
+                if cov.segwit_hex and (cov.segwit_hex in existing_labels):
+                    script_hex = cov.segwit_hex
                     break
 
         if not script_hex:
             # 3) Fallback: match a covenant that includes a key derived from this zpub
-            derived_pubkeys = []
-            for i in range(20):
-                try:
-                    kd = f"wpkh({xpub}/0/{i})"
-                    din = rpc.getdescriptorinfo(kd)["descriptor"]
-                    addr = rpc.deriveaddresses(din)[0]
-                    info = rpc.getaddressinfo(addr)
-                    pk = info.get("pubkey")
-                    if pk:
-                        derived_pubkeys.append(pk)
-                except Exception:
-                    continue
-
-            for desc_obj in rpc.listdescriptors().get("descriptors", []):
-                d = desc_obj.get("desc", "")
-                raw = _extract_raw_hex_any(d)
-                if not raw:
-                    continue
-                try:
-                    dec = rpc.decodescript(raw)
-                except Exception:
-                    continue
-
-                asm = dec.get("asm", "")
-                k_if = extract_pubkey_from_op_if(asm) or ""
-                k_else = extract_pubkey_from_op_else(asm) or ""
-                if (k_if in derived_pubkeys) or (k_else in derived_pubkeys):
-                    seg_hex = (dec.get("segwit") or {}).get("hex")
-                    if seg_hex:
-                        script_hex = seg_hex
-                        break
+            derived_pubkeys = [d.pubkey for d in derived]
+
+            COVENANT_INDEX.sync(rpc)
+            candidates = sorted(
+                {cov.script: cov for pk in derived_pubkeys for cov in COVENANT_INDEX.lookup(pk)}.values(),
+                key=lambda cov: cov.seq,
+            )
+            for cov in candidates:
+                k_if = cov.op_if_pub or ""
+                k_else = cov.op_else_pub or ""
+                if ((k_if in derived_pubkeys) or (k_else in derived_pubkeys)) and cov.segwit_hex:
+                    script_hex = cov.segwit_hex
+                    break
 
         if not script_hex:
             return (
@@ -5273,11 +5542,10 @@ def set_labels_from_zpub():
         # ---------- Label derived addresses ----------
         labeled = []
         for i, a in enumerate(addrs):
-            L = f"{script_hex} [{i}]"
+            L = indexed_label(script_hex, i)
             rpc.setlabel(a, L)
-            labeled.append(
-                {"index": i, "address": a, "type": "wpkh", "label": L, "qr": generate_qr_code(a)}  # your helper
-            )
+            labeled.append({"index": i, "address": a, "type": "wpkh", "label": L, "qr": qr_ref(a)})
+        BALANCE_CACHE.clear()
 
         return (
             jsonify(
@@ -5292,6 +5560,8 @@ def set_labels_from_zpub():
             200,
         )
 
+    except (RPCUnavailable, DeadlineExceeded):
+        raise
     except Exception as e:
         return jsonify(error=str(e)), 500
 
@@ -5354,6 +5624,8 @@ def rpc_dispatch(cmd):
     try:
         result = allowed[cmd]()
         return jsonify(result)
+    except (RPCUnavailable, DeadlineExceeded):
+        raise
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -5391,9 +5663,6 @@ def export_wallet():
 
 @app.route("/convert_wif", methods=["POST"])
 def convert_wif():
-    import base64
-    import io
-
     from flask import jsonify, request
 
     try:
@@ -5401,13 +5670,13 @@ def convert_wif():
         raw = data.get("key", "").strip()
 
         if raw.lower().startswith("nsec1"):
-            hrp, bits = bech32_decode(raw)
-            if hrp != "nsec":
+            try:
+                b = decode_bytes(raw, "nsec")
+            except Bech32Error:
                 raise ValueError("Invalid nsec key")
-            b = convertbits(bits, 5, 8, False)
-            if not b or len(b) != 32:
+            if len(b) != 32:
                 raise ValueError("Invalid nsec payload")
-            hexkey = bytes(b).hex()
+            hexkey = b.hex()
         elif is_hex32(raw):
             hexkey = raw.lower()
         else:
@@ -5415,13 +5684,10 @@ def convert_wif():
 
         wif = hex_to_wif(hexkey)
 
-        # QR
-        qr = qrcode.make(wif)
-        buf = io.BytesIO()
-        qr.save(buf, format="PNG")
-        b64 = base64.b64encode(buf.getvalue()).decode()
+        # QR of a private key: rendered per request, deliberately kept out of QR_CACHE
+        qr = CPU_OFFLOAD.run(render_qr, wif, box_size=10, border=4, fmt="png", ecc="M")
 
-        return jsonify({"ok": True, "wif": wif, "qr": f"data:image/png;base64,{b64}"})
+        return jsonify({"ok": True, "wif": wif, "qr": f"data:image/png;base64,{qr}"})
 
     except Exception as e:
         return jsonify({"ok": False, "error": str(e)}), 400
@@ -5495,12 +5761,8 @@ def is_valid_pubkey(pubkey: str) -> bool:
     # Nostr bech32 (npub1...)
     if s.lower().startswith("npub1"):
         try:
-            hrp, data = bech32_decode(s)
-            if hrp != "npub":
-                return False
-            b = convertbits(data, 5, 8, False)
-            return b is not None and len(b) == 32
-        except Exception:
+            return len(decode_bytes(s, "npub")) == 32
+        except Bech32Error:
             return False
 
     # Hex
@@ -5559,11 +5821,10 @@ def api_verify():
         ok = True
 
     else:
-        # Default: Bitcoin RPC verification
+        # Default: Bitcoin signed-message verification (same result as Core's verifymessage, no RPC)
         try:
-            rpc = get_rpc_connection()
             addr = derive_legacy_address_from_pubkey(pubkey)
-            ok = rpc.verifymessage(addr, signature, rec["challenge"])
+            ok = CPU_OFFLOAD.run(verify_message, addr, signature, rec["challenge"])
         except Exception as e:
             return jsonify(error=f"Signature verification failed: {e}"), 500
 
@@ -5572,9 +5833,7 @@ def api_verify():
 
     # --- 🔹 Determine access level ---
     try:
-        in_total, out_total = get_save_and_check_balances_for_pubkey(pubkey)
-        ratio = (out_total / in_total) if in_total > 0 else 0
-        access = "full" if ratio >= 1 else "limited"
+        _, _, access = get_access_totals(pubkey)
     except Exception:
         access = "limited"
 
@@ -5614,29 +5873,24 @@ def special_login():
     if not signature:
         return jsonify(error="Signature required", verified=False), 400
 
-    # Use the first special pubkey that verifies
-    rpc = get_rpc_connection()
     challenge = session.get("challenge")
     if not challenge:
         return jsonify(error="No active challenge", verified=False), 400
 
-    for pubkey in SPECIAL_USERS:
-        try:
-            addr = derive_legacy_address_from_pubkey(pubkey)
-            if rpc.verifymessage(addr, signature, challenge):
-                # Session
-                session["logged_in_pubkey"] = pubkey
-                session["access_level"] = "special"
-                payload = {
-                    "verified": True,
-                    "pubkey": pubkey,
-                    "access_level": "special",
-                }
-                resp = jsonify(payload)
-                resp = _finish_login(resp, pubkey, "special")
-                return resp
-        except Exception:
-            continue
+    # Recover the signer once and look it up among the special pubkeys
+    pubkey = CPU_OFFLOAD.run(SPECIAL_SIGNERS.match, signature, challenge)
+    if pubkey:
+        # Session
+        session["logged_in_pubkey"] = pubkey
+        session["access_level"] = "special"
+        payload = {
+            "verified": True,
+            "pubkey": pubkey,
+            "access_level": "special",
+        }
+        resp = jsonify(payload)
+        resp = _finish_login(resp, pubkey, "special")
+        return resp
 
     return jsonify(error="Invalid signature for all special users", verified=False), 403
 
@@ -5665,11 +5919,10 @@ def verify_signature_legacy():
     if not pubkey:
         return jsonify(error="Pubkey required"), 400  # (can add recovery later if you want it optional)
 
-    # Verify like your API: derive legacy address from pubkey and ask Bitcoin Core to verify
+    # Verify like your API: derive legacy address from pubkey and check the signature locally
     try:
-        rpc = get_rpc_connection()
         addr = derive_legacy_address_from_pubkey(pubkey)
-        ok = rpc.verifymessage(addr, signature, challenge)
+        ok = CPU_OFFLOAD.run(verify_message, addr, signature, challenge)
         if not ok:
             return jsonify(error="Invalid signature"), 403
     except Exception as e:
@@ -5677,9 +5930,7 @@ def verify_signature_legacy():
 
     # Access level (same rule you use in /api/verify)
     try:
-        in_total, out_total = get_save_and_check_balances_for_pubkey(pubkey)
-        ratio = (out_total / in_total) if in_total > 0 else 0
-        access = "full" if ratio >= 1 else "limited"
+        _, _, access = get_access_totals(pubkey)
     except Exception:
         access = "limited"
 
@@ -5710,9 +5961,6 @@ def _finish_login(resp, pubkey: str, level: str = "limited"):
     return resp
 
 
-import io
-
-
 def load_guest_pins():
     pins_env = os.getenv("GUEST_STATIC_PINS", "")
     mapping = {}
@@ -5799,7 +6047,7 @@ def _verify_lnurl_sig(k1_hex: str, sig_hex: str, key_hex: str) -> bool:
         pub = bytes.fromhex(key_hex)
 
         pk = PublicKey(pub)
-        verified = pk.verify(sig, msg, hasher=None)
+        verified = CPU_OFFLOAD.run(pk.verify, sig, msg, hasher=None)
 
         print(f"[LNURL-Auth] verify → {verified}")
         return verified
@@ -5808,58 +6056,6 @@ def _verify_lnurl_sig(k1_hex: str, sig_hex: str, key_hex: str) -> bool:
         return False
 
 
-# ----------------- bech32 encoder -----------------
-def _bech32_polymod(values):
-    GEN = (0x3B6A57B2, 0x26508E6D, 0x1EA119FA, 0x3D4233DD, 0x2A1462B3)
-    chk = 1
-    for v in values:
-        b = chk >> 25
-        chk = ((chk & 0x1FFFFFF) << 5) ^ v
-        for i in range(5):
-            chk ^= GEN[i] if ((b >> i) & 1) else 0
-    return chk
-
-
-def _bech32_hrp_expand(hrp):
-    return [ord(x) >> 5 for x in hrp] + [0] + [ord(x) & 31 for x in hrp]
-
-
-def _bech32_create_checksum(hrp, data):
-    v = _bech32_hrp_expand(hrp) + data
-    p = _bech32_polymod(v + [0, 0, 0, 0, 0, 0]) ^ 1
-    return [(p >> 5 * (5 - i)) & 31 for i in range(6)]
-
-
-def _bech32_encode(hrp, data):
-    C = "qpzry9x8gf2tvdw0s3jn54khce6mua7l"
-    return hrp + "1" + "".join([C[d] for d in data + _bech32_create_checksum(hrp, data)])
-
-
-def _convertbits(data, frombits, tobits, pad=True):
-    acc = 0
-    bits = 0
-    ret = []
-    maxv = (1 << tobits) - 1
-    max_acc = (1 << (frombits + tobits - 1)) - 1
-    for v in data:
-        if v < 0 or (v >> frombits):
-            return None
-        acc = ((acc << frombits) | v) & max_acc
-        bits += frombits
-        while bits >= tobits:
-            bits -= tobits
-            ret.append((acc >> bits) & maxv)
-    if pad and bits:
-        ret.append((acc << (tobits - bits)) & maxv)
-    elif not pad and (bits >= frombits or ((acc << (tobits - bits)) & maxv)):
-        return None
-    return ret
-
-
-def _lnurl_bech32(url_str: str) -> str:
-    return _bech32_encode("lnurl", _convertbits(url_str.encode("utf-8"), 8, 5))
-
-
 @app.route("/", methods=["GET"])
 def root_redirect():
     return redirect(url_for("landing_page"), code=301)
@@ -6350,44 +6546,7 @@ def require_scope(required_scope: str):
 
 def _lnurl_bech32(url_str: str) -> str:
     """Encode URL as LNURL (bech32)"""
-
-    def polymod(values):
-        GEN = (0x3B6A57B2, 0x26508E6D, 0x1EA119FA, 0x3D4233DD, 0x2A1462B3)
-        chk = 1
-        for v in values:
-            b = chk >> 25
-            chk = ((chk & 0x1FFFFFF) << 5) ^ v
-            for i in range(5):
-                chk ^= GEN[i] if ((b >> i) & 1) else 0
-        return chk
-
-    def hrp_expand(hrp):
-        return [ord(x) >> 5 for x in hrp] + [0] + [ord(x) & 31 for x in hrp]
-
-    def create_checksum(hrp, data):
-        values = hrp_expand(hrp) + data + [0, 0, 0, 0, 0, 0]
-        mod = polymod(values) ^ 1
-        return [(mod >> 5 * (5 - i)) & 31 for i in range(6)]
-
-    def convertbits(data, frombits, tobits):
-        acc = 0
-        bits = 0
-        ret = []
-        maxv = (1 << tobits) - 1
-        for value in data:
-            acc = (acc << frombits) | value
-            bits += frombits
-            while bits >= tobits:
-                bits -= tobits
-                ret.append((acc >> bits) & maxv)
-        if bits:
-            ret.append((acc << (tobits - bits)) & maxv)
-        return ret
-
-    CHARSET = "qpzry9x8gf2tvdw0s3jn54khce6mua7l"
-    data = convertbits(url_str.encode("utf-8"), 8, 5)
-    combined = data + create_checksum("lnurl", data)
-    return "lnurl1" + "".join([CHARSET[d] for d in combined])
+    return encode_lnurl(url_str)
 
 
 # ============================================================================
@@ -8906,7 +9065,7 @@ def lnurl_callback(session_id):
         pub_bytes = bytes.fromhex(key)
 
         pk = PublicKey(pub_bytes)
-        verified = pk.verify(sig_bytes, msg, hasher=None)
+        verified = CPU_OFFLOAD.run(pk.verify, sig_bytes, msg, hasher=None)
 
         if not verified:
             return jsonify({"status": "ERROR", "reason": "invalid signature"}), 400
@@ -0,0 +1,173 @@
+"""
+Table-driven bech32/bech32m codec (BIP-173, BIP-350) and Nostr/LNURL helpers.
+
+One implementation for every bech32 string the app produces or parses: segwit
+addresses, ``npub``/``nsec`` keys (NIP-19) and LNURL. Compared with the
+reference code it replaces:
+
+* the checksum polymod folds the five generator terms into one 32-entry
+  table lookup per character instead of five conditional XORs
+* 8-bit → 5-bit regrouping goes through a single big integer, not a per-bit
+  accumulator loop
+* ``hex_to_npub``/``npub_to_hex`` are memoized, since the same covenant keys
+  are converted on every explorer request
+"""
+
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+CHARSET = "qpzry9x8gf2tvdw0s3jn54khce6mua7l"
+BECH32 = 1
+BECH32M = 0x2BC830A3
+
+_GENERATOR = (0x3B6A57B2, 0x26508E6D, 0x1EA119FA, 0x3D4233DD, 0x2A1462B3)
+_CHARSET_REV = {c: i for i, c in enumerate(CHARSET)}
+NPUB_CACHE_SIZE = 4096
+
+
+def _generator_table() -> Tuple[int, ...]:
+    table = []
+    for top in range(32):
+        value = 0
+        for i in range(5):
+            if (top >> i) & 1:
+                value ^= _GENERATOR[i]
+        table.append(value)
+    return tuple(table)
+
+
+_GEN_TABLE = _generator_table()
+
+
+class Bech32Error(ValueError):
+    """Malformed bech32 string, wrong checksum or unexpected human-readable part."""
+
+
+def polymod(values: Iterable[int]) -> int:
+    """BIP-173 checksum polymod."""
+    table = _GEN_TABLE
+    chk = 1
+    for v in values:
+        chk = ((chk & 0x1FFFFFF) << 5) ^ v ^ table[chk >> 25]
+    return chk
+
+
+def hrp_expand(hrp: str) -> List[int]:
+    return [ord(c) >> 5 for c in hrp] + [0] + [ord(c) & 31 for c in hrp]
+
+
+def create_checksum(hrp: str, data: Sequence[int], spec: int = BECH32) -> List[int]:
+    mod = polymod(hrp_expand(hrp) + list(data) + [0] * 6) ^ spec
+    return [(mod >> 5 * (5 - i)) & 31 for i in range(6)]
+
+
+def encode(hrp: str, data: Sequence[int], spec: int = BECH32) -> str:
+    """Bech32 string for 5-bit ``data`` (no length limit, so LNURLs work too)."""
+    return hrp + "1" + "".join(CHARSET[d] for d in list(data) + create_checksum(hrp, data, spec))
+
+
+def decode(bech: str, max_length: Optional[int] = 90) -> Tuple[str, List[int], int]:
+    """
+    Split and verify a bech32/bech32m string.
+
+    Returns:
+        ``(hrp, data, spec)`` with the checksum stripped from ``data``
+
+    Raises:
+        Bech32Error: On mixed case, bad characters, bad length or checksum
+    """
+    if bech.lower() != bech and bech.upper() != bech:
+        raise Bech32Error("mixed case")
+    bech = bech.lower()
+    pos = bech.rfind("1")
+    if pos < 1 or pos + 7 > len(bech) or (max_length is not None and len(bech) > max_length):
+        raise Bech32Error("bad separator position or length")
+    hrp = bech[:pos]
+    if any(ord(c) < 33 or ord(c) > 126 for c in hrp):
+        raise Bech32Error("bad character in human-readable part")
+    try:
+        data = [_CHARSET_REV[c] for c in bech[pos + 1 :]]
+    except KeyError as e:
+        raise Bech32Error(f"bad character {e.args[0]!r}") from None
+    spec = polymod(hrp_expand(hrp) + data)
+    if spec not in (BECH32, BECH32M):
+        raise Bech32Error("bad checksum")
+    return hrp, data[:-6], spec
+
+
+def bytes_to_5bit(data: bytes) -> List[int]:
+    """Regroup bytes into 5-bit values, zero-padding the last group."""
+    if not data:
+        return []
+    nbits = len(data) * 8
+    groups = (nbits + 4) // 5
+    n = int.from_bytes(data, "big") << (groups * 5 - nbits)
+    return [(n >> (5 * i)) & 31 for i in range(groups - 1, -1, -1)]
+
+
+def five_bit_to_bytes(data: Sequence[int]) -> bytes:
+    """Inverse of ``bytes_to_5bit``; rejects non-zero or over-long padding."""
+    nbits = len(data) * 5
+    nbytes, pad = divmod(nbits, 8)
+    if pad >= 5:
+        raise Bech32Error("excess padding")
+    n = 0
+    for v in data:
+        n = (n << 5) | v
+    if n & ((1 << pad) - 1):
+        raise Bech32Error("non-zero padding")
+    return (n >> pad).to_bytes(nbytes, "big")
+
+
+def encode_bytes(hrp: str, payload: bytes, spec: int = BECH32) -> str:
+    return encode(hrp, bytes_to_5bit(payload), spec)
+
+
+def decode_bytes(bech: str, hrp: str, max_length: Optional[int] = 90) -> bytes:
+    """Payload of a bech32 string that must carry ``hrp`` (e.g. ``nsec``)."""
+    got, data, spec = decode(bech, max_length)
+    if got != hrp or spec != BECH32:
+        raise Bech32Error(f"expected a {hrp} string")
+    return five_bit_to_bytes(data)
+
+
+def segwit_address(hrp: str, version: int, program: bytes) -> str:
+    """Encode a witness program (bech32 for v0, bech32m for v1+)."""
+    return encode(hrp, [version] + bytes_to_5bit(program), BECH32 if version == 0 else BECH32M)
+
+
+def encode_lnurl(url: str) -> str:
+    """LNURL (LUD-01) for ``url``; upper-case it for QR codes if you like."""
+    return encode_bytes("lnurl", url.encode("utf-8"))
+
+
+def _x_only(hex_pubkey: str) -> str:
+    if len(hex_pubkey) not in (64, 66, 130):
+        raise ValueError("Invalid public key length")
+    x = hex_pubkey if len(hex_pubkey) == 64 else hex_pubkey[2:66]
+    bytes.fromhex(hex_pubkey)  # validate all of it, not just the x coordinate
+    return x.lower()
+
+
+@lru_cache(maxsize=NPUB_CACHE_SIZE)
+def hex_to_npub(hex_pubkey: str) -> str:
+    """npub for an x-only (64), compressed (66) or uncompressed (130) hex public key."""
+    return encode_bytes("npub", bytes.fromhex(_x_only(hex_pubkey)))
+
+
+@lru_cache(maxsize=NPUB_CACHE_SIZE)
+def npub_to_hex(npub: str) -> str:
+    """x-only hex public key (64 chars) of an npub."""
+    payload = decode_bytes(npub.strip(), "npub")
+    if len(payload) != 32:
+        raise Bech32Error("npub payload must be 32 bytes")
+    return payload.hex()
+
+
+def stats() -> Dict[str, Any]:
+    """Memo hit rates for the metrics endpoint."""
+    out: Dict[str, Any] = {}
+    for name, fn in (("hex_to_npub", hex_to_npub), ("npub_to_hex", npub_to_hex)):
+        info = fn.cache_info()
+        out[name] = {"hits": info.hits, "misses": info.misses, "size": info.currsize, "max_size": info.maxsize}
+    return out
@@ -0,0 +1,263 @@
+"""
+In-process BIP32 public derivation for HODLXXI.
+
+Labeling addresses from a zpub used to ask the node for every child key:
+``getdescriptorinfo`` → ``deriveaddresses`` → ``getaddressinfo`` per index.
+Non-hardened public derivation (BIP32 ``CKDpub``) only needs HMAC-SHA512 and
+one secp256k1 point addition per child, so it is done here instead:
+
+* extended keys in any SLIP-132 flavour (xpub/ypub/zpub, tpub/upub/vpub) are
+  parsed and checksum-verified
+* ``XpubDeriver`` derives ``(index, pubkey, P2WPKH address)`` for a whole range
+  in one call and memoizes branch nodes and children per extended key
+* ``descriptor_checksum``/``add_checksum`` compute Core's descriptor checksum
+  (BIP-380), replacing ``getdescriptorinfo`` when only the ``#checksum`` is needed
+"""
+
+import hashlib
+import hmac
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import base58
+from coincurve import PublicKey
+
+try:
+    from bech32_codec import segwit_address
+except ImportError:  # imported as app.bip32 (tests, scripts)
+    from app.bech32_codec import segwit_address
+
+HARDENED = 0x80000000
+
+# SLIP-132 public versions → network; all share the BIP32 serialization
+PUBLIC_VERSIONS = {
+    0x0488B21E: "main",  # xpub
+    0x049D7CB2: "main",  # ypub
+    0x04B24746: "main",  # zpub
+    0x043587CF: "test",  # tpub
+    0x044A5262: "test",  # upub
+    0x045F1CF6: "test",  # vpub
+}
+XPUB_VERSION = {"main": 0x0488B21E, "test": 0x043587CF}
+SEGWIT_HRP = {"main": "bc", "test": "tb", "signet": "tb", "regtest": "bcrt"}
+
+
+class BIP32Error(ValueError):
+    """Malformed extended key or an impossible derivation."""
+
+
+@dataclass(frozen=True)
+class ExtendedPubKey:
+    """A parsed BIP32 extended public key (version kept as given)."""
+
+    version: int
+    depth: int
+    parent_fingerprint: bytes
+    child_number: int
+    chain_code: bytes
+    key: bytes
+
+    @property
+    def network(self) -> str:
+        return PUBLIC_VERSIONS[self.version]
+
+    @classmethod
+    def parse(cls, extkey: str) -> "ExtendedPubKey":
+        try:
+            payload = base58.b58decode_check(extkey.strip())
+        except Exception as e:
+            raise BIP32Error("Invalid extended key checksum") from e
+        if len(payload) != 78:
+            raise BIP32Error("Invalid extended key length")
+        version = int.from_bytes(payload[:4], "big")
+        if version not in PUBLIC_VERSIONS:
+            raise BIP32Error("Not an extended public key")
+        key = payload[45:78]
+        if key[0] not in (2, 3):
+            raise BIP32Error("Invalid public key in extended key")
+        return cls(
+            version=version,
+            depth=payload[4],
+            parent_fingerprint=payload[5:9],
+            child_number=int.from_bytes(payload[9:13], "big"),
+            chain_code=payload[13:45],
+            key=key,
+        )
+
+    def serialize(self, version: Optional[int] = None) -> str:
+        payload = (
+            (self.version if version is None else version).to_bytes(4, "big")
+            + bytes([self.depth])
+            + self.parent_fingerprint
+            + self.child_number.to_bytes(4, "big")
+            + self.chain_code
+            + self.key
+        )
+        return base58.b58encode_check(payload).decode()
+
+    def to_xpub(self) -> str:
+        """The same key with the plain xpub/tpub version bytes (what descriptors accept)."""
+        return self.serialize(XPUB_VERSION[self.network])
+
+    def fingerprint(self) -> bytes:
+        return hash160(self.key)[:4]
+
+    def child(self, index: int) -> "ExtendedPubKey":
+        """BIP32 ``CKDpub``: the non-hardened child at ``index``."""
+        if not 0 <= index < HARDENED:
+            raise BIP32Error("Hardened derivation requires the private key")
+        digest = hmac.new(self.chain_code, self.key + index.to_bytes(4, "big"), hashlib.sha512).digest()
+        try:
+            # add() rejects a tweak >= n and a result at infinity, the two "skip this index" cases in BIP32
+            key = PublicKey(self.key).add(digest[:32]).format(compressed=True)
+        except ValueError as e:
+            raise BIP32Error(f"Invalid child key at index {index}") from e
+        return ExtendedPubKey(
+            version=self.version,
+            depth=self.depth + 1,
+            parent_fingerprint=self.fingerprint(),
+            child_number=index,
+            chain_code=digest[32:],
+            key=key,
+        )
+
+
+def hash160(data: bytes) -> bytes:
+    return hashlib.new("ripemd160", hashlib.sha256(data).digest()).digest()
+
+
+def p2wpkh_address(pubkey: bytes, hrp: str = "bc") -> str:
+    """Native segwit v0 address for a compressed public key."""
+    return segwit_address(hrp, 0, hash160(pubkey))
+
+
+class DerivedKey(NamedTuple):
+    index: int
+    pubkey: str
+    address: str
+
+
+class XpubDeriver:
+    """
+    Memoized range derivation for extended public keys.
+
+    Branch nodes (e.g. ``.../0``) and derived children are cached per extended
+    key, so repeated labeling of the same zpub costs dictionary lookups only.
+    At most ``max_keys`` extended keys are remembered (least recently used
+    are evicted).
+
+    Args:
+        max_keys: Number of extended keys to keep memoized
+        hrp: Bech32 prefix for derived P2WPKH addresses
+    """
+
+    def __init__(self, max_keys: int = 64, hrp: str = "bc"):
+        self.max_keys = max_keys
+        self.hrp = hrp
+        self._nodes: "OrderedDict[str, Dict[Tuple[int, ...], ExtendedPubKey]]" = OrderedDict()
+        self._children: Dict[str, Dict[Tuple[int, ...], DerivedKey]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _memo(self, extkey: str) -> Tuple[Dict[Tuple[int, ...], ExtendedPubKey], Dict[Tuple[int, ...], DerivedKey]]:
+        nodes = self._nodes.get(extkey)
+        if nodes is None:
+            nodes = self._nodes[extkey] = {(): ExtendedPubKey.parse(extkey)}
+            self._children[extkey] = {}
+            while len(self._nodes) > self.max_keys:
+                evicted, _ = self._nodes.popitem(last=False)
+                self._children.pop(evicted, None)
+        else:
+            self._nodes.move_to_end(extkey)
+        return nodes, self._children[extkey]
+
+    def _node(self, nodes: Dict[Tuple[int, ...], ExtendedPubKey], path: Tuple[int, ...]) -> ExtendedPubKey:
+        node = nodes.get(path)
+        if node is None:
+            node = nodes[path] = self._node(nodes, path[:-1]).child(path[-1])
+        return node
+
+    def derive(self, extkey: str, start: int, end: int, branch: Tuple[int, ...] = (0,)) -> List[DerivedKey]:
+        """
+        Children ``branch/start`` .. ``branch/end`` (inclusive, like a descriptor range).
+
+        Raises:
+            BIP32Error: For a malformed key or a hardened index
+        """
+        if start < 0 or end < start:
+            raise BIP32Error("Invalid derivation range")
+        with self._lock:
+            nodes, children = self._memo(extkey)
+            parent = self._node(nodes, tuple(branch))
+            out = []
+            for i in range(start, end + 1):
+                path = tuple(branch) + (i,)
+                derived = children.get(path)
+                if derived is None:
+                    self.misses += 1
+                    key = parent.child(i).key
+                    derived = children[path] = DerivedKey(i, key.hex(), p2wpkh_address(key, self.hrp))
+                else:
+                    self.hits += 1
+                out.append(derived)
+            return out
+
+    def pubkeys(self, extkey: str, start: int, end: int, branch: Tuple[int, ...] = (0,)) -> List[str]:
+        return [d.pubkey for d in self.derive(extkey, start, end, branch)]
+
+    def addresses(self, extkey: str, start: int, end: int, branch: Tuple[int, ...] = (0,)) -> List[str]:
+        return [d.address for d in self.derive(extkey, start, end, branch)]
+
+    def stats(self) -> Dict[str, int]:
+        return {"keys": len(self._nodes), "hits": self.hits, "misses": self.misses}
+
+
+# --- Descriptor checksum (BIP-380 / Core's descriptor.cpp) ---
+
+_INPUT_CHARSET = (
+    "0123456789()[],'/*abcdefgh@:$%{}"
+    "IJKLMNOPQRSTUVWXYZ&+-.;<=>?!^_|~"
+    "ijklmnopqrstuvwxyzABCDEFGH`#\"\\ "
+)
+_CHECKSUM_CHARSET = "qpzry9x8gf2tvdw0s3jn54khce6mua7l"
+_GENERATOR = (0xF5DEE51989, 0xA9FDCA3312, 0x1BAB10E32D, 0x3706B1677A, 0x644D626FFD)
+
+
+def _descsum_polymod(symbols: List[int]) -> int:
+    chk = 1
+    for value in symbols:
+        top = chk >> 35
+        chk = (chk & 0x7FFFFFFFF) << 5 ^ value
+        for i in range(5):
+            chk ^= _GENERATOR[i] if (top >> i) & 1 else 0
+    return chk
+
+
+def descriptor_checksum(desc: str) -> str:
+    """8-character checksum Core appends to ``desc`` (without any existing ``#...``)."""
+    symbols = []
+    groups = []
+    for ch in desc:
+        pos = _INPUT_CHARSET.find(ch)
+        if pos < 0:
+            raise BIP32Error(f"Invalid character in descriptor: {ch!r}")
+        symbols.append(pos & 31)
+        groups.append(pos >> 5)
+        if len(groups) == 3:
+            symbols.append(groups[0] * 9 + groups[1] * 3 + groups[2])
+            groups = []
+    if len(groups) == 1:
+        symbols.append(groups[0])
+    elif len(groups) == 2:
+        symbols.append(groups[0] * 3 + groups[1])
+    checksum = _descsum_polymod(symbols + [0] * 8) ^ 1
+    return "".join(_CHECKSUM_CHARSET[(checksum >> (5 * (7 - i))) & 31] for i in range(8))
+
+
+def add_checksum(desc: str) -> str:
+    """``desc#checksum``; an existing checksum is replaced."""
+    body = desc.split("#", 1)[0]
+    return f"{body}#{descriptor_checksum(body)}"
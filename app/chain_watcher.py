@@ -0,0 +1,273 @@
+"""
+Chain-tip watcher and tip-keyed caches for HODLXXI.
+
+Wallet balances, UTXO lists and address groupings only change when a block or
+mempool transaction arrives. The watcher polls a cheap fingerprint of the
+chain state (the best block hash, plus an opt-in, debounced mempool summary),
+optionally woken early by Bitcoin Core's ZMQ notifications, and publishes
+"tip changed" events.
+``TipCache`` keys entries on that fingerprint so results are served from
+memory until the chain moves.
+"""
+
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_POLL_INTERVAL = 2.0
+
+
+class RPCTipSource:
+    """
+    Fingerprint the chain with ``getbestblockhash``.
+
+    On a busy node the mempool changes on nearly every poll, so it is left out
+    by default and caches live for a whole block. With ``include_mempool`` the
+    ``getmempoolinfo`` summary is appended, but refreshed at most once per
+    ``mempool_interval`` seconds so unconfirmed activity invalidates caches at
+    that rate rather than on every poll.
+    """
+
+    def __init__(self, rpc_factory: Callable[[], Any], include_mempool: bool = False, mempool_interval: float = 30.0):
+        self._rpc_factory = rpc_factory
+        self.include_mempool = include_mempool
+        self.mempool_interval = mempool_interval
+        self._mempool_part = ""
+        self._mempool_at: Optional[float] = None
+
+    def fetch(self) -> str:
+        rpc = self._rpc_factory()
+        if not self.include_mempool:
+            return rpc.getbestblockhash()
+        now = time.monotonic()
+        if self._mempool_at is not None and now - self._mempool_at < self.mempool_interval:
+            return f"{rpc.getbestblockhash()}:{self._mempool_part}"
+        block_hash, mempool = rpc.batch([("getbestblockhash", []), ("getmempoolinfo", [])])
+        self._mempool_part = f"{mempool.get('size', 0)}:{mempool.get('bytes', 0)}:{mempool.get('total_fee', '')}"
+        self._mempool_at = now
+        return f"{block_hash}:{self._mempool_part}"
+
+
+class ManualTipSource:
+    """Local stand-in for tests and development: the tip only moves when told to."""
+
+    def __init__(self, tip: str = "genesis"):
+        self.tip = tip
+        self.fetches = 0
+        self.fail = False
+
+    def fetch(self) -> str:
+        self.fetches += 1
+        if self.fail:
+            raise ConnectionError("tip source unavailable")
+        return self.tip
+
+    def advance(self, tip: Optional[str] = None) -> str:
+        """Simulate a new block or mempool transaction."""
+        self.tip = tip or uuid.uuid4().hex
+        return self.tip
+
+
+class ZMQWakeup:
+    """
+    Optional ZMQ subscriber that wakes the watcher as soon as Core announces a
+    block or mempool change (``zmqpubhashblock`` / ``zmqpubsequence``).
+
+    Requires ``pyzmq``; when it is missing the watcher simply keeps polling.
+    """
+
+    TOPICS = (b"hashblock", b"sequence", b"hashtx")
+    BLOCK_TOPICS = (b"hashblock",)
+
+    def __init__(self, endpoint: str, topics: Sequence[bytes] = TOPICS):
+        import zmq  # optional dependency
+
+        self._zmq = zmq
+        self._ctx = zmq.Context.instance()
+        self._sock = self._ctx.socket(zmq.SUB)
+        for topic in topics:
+            self._sock.setsockopt(zmq.SUBSCRIBE, topic)
+        self._sock.connect(endpoint)
+
+    def wait(self, timeout: float) -> bool:
+        """Block up to ``timeout`` seconds; True if a notification arrived."""
+        if not self._sock.poll(int(timeout * 1000)):
+            return False
+        while self._sock.poll(0):  # drain bursts so one poll covers them all
+            self._sock.recv_multipart()
+        return True
+
+    def close(self) -> None:
+        self._sock.close(linger=0)
+
+
+class ChainTipWatcher:
+    """
+    Poll a tip source and notify subscribers when the fingerprint changes.
+
+    ``current`` is None until the first successful poll, and again whenever
+    polling has been failing for longer than ``max_staleness`` seconds, so
+    caches fall back to live queries instead of serving stale data.
+    """
+
+    def __init__(
+        self,
+        source: Any,
+        interval: float = DEFAULT_POLL_INTERVAL,
+        max_staleness: Optional[float] = None,
+        zmq_endpoint: Optional[str] = None,
+        zmq_topics: Sequence[bytes] = ZMQWakeup.TOPICS,
+    ):
+        self.source = source
+        self.interval = interval
+        self.max_staleness = max_staleness if max_staleness is not None else interval * 5
+        self.zmq_endpoint = zmq_endpoint
+        self.zmq_topics = zmq_topics
+        self._tip: Optional[str] = None
+        self._last_ok = 0.0
+        self._subscribers: List[Callable[[Optional[str], str], None]] = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.changes = 0
+        self.errors = 0
+
+    @property
+    def current(self) -> Optional[str]:
+        """Latest known tip fingerprint, or None if unknown/stale."""
+        if self._tip is None or (time.monotonic() - self._last_ok) > self.max_staleness:
+            return None
+        return self._tip
+
+    def subscribe(self, callback: Callable[[Optional[str], str], None]) -> None:
+        """Register ``callback(old_tip, new_tip)`` for tip changes."""
+        with self._lock:
+            self._subscribers.append(callback)
+
+    def poll(self) -> bool:
+        """Fetch the tip once. Returns True if it changed."""
+        try:
+            tip = self.source.fetch()
+        except Exception as e:
+            self.errors += 1
+            logger.debug(f"Chain tip poll failed: {e}")
+            return False
+
+        with self._lock:
+            self._last_ok = time.monotonic()
+            old = self._tip
+            if tip == old:
+                return False
+            self._tip = tip
+            self.changes += 1
+            subscribers = list(self._subscribers)
+
+        for callback in subscribers:
+            try:
+                callback(old, tip)
+            except Exception as e:
+                logger.error(f"Chain tip subscriber failed: {e}", exc_info=True)
+        return True
+
+    def start(self) -> None:
+        """Start the background polling thread (idempotent)."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="chain-tip-watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _run(self) -> None:
+        wakeup = None
+        if self.zmq_endpoint:
+            try:
+                wakeup = ZMQWakeup(self.zmq_endpoint, self.zmq_topics)
+                logger.info(f"Chain tip watcher subscribed to ZMQ at {self.zmq_endpoint}")
+            except Exception as e:
+                logger.warning(f"ZMQ unavailable ({e}); chain tip watcher will poll only")
+
+        while not self._stop.is_set():
+            self.poll()
+            if wakeup is not None:
+                try:
+                    wakeup.wait(self.interval)
+                    continue
+                except Exception as e:
+                    logger.warning(f"ZMQ wait failed ({e}); falling back to polling")
+                    wakeup = None
+            self._stop.wait(self.interval)
+
+        if wakeup is not None:
+            wakeup.close()
+
+    def stats(self) -> Dict[str, Any]:
+        """State for the metrics endpoint."""
+        return {
+            "tip": self._tip,
+            "fresh": self.current is not None,
+            "changes": self.changes,
+            "errors": self.errors,
+            "age_seconds": round(time.monotonic() - self._last_ok, 3) if self._last_ok else None,
+        }
+
+
+class TipCache:
+    """
+    Memoize results until the chain tip moves.
+
+    Entries are stored under the tip they were computed at and the whole cache
+    is dropped on every tip change. While the tip is unknown nothing is cached.
+    """
+
+    def __init__(self, watcher: ChainTipWatcher, maxsize: int = 1024):
+        self.watcher = watcher
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[Tuple[str, Any], Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        watcher.subscribe(lambda old, new: self.clear())
+
+    def get_or_compute(self, key: Any, compute: Callable[[], Any]) -> Any:
+        """Return the cached value for ``key`` at the current tip, computing it on a miss."""
+        tip = self.watcher.current
+        if tip is None:
+            self.misses += 1
+            return compute()
+
+        with self._lock:
+            if (tip, key) in self._entries:
+                self.hits += 1
+                self._entries.move_to_end((tip, key))
+                return self._entries[(tip, key)]
+            self.misses += 1
+
+        value = compute()
+        with self._lock:
+            # Only store if the chain did not move while we were computing
+            if self.watcher.current == tip:
+                self._entries[(tip, key)] = value
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+        return value
+
+    def invalidate(self, key: Any) -> None:
+        """Forget one key (e.g. after the app itself changed wallet state)."""
+        with self._lock:
+            for entry_key in [k for k in self._entries if k[1] == key]:
+                del self._entries[entry_key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"size": len(self._entries), "hits": self.hits, "misses": self.misses}
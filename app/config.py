@@ -22,6 +22,40 @@ def get_config() -> Dict[str, Any]:
         "RPC_USER": os.getenv("RPC_USER", "bitcoinrpc"),
         "RPC_PASSWORD": os.getenv("RPC_PASSWORD", "change-me"),
         "RPC_WALLET": os.getenv("RPC_WALLET", ""),
+        "RPC_POOL_SIZE": int(os.getenv("RPC_POOL_SIZE", "10")),
+        "RPC_TIMEOUT": float(os.getenv("RPC_TIMEOUT", "60")),
+        "RPC_CACHE_SIZE": int(os.getenv("RPC_CACHE_SIZE", "4096")),
+        "RPC_CACHE_REDIS_URL": os.getenv("RPC_CACHE_REDIS_URL", None),
+        "RPC_CACHE_REDIS_TTL": int(os.getenv("RPC_CACHE_REDIS_TTL", str(7 * 24 * 3600))),
+        "CHAIN_POLL_INTERVAL": float(os.getenv("CHAIN_POLL_INTERVAL", "2")),
+        "CHAIN_TIP_MEMPOOL": os.getenv("CHAIN_TIP_MEMPOOL", "false").lower() in ("1", "true", "yes"),
+        "CHAIN_TIP_MEMPOOL_INTERVAL": float(os.getenv("CHAIN_TIP_MEMPOOL_INTERVAL", "30")),
+        "BITCOIN_ZMQ_URL": os.getenv("BITCOIN_ZMQ_URL", None),
+        "BALANCE_CACHE_SIZE": int(os.getenv("BALANCE_CACHE_SIZE", "1024")),
+        "RPC_FANOUT_WORKERS": int(os.getenv("RPC_FANOUT_WORKERS", "16")),
+        "RPC_NODE_CONCURRENCY": int(os.getenv("RPC_NODE_CONCURRENCY", "4")),
+        "RPC_REQUEST_DEADLINE": float(os.getenv("RPC_REQUEST_DEADLINE", "30")),
+        "RPC_BREAKER_WINDOW": int(os.getenv("RPC_BREAKER_WINDOW", "20")),
+        "RPC_BREAKER_MIN_CALLS": int(os.getenv("RPC_BREAKER_MIN_CALLS", "5")),
+        "RPC_BREAKER_FAILURE_RATE": float(os.getenv("RPC_BREAKER_FAILURE_RATE", "0.5")),
+        "RPC_BREAKER_SLOW_CALL_SECONDS": float(os.getenv("RPC_BREAKER_SLOW_CALL_SECONDS", "5")),
+        "RPC_BREAKER_SLOW_CALL_RATE": float(os.getenv("RPC_BREAKER_SLOW_CALL_RATE", "0.8")),
+        "RPC_BREAKER_RESET_TIMEOUT": float(os.getenv("RPC_BREAKER_RESET_TIMEOUT", "15")),
+        "XPUB_DERIVER_KEYS": int(os.getenv("XPUB_DERIVER_KEYS", "64")),
+        "ACCESS_TABLE_MAX_LAG": float(os.getenv("ACCESS_TABLE_MAX_LAG", "30")),
+        "ACCESS_TABLE_REDIS_URL": os.getenv("ACCESS_TABLE_REDIS_URL", None),
+        "PRICE_SOURCES": os.getenv("PRICE_SOURCES", "coingecko"),
+        "PRICE_REFRESH_INTERVAL": float(os.getenv("PRICE_REFRESH_INTERVAL", "60")),
+        "PRICE_MAX_AGE": float(os.getenv("PRICE_MAX_AGE", "900")),
+        "PRICE_FIRST_WAIT": float(os.getenv("PRICE_FIRST_WAIT", "2")),
+        "QR_CACHE_MAX_BYTES": int(os.getenv("QR_CACHE_MAX_BYTES", str(32 * 1024 * 1024))),
+        "QR_CACHE_REDIS_URL": os.getenv("QR_CACHE_REDIS_URL", None),
+        "QR_CACHE_DIR": os.getenv("QR_CACHE_DIR", None),
+        "QR_CACHE_REDIS_TTL": int(os.getenv("QR_CACHE_REDIS_TTL", str(7 * 24 * 3600))),
+        "QR_CACHE_DIR_MAX_BYTES": int(os.getenv("QR_CACHE_DIR_MAX_BYTES", str(256 * 1024 * 1024))),
+        "QR_FORMAT": os.getenv("QR_FORMAT", "png"),
+        "CPU_OFFLOAD_WORKERS": int(os.getenv("CPU_OFFLOAD_WORKERS", "4")),
+        "CPU_OFFLOAD_MAX_QUEUE": int(os.getenv("CPU_OFFLOAD_MAX_QUEUE", "64")),
         # Flask Configuration
         "FLASK_SECRET_KEY": os.getenv("FLASK_SECRET_KEY", None),
         "FLASK_ENV": os.getenv("FLASK_ENV", "development"),
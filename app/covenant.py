@@ -0,0 +1,142 @@
+"""
+Single-pass covenant parser for HODLXXI explorer views.
+
+Rendering one covenant card used to walk the same ASM five times
+(``extract_pubkey_from_op_if``, ``extract_pubkey_from_op_else``,
+``format_asm``, ``mask_timelocks`` and the pubkey token scan), running
+``re.fullmatch`` on every token in each pass. ``parse_covenant`` tokenizes
+the ASM once and returns an immutable ``Covenant`` with everything those
+helpers computed:
+
+* ``op_if_pub`` - first pubkey within five tokens after an ``OP_IF``
+* ``op_else_pub`` - first pubkey after the first ``OP_ELSE``
+* ``pubkeys`` - every distinct pubkey in the script (what ``CovenantIndex`` indexes)
+* ``formatted_asm`` - the explorer's HTML ASM (clickable ``OP_IF`` keys, four ops per line)
+
+``mask_descriptor`` gives the explorer's masked descriptor (CLTV value hidden,
+``OP_ELSE`` key shortened) from precompiled patterns.
+
+Results are memoized by ASM text, which is a function of the script, so
+repeated requests for the same covenants cost a dictionary lookup. The
+script-hex masking is memoized separately by script hex.
+"""
+
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+COVENANT_CACHE_SIZE = 8192
+
+_TIMELOCK_OPS = ("OP_CHECKLOCKTIMEVERIFY", "OP_CHECKSEQUENCEVERIFY")
+_OP_IF_WINDOW = 5
+_HEX_RE = re.compile(r"[0-9a-fA-F]+")
+_RAW_DESC_RE = re.compile(r"raw\((?P<hex>[0-9a-fA-F]+)\)(?P<suffix>.*)")
+_CLTV_PUSH_RE = re.compile(r"(03)[0-9a-fA-F]{6}(?=b1)")
+_ELSE_KEY_RE = re.compile(r"(b17521)((?:[0-9a-fA-F]{66}|[0-9a-fA-F]{130}))")
+
+
+def _is_pubkey(token: str) -> bool:
+    return len(token) in (66, 130) and _HEX_RE.fullmatch(token) is not None
+
+
+def shorten_pubkey(pubkey: str) -> str:
+    byte_len = len(pubkey) // 2
+    n = (byte_len - 31) * 2 if byte_len > 31 else 4
+    return pubkey[-n:]
+
+
+def clickable_trunc(pubkey: str) -> str:
+    short = shorten_pubkey(pubkey)
+    return f'<span class="clickable-pubkey" onclick="handlePubKeyClick(\'{pubkey}\');"><span style="color:red;">{short}</span></span>'
+
+
+def _clickable(pubkey: str) -> str:
+    return f'<span class="clickable-pubkey" onclick="handlePubKeyClick(\'{pubkey}\');">{pubkey}</span>'
+
+
+def mask_timelocks(text: str) -> str:
+    """Replace the numeric argument of CLTV/CSV with ``*****``."""
+    out: List[str] = []
+    for token in text.split():
+        if token in _TIMELOCK_OPS and out and out[-1].isdigit():
+            out[-1] = "*****"
+        out.append(token)
+    return " ".join(out)
+
+
+@lru_cache(maxsize=COVENANT_CACHE_SIZE)
+def mask_script_hex(script_hex: str) -> str:
+    """Script hex with the 3-byte CLTV push hidden and the ``OP_ELSE`` key made clickable."""
+    masked = _CLTV_PUSH_RE.sub(r"\1*****", script_hex)
+    return _ELSE_KEY_RE.sub(lambda m: m.group(1) + clickable_trunc(m.group(2)), masked)
+
+
+def mask_descriptor(descriptor: str) -> str:
+    """Explorer view of a descriptor: masked script for ``raw(...)``, masked timelocks otherwise."""
+    if descriptor.startswith("raw("):
+        m = _RAW_DESC_RE.match(descriptor)
+        return f"raw({mask_script_hex(m.group('hex'))}){m.group('suffix')}" if m else descriptor
+    return mask_timelocks(descriptor)
+
+
+@dataclass(frozen=True)
+class Covenant:
+    asm: str
+    op_if_pub: Optional[str]
+    op_else_pub: Optional[str]
+    pubkeys: Tuple[str, ...]
+    formatted_asm: str
+
+    @property
+    def branches(self) -> Tuple[Optional[str], Optional[str]]:
+        return self.op_if_pub, self.op_else_pub
+
+
+@lru_cache(maxsize=COVENANT_CACHE_SIZE)
+def parse_covenant(asm: str) -> Covenant:
+    """Parse a covenant's ASM in one pass."""
+    tokens = asm.split()
+    op_if_pub = op_else_pub = None
+    if_window_end = -1  # last token index still inside some OP_IF's five-token window
+    seen_else = False
+    in_if = False
+    pubkeys: List[str] = []
+    formatted: List[str] = []
+
+    for i, tok in enumerate(tokens):
+        if tok == "OP_IF":
+            in_if = True
+            if op_if_pub is None:
+                if_window_end = i + _OP_IF_WINDOW
+        elif tok == "OP_ENDIF":
+            in_if = False
+        elif tok == "OP_ELSE":
+            seen_else = True
+
+        if _is_pubkey(tok):
+            pubkeys.append(tok)
+            if op_if_pub is None and i <= if_window_end:
+                op_if_pub = tok
+            if seen_else and op_else_pub is None:
+                op_else_pub = tok
+            formatted.append(_clickable(tok) if in_if and len(tok) == 66 else tok)
+        else:
+            formatted.append(tok)
+
+    return Covenant(
+        asm=asm,
+        op_if_pub=op_if_pub,
+        op_else_pub=op_else_pub,
+        pubkeys=tuple(dict.fromkeys(pubkeys)),
+        formatted_asm="\n".join(" ".join(formatted[i : i + 4]) for i in range(0, len(formatted), 4)),
+    )
+
+
+def stats() -> Dict[str, Any]:
+    """Memo hit rates for the metrics endpoint."""
+    out: Dict[str, Any] = {}
+    for name, fn in (("parse_covenant", parse_covenant), ("mask_script_hex", mask_script_hex)):
+        info = fn.cache_info()
+        out[name] = {"hits": info.hits, "misses": info.misses, "size": info.currsize, "max_size": info.maxsize}
+    return out
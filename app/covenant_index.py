@@ -0,0 +1,227 @@
+"""
+In-memory covenant index for HODLXXI.
+
+Maps every public key that appears in a wallet ``raw(...)`` covenant to the
+covenants that contain it, so pubkey lookups cost O(matches) instead of
+decoding and tokenizing every descriptor on every request. Keys are indexed
+by full hex and by x-only hex; an npub query is decoded once to its x-only
+key rather than encoding every script token as an npub.
+
+The index is keyed by script hex: it is built once from ``listdescriptors``,
+kept in sync incrementally (only unseen scripts are decoded) and updated
+directly when a descriptor is imported through the app.
+"""
+
+import itertools
+import logging
+import re
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_RAW_RE = re.compile(r"raw\(([0-9A-Fa-f]+)\)")
+
+
+@dataclass
+class CovenantEntry:
+    """One decoded covenant and the keys it references."""
+
+    script: str
+    descriptor: str
+    asm: str
+    script_hex: Optional[str]
+    segwit_hex: Optional[str]
+    segwit_address: Optional[str]
+    p2sh_address: Optional[str]
+    op_if_pub: Optional[str]
+    op_else_pub: Optional[str]
+    pubkeys: Tuple[str, ...] = ()
+    x_only: Tuple[str, ...] = ()
+    seq: int = field(default=0, compare=False)
+
+
+def script_from_descriptor(descriptor: str) -> Optional[str]:
+    """Innermost raw(<HEX>) of a descriptor, lower-cased, or None."""
+    m = _RAW_RE.search(descriptor or "")
+    return m.group(1).lower() if m else None
+
+
+def _p2sh_address(decoded: Dict[str, Any]) -> Optional[str]:
+    # Core reports "p2sh" as a plain address; older callers expected {"address": ...}
+    p2sh = decoded.get("p2sh")
+    if isinstance(p2sh, dict):
+        return p2sh.get("address")
+    return p2sh or None
+
+
+class CovenantIndex:
+    """
+    Thread-safe pubkey → covenant index.
+
+    Args:
+        parser: Parses an ASM string into an object with ``op_if_pub``, ``op_else_pub``
+            and ``pubkeys`` (e.g. ``covenant.parse_covenant``), so each script is tokenized once
+        npub_decoder: Converts an npub to its x-only hex key (e.g. ``bech32_codec.npub_to_hex``)
+        decoder: Local ``decodescript`` replacement; scripts it cannot decode
+            (and all scripts, when unset) are decoded by the node
+    """
+
+    def __init__(
+        self,
+        parser: Callable[[str], Any],
+        npub_decoder: Optional[Callable[[str], str]] = None,
+        decoder: Optional[Callable[[str], Dict[str, Any]]] = None,
+    ):
+        self._parser = parser
+        self._npub_decoder = npub_decoder
+        self._decoder = decoder
+        self._entries: Dict[str, CovenantEntry] = {}
+        self._by_key: Dict[str, set] = {}
+        self._seq = itertools.count()
+        self._lock = threading.RLock()
+        self.built = False
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, script: str) -> bool:
+        return (script or "").lower() in self._entries
+
+    def entries(self) -> List[CovenantEntry]:
+        """All covenants in wallet order."""
+        with self._lock:
+            return sorted(self._entries.values(), key=lambda e: e.seq)
+
+    def get(self, script: str) -> Optional[CovenantEntry]:
+        """Covenant for a raw script hex, if indexed."""
+        return self._entries.get((script or "").lower())
+
+    def lookup(self, pubkey: str) -> List[CovenantEntry]:
+        """Covenants containing ``pubkey`` (hex or npub), in wallet order."""
+        key = (pubkey or "").strip()
+        if key.startswith("npub"):
+            if not self._npub_decoder:
+                return []
+            try:
+                key = "x:" + self._npub_decoder(key).lower()
+            except ValueError:
+                return []
+        else:
+            key = key.lower()
+        with self._lock:
+            scripts = self._by_key.get(key, ())
+            return sorted((self._entries[s] for s in scripts), key=lambda e: e.seq)
+
+    def add(self, descriptor: str, decoded: Dict[str, Any]) -> Optional[CovenantEntry]:
+        """Index (or refresh) one covenant from its ``decodescript`` result."""
+        script = script_from_descriptor(descriptor)
+        if not script:
+            return None
+
+        asm = decoded.get("asm", "") or ""
+        segwit = decoded.get("segwit") or {}
+        parsed = self._parser(asm)
+        pubkeys = [pk.lower() for pk in parsed.pubkeys]
+        x_only = ["x:" + pk[2:66] for pk in pubkeys]
+
+        with self._lock:
+            previous = self._entries.get(script)
+            entry = CovenantEntry(
+                script=script,
+                descriptor=descriptor,
+                asm=asm,
+                script_hex=decoded.get("hex") or segwit.get("hex"),
+                segwit_hex=segwit.get("hex"),
+                segwit_address=segwit.get("address") or (decoded.get("addresses") or [None])[0],
+                p2sh_address=_p2sh_address(decoded),
+                op_if_pub=parsed.op_if_pub,
+                op_else_pub=parsed.op_else_pub,
+                pubkeys=tuple(dict.fromkeys(pubkeys)),
+                x_only=tuple(dict.fromkeys(x_only)),
+                seq=previous.seq if previous else next(self._seq),
+            )
+            if previous:
+                self._unlink(previous)
+            self._entries[script] = entry
+            for key in entry.pubkeys + entry.x_only:
+                self._by_key.setdefault(key, set()).add(script)
+        return entry
+
+    def remove(self, script: str) -> None:
+        """Drop a covenant from the index."""
+        with self._lock:
+            entry = self._entries.pop((script or "").lower(), None)
+            if entry:
+                self._unlink(entry)
+
+    def sync(self, rpc, descriptors: Optional[Iterable[Dict[str, Any]]] = None) -> int:
+        """
+        Bring the index in line with the wallet.
+
+        Only scripts that are not indexed yet are decoded (locally, or in one
+        batch); covenants no longer in the wallet are dropped.
+
+        Args:
+            rpc: RPC client with ``batch`` and ``listdescriptors``
+            descriptors: ``listdescriptors()["descriptors"]`` if already fetched
+
+        Returns:
+            Number of newly indexed covenants.
+        """
+        if descriptors is None:
+            descriptors = rpc.listdescriptors().get("descriptors", [])
+
+        wanted: Dict[str, str] = {}
+        for d in descriptors:
+            desc = d.get("desc", "")
+            script = script_from_descriptor(desc)
+            if script and script not in wanted:
+                wanted[script] = desc
+
+        with self._lock:
+            stale = [s for s in self._entries if s not in wanted]
+            for script in stale:
+                self.remove(script)
+            for script, desc in wanted.items():
+                entry = self._entries.get(script)
+                if entry and entry.descriptor != desc:
+                    entry.descriptor = desc
+            new = [(script, desc) for script, desc in wanted.items() if script not in self._entries]
+
+        if new and self._decoder is not None:
+            remaining = []
+            for script, desc in new:
+                try:
+                    self.add(desc, self._decoder(script))
+                except Exception as e:
+                    logger.debug(f"Covenant index: local decode failed for {script[:16]}…: {e}")
+                    remaining.append((script, desc))
+            added, new = len(new) - len(remaining), remaining
+        else:
+            added = 0
+
+        if new:
+            decoded_all = rpc.batch([("decodescript", [script]) for script, _ in new], return_exceptions=True)
+            for (script, desc), decoded in zip(new, decoded_all):
+                if isinstance(decoded, dict):
+                    self.add(desc, decoded)
+                    added += 1
+                else:
+                    logger.warning(f"Covenant index: decodescript failed for {script[:16]}…: {decoded}")
+
+        self.built = True
+        return added
+
+    def stats(self) -> Dict[str, Any]:
+        """Sizes for the metrics endpoint."""
+        return {"covenants": len(self._entries), "keys": len(self._by_key), "built": self.built}
+
+    def _unlink(self, entry: CovenantEntry) -> None:
+        for key in entry.pubkeys + entry.x_only:
+            scripts = self._by_key.get(key)
+            if scripts is not None:
+                scripts.discard(entry.script)
+                if not scripts:
+                    del self._by_key[key]
@@ -0,0 +1,136 @@
+"""
+Pagination and field selection for covenant listings.
+
+``verify_pubkey_and_list`` used to return every matching covenant with every
+field (masked script, ASM, QR, npubs, balances). Clients that only need a
+summary row can now ask for less:
+
+* ``fields=`` picks card fields by name or by group (``summary``,
+  ``balances``, ``npubs``, ``details``, ``qr``); groups that are not asked
+  for are never computed
+* ``limit``/``cursor`` page through the covenants in script-hex order, which
+  does not depend on wallet or index order, so a cursor stays valid across
+  workers, restarts and covenants being added or removed
+* every card carries an ``id``; ``ids=`` fetches just those covenants, e.g.
+  the details of a card the user expanded
+
+Covenant ids and cursors are the raw script, base64url-encoded.
+"""
+
+import base64
+import binascii
+from typing import Callable, FrozenSet, Iterable, List, Optional, Sequence, Tuple, TypeVar
+
+T = TypeVar("T")
+
+MAX_LIMIT = 500
+
+FIELD_GROUPS = {
+    "summary": (
+        "address",
+        "truncated_address",
+        "op_if_pub",
+        "op_else_pub",
+        "counterparty_pubkey",
+        "counterparty_online",
+    ),
+    "balances": ("balance_usd", "saving_balance_usd", "checking_balance_usd"),
+    "npubs": ("nostr_npub", "nostr_npub_truncated", "op_if_npub", "op_else_npub"),
+    "details": ("raw", "asm", "script_hex", "raw_script", "onboard_link"),
+    "qr": ("qr_code",),
+}
+CARD_FIELDS: FrozenSet[str] = frozenset(f for group in FIELD_GROUPS.values() for f in group)
+
+
+class ListingError(ValueError):
+    """Malformed ``fields``, ``limit``, ``cursor`` or ``ids`` parameter."""
+
+
+def covenant_id(script: str) -> str:
+    """Stable, URL-safe id of a covenant (its raw script)."""
+    return base64.urlsafe_b64encode(bytes.fromhex(script)).decode("ascii").rstrip("=")
+
+
+def script_from_id(token: str) -> str:
+    """Lower-case script hex named by ``covenant_id``; raises ListingError if malformed."""
+    try:
+        raw = base64.b64decode(token + "=" * (-len(token) % 4), altchars=b"-_", validate=True)
+    except (ValueError, binascii.Error) as e:
+        raise ListingError(f"malformed covenant id: {token!r}") from e
+    if not raw:
+        raise ListingError("empty covenant id")
+    return raw.hex()
+
+
+def parse_fields(spec: Optional[str]) -> Optional[FrozenSet[str]]:
+    """
+    Field names selected by a comma-separated ``fields=`` value.
+
+    Returns:
+        None (every field) when ``spec`` is empty, otherwise the selected names
+
+    Raises:
+        ListingError: On an unknown field or group name
+    """
+    if not spec or not spec.strip():
+        return None
+    selected = set()
+    for name in (part.strip() for part in spec.split(",")):
+        if not name:
+            continue
+        if name in FIELD_GROUPS:
+            selected.update(FIELD_GROUPS[name])
+        elif name in CARD_FIELDS or name == "id":
+            selected.add(name)
+        else:
+            raise ListingError(f"unknown field: {name!r}")
+    selected.discard("id")  # always present
+    return frozenset(selected)
+
+
+def parse_limit(value: Optional[str]) -> Optional[int]:
+    """Page size from ``limit=`` (None means no limit); raises ListingError outside 1..MAX_LIMIT."""
+    if value is None or value == "":
+        return None
+    try:
+        limit = int(value)
+    except ValueError:
+        raise ListingError(f"limit must be an integer, got {value!r}") from None
+    if not 1 <= limit <= MAX_LIMIT:
+        raise ListingError(f"limit must be between 1 and {MAX_LIMIT}")
+    return limit
+
+
+def parse_ids(spec: Optional[str]) -> Optional[FrozenSet[str]]:
+    """Scripts named by a comma-separated ``ids=`` value, or None when absent."""
+    if not spec or not spec.strip():
+        return None
+    return frozenset(script_from_id(part.strip()) for part in spec.split(",") if part.strip())
+
+
+def paginate(
+    items: Iterable[T],
+    script_of: Callable[[T], str],
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+) -> Tuple[List[T], Optional[str]]:
+    """
+    One page of ``items`` in script-hex order.
+
+    Args:
+        items: Covenants to page through
+        script_of: Returns an item's lower-case script hex
+        limit: Page size (None for everything after the cursor)
+        cursor: ``next_cursor`` from the previous page
+
+    Returns:
+        ``(page, next_cursor)``; ``next_cursor`` is None on the last page
+    """
+    after = script_from_id(cursor) if cursor else None
+    ordered: Sequence[T] = sorted(items, key=script_of)
+    if after is not None:
+        ordered = [item for item in ordered if script_of(item) > after]
+    if limit is None or len(ordered) <= limit:
+        return list(ordered), None
+    page = list(ordered[:limit])
+    return page, covenant_id(script_of(page[-1]))
@@ -0,0 +1,116 @@
+"""
+Offload CPU-bound work (QR rendering, signature checks) off the gevent hub.
+
+Under gunicorn's gevent workers every request on a worker shares one OS
+thread. A 30 ms QR render or a burst of signature verifications run there
+would stall every socket on the worker (chat, signaling, LNURL polling) for
+that long. ``CPUOffload`` runs such calls on a small pool of *native* threads:
+
+* when ``threading`` is monkey-patched it uses ``gevent.threadpool``, whose
+  workers are real OS threads; the calling greenlet yields to the hub while
+  it waits. Without gevent it is a plain ``ThreadPoolExecutor``
+* C code that releases the GIL (zlib, libsecp256k1 via coincurve) runs truly
+  in parallel; pure-Python work still shares the GIL, but the interpreter
+  switches threads every few milliseconds, so the hub keeps getting turns
+* the pool is bounded: beyond ``max_workers + max_queue`` tasks in flight,
+  calls run inline instead of queueing without limit (counted in ``inline``)
+
+Offloaded callables must be self-contained CPU work: they must not touch
+gevent objects or monkey-patched locks, which belong to the hub's thread.
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_WORKERS = 4
+DEFAULT_MAX_QUEUE = 64
+
+
+def _gevent_patched() -> bool:
+    try:
+        from gevent import monkey
+    except ImportError:
+        return False
+    return monkey.is_module_patched("threading")
+
+
+class CPUOffload:
+    """
+    Bounded native-thread pool for CPU-bound calls.
+
+    Args:
+        max_workers: Native worker threads
+        max_queue: Tasks allowed to wait for a worker before calls run inline
+    """
+
+    def __init__(self, max_workers: int = DEFAULT_MAX_WORKERS, max_queue: int = DEFAULT_MAX_QUEUE):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.green = _gevent_patched()
+        if self.green:
+            from gevent.threadpool import ThreadPoolExecutor as NativeThreadPoolExecutor
+
+            self._pool = NativeThreadPoolExecutor(max_workers=max_workers)
+        else:
+            self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="cpu-offload")
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.submitted = 0
+        self.inline = 0
+        self.errors = 0
+        self._latency_total = 0.0
+        self.max_latency = 0.0
+
+    def run(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Call ``fn(*args, **kwargs)`` on a pool thread and return its result (exceptions propagate)."""
+        with self._lock:
+            if self.in_flight >= self.max_workers + self.max_queue:
+                self.inline += 1
+                saturated = True
+            else:
+                saturated = False
+                self.in_flight += 1
+                self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+                self.submitted += 1
+        if saturated:
+            return fn(*args, **kwargs)
+
+        start = time.monotonic()
+        try:
+            return self._pool.submit(fn, *args, **kwargs).result()
+        except Exception:
+            with self._lock:
+                self.errors += 1
+            raise
+        finally:
+            elapsed = time.monotonic() - start
+            with self._lock:
+                self.in_flight -= 1
+                self._latency_total += elapsed
+                self.max_latency = max(self.max_latency, elapsed)
+
+    def shutdown(self) -> None:
+        self._pool.shutdown(wait=False)
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth and latency for the metrics endpoint."""
+        with self._lock:
+            return {
+                "backend": "gevent-threadpool" if self.green else "threadpool",
+                "workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "in_flight": self.in_flight,
+                "queued": max(0, self.in_flight - self.max_workers),
+                "peak_in_flight": self.peak_in_flight,
+                "submitted": self.submitted,
+                "inline": self.inline,
+                "errors": self.errors,
+                "avg_latency_ms": round(self._latency_total / self.submitted * 1000, 3) if self.submitted else None,
+                "max_latency_ms": round(self.max_latency * 1000, 3),
+            }
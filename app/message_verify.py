@@ -0,0 +1,159 @@
+"""
+In-process Bitcoin signed-message verification for HODLXXI.
+
+Implements the legacy "Bitcoin Signed Message" scheme exactly like Bitcoin
+Core's ``verifymessage`` (``MessageVerify`` in ``src/util/message.cpp``), so
+logins no longer need a round trip to the node:
+
+* the message digest is ``SHA256d(ser("Bitcoin Signed Message:\\n") || ser(message))``
+* the signature is 65 base64-encoded bytes: a header byte carrying the
+  recovery id (``(h - 27) & 3``) and compression flag (``(h - 27) & 4``),
+  followed by ``r || s``
+* the recovered public key must hash to the P2PKH address
+
+As with the RPC, a malformed address or base64 string is an error, while a
+signature that does not recover or recovers to another key is just ``False``.
+"""
+
+import base64
+import hashlib
+from typing import Dict, Iterable, Optional
+
+import base58
+from coincurve import PublicKey
+
+MESSAGE_MAGIC = b"Bitcoin Signed Message:\n"
+COMPACT_SIGNATURE_SIZE = 65
+P2PKH_MAINNET = 0x00
+
+
+class MessageVerifyError(ValueError):
+    """Invalid input that Core would reject with an RPC error (not a ``false`` result)."""
+
+
+def _compact_size(n: int) -> bytes:
+    if n < 0xFD:
+        return bytes([n])
+    if n <= 0xFFFF:
+        return b"\xfd" + n.to_bytes(2, "little")
+    if n <= 0xFFFFFFFF:
+        return b"\xfe" + n.to_bytes(4, "little")
+    return b"\xff" + n.to_bytes(8, "little")
+
+
+def message_hash(message: str) -> bytes:
+    """Double-SHA256 digest that Bitcoin wallets sign for ``message``."""
+    msg = message.encode("utf-8")
+    data = _compact_size(len(MESSAGE_MAGIC)) + MESSAGE_MAGIC + _compact_size(len(msg)) + msg
+    return hashlib.sha256(hashlib.sha256(data).digest()).digest()
+
+
+def hash160(data: bytes) -> bytes:
+    return hashlib.new("ripemd160", hashlib.sha256(data).digest()).digest()
+
+
+def decode_signature(signature_b64: str) -> bytes:
+    """Strict base64 decode of a signature (raises ``MessageVerifyError`` like Core)."""
+    try:
+        return base64.b64decode(signature_b64, validate=True)
+    except (ValueError, TypeError) as e:
+        raise MessageVerifyError("Malformed base64 encoding") from e
+
+
+def recover_pubkey(signature_b64: str, message: str) -> Optional[bytes]:
+    """
+    Recover the signer's serialized public key (compressed or not, per the header).
+
+    Returns:
+        The public key bytes, or None if the signature cannot be recovered.
+    """
+    sig = decode_signature(signature_b64)
+    if len(sig) != COMPACT_SIGNATURE_SIZE:
+        return None
+
+    header = sig[0] - 27
+    recid = header & 3
+    compressed = bool(header & 4)
+    try:
+        pub = PublicKey.from_signature_and_message(sig[1:] + bytes([recid]), message_hash(message), hasher=None)
+    except Exception:
+        return None
+    return pub.format(compressed=compressed)
+
+
+def decode_p2pkh_address(address: str, versions: Iterable[int] = (P2PKH_MAINNET,)) -> bytes:
+    """Return the 20-byte key hash of a P2PKH address (raises ``MessageVerifyError`` otherwise)."""
+    try:
+        payload = base58.b58decode_check(address)
+    except Exception as e:
+        raise MessageVerifyError("Invalid address") from e
+    if len(payload) != 21:
+        raise MessageVerifyError("Invalid address")
+    if payload[0] not in tuple(versions):
+        raise MessageVerifyError("Address does not refer to key")
+    return payload[1:]
+
+
+def verify_message(
+    address: str, signature_b64: str, message: str, versions: Iterable[int] = (P2PKH_MAINNET,)
+) -> bool:
+    """
+    Local equivalent of ``rpc.verifymessage(address, signature, message)``.
+
+    Args:
+        versions: Accepted P2PKH version bytes (mainnet by default, like the app's addresses)
+
+    Raises:
+        MessageVerifyError: For an invalid/non-P2PKH address or malformed base64
+    """
+    key_hash = decode_p2pkh_address(address, versions)
+    pub = recover_pubkey(signature_b64, message)
+    return pub is not None and hash160(pub) == key_hash
+
+
+def verify_message_for_pubkey(pubkey_hex: str, signature_b64: str, message: str) -> bool:
+    """
+    True if ``signature_b64`` over ``message`` was made by ``pubkey_hex``.
+
+    Same result as ``verifymessage`` against the pubkey's legacy P2PKH address:
+    the signature's compression flag must match the key's serialization.
+    """
+    try:
+        expected = bytes.fromhex(pubkey_hex)
+    except ValueError as e:
+        raise MessageVerifyError("Invalid public key") from e
+    pub = recover_pubkey(signature_b64, message)
+    return pub is not None and pub == expected
+
+
+class SignerIndex:
+    """
+    Precomputed key-hash → pubkey map for a fixed set of signers.
+
+    Instead of trying ``verifymessage`` once per candidate, the signer's key is
+    recovered from the signature once and looked up here, so matching costs
+    the same for 1 or 1000 candidates. Results are identical to verifying
+    against each candidate's legacy P2PKH address in list order.
+    """
+
+    def __init__(self, pubkeys: Iterable[str]):
+        self._by_hash: Dict[bytes, str] = {}
+        for pubkey in pubkeys:
+            try:
+                key_hash = hash160(bytes.fromhex(pubkey))
+            except ValueError:
+                continue
+            self._by_hash.setdefault(key_hash, pubkey)  # first listed wins, like the old loop
+
+    def __len__(self) -> int:
+        return len(self._by_hash)
+
+    def match(self, signature_b64: str, message: str) -> Optional[str]:
+        """Pubkey (as listed) that produced ``signature_b64`` over ``message``, or None."""
+        if not self._by_hash:
+            return None
+        try:
+            pub = recover_pubkey(signature_b64, message)
+        except MessageVerifyError:
+            return None
+        return self._by_hash.get(hash160(pub)) if pub is not None else None
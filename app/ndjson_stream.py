@@ -0,0 +1,81 @@
+"""
+NDJSON streaming for covenant listings.
+
+``verify_pubkey_and_list`` can answer ``application/x-ndjson`` instead of one
+JSON document, so the home page gets a response before the node is queried
+and renders the first covenant card before the whole listing is built. A
+stream is a sequence of one-line JSON events:
+
+* ``start`` - sent before any RPC work, with the cached ``btc_price``
+* ``descriptor`` - one covenant card, emitted as soon as it is built
+* ``end`` - ``count`` of cards sent and the page's ``next_cursor``
+
+Once headers are out a failure can no longer change the status code, so
+anything that goes wrong after ``start`` (no matching covenant, the node
+being unavailable, a card that raises) ends the stream with an ``error``
+event instead of ``end``.
+"""
+
+import json
+import logging
+from typing import Any, Callable, Dict, Iterable, Iterator, Mapping, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+NDJSON_MIMETYPE = "application/x-ndjson"
+
+
+class StreamError(Exception):
+    """An expected failure, sent as an ``error`` event (with ``fields`` merged in) and not logged."""
+
+    def __init__(self, message: str, **fields: Any):
+        super().__init__(message)
+        self.fields = fields
+
+
+def stream_requested(args: Mapping[str, str], accept: Optional[str]) -> bool:
+    """
+    Whether a listing should stream.
+
+    An explicit ``?stream=`` wins (``1``/``true``/``yes`` stream, anything else
+    does not); without it, streaming follows ``Accept: application/x-ndjson``.
+    """
+    flag = args.get("stream")
+    if flag is not None:
+        return str(flag).lower() in ("1", "true", "yes")
+    return NDJSON_MIMETYPE in (accept or "")
+
+
+def ndjson_lines(events: Iterable[Dict[str, Any]]) -> Iterator[str]:
+    """Serialise each event as one compact JSON line."""
+    for event in events:
+        yield json.dumps(event, separators=(",", ":"), default=str) + "\n"
+
+
+def covenant_card_events(
+    load: Callable[[], Tuple[Iterable[Dict[str, Any]], Optional[str]]],
+    price_info: Optional[Dict[str, Any]] = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    ``start`` straight away, then one ``descriptor`` per card and ``end`` (or ``error``).
+
+    Args:
+        load: Does the RPC work and returns ``(cards, next_cursor)``; only called
+            once ``start`` has been yielded. Cards are consumed one at a time.
+        price_info: ``btc_price`` for the ``start`` event
+    """
+    yield {"event": "start", "valid": True, "btc_price": price_info}
+    sent = 0
+    try:
+        cards, next_cursor = load()
+        for card in cards:
+            yield {"event": "descriptor", "descriptor": card}
+            sent += 1
+    except StreamError as e:
+        yield {"event": "error", "valid": False, "error": str(e), "count": sent, **e.fields}
+        return
+    except Exception as e:
+        logger.exception("Covenant listing stream failed after %d cards", sent)
+        yield {"event": "error", "valid": False, "error": str(e), "count": sent}
+        return
+    yield {"event": "end", "count": sent, "next_cursor": next_cursor}
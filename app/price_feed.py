@@ -0,0 +1,233 @@
+"""
+Background BTC price feed with stale-while-revalidate semantics.
+
+Request handlers used to call CoinGecko synchronously (5 s timeout), so one
+slow upstream stalled every explorer request. ``PriceFeed`` refreshes on an
+interval in a background thread over a keep-alive session and hands out the
+last good quote together with its age:
+
+* sources are tried in order until one answers (``CoinGeckoSource``,
+  ``KrakenSource``, or ``StaticSource`` as a local stub)
+* a failed refresh keeps the previous quote; it is still served, with its
+  growing age, until it is older than ``max_age``
+* reading a quote never blocks on the network (except for an optional short
+  wait for the very first value after startup)
+
+Sources are configured with a comma-separated spec, e.g.
+``"coingecko,kraken"`` or ``"static:65000"``.
+"""
+
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from decimal import Decimal, InvalidOperation
+from typing import Any, Dict, List, Optional, Sequence
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INTERVAL = 60.0
+DEFAULT_MAX_AGE = 900.0
+DEFAULT_TIMEOUT = 5.0
+
+
+class PriceSourceError(Exception):
+    """A source could not produce a price."""
+
+
+def _positive_decimal(value: Any) -> Decimal:
+    try:
+        price = Decimal(str(value))
+    except (InvalidOperation, ValueError) as e:
+        raise PriceSourceError(f"not a number: {value!r}") from e
+    if not price.is_finite() or price <= 0:
+        raise PriceSourceError(f"implausible price: {value!r}")
+    return price
+
+
+class CoinGeckoSource:
+    name = "coingecko"
+
+    def __init__(self, url: str = "https://api.coingecko.com/api/v3/simple/price", currency: str = "usd"):
+        self.url = url
+        self.currency = currency
+
+    def fetch(self, session: requests.Session, timeout: float) -> Decimal:
+        resp = session.get(self.url, params={"ids": "bitcoin", "vs_currencies": self.currency}, timeout=timeout)
+        resp.raise_for_status()
+        return _positive_decimal(resp.json().get("bitcoin", {}).get(self.currency))
+
+
+class KrakenSource:
+    name = "kraken"
+
+    def __init__(self, url: str = "https://api.kraken.com/0/public/Ticker", pair: str = "XBTUSD"):
+        self.url = url
+        self.pair = pair
+
+    def fetch(self, session: requests.Session, timeout: float) -> Decimal:
+        resp = session.get(self.url, params={"pair": self.pair}, timeout=timeout)
+        resp.raise_for_status()
+        body = resp.json()
+        if body.get("error"):
+            raise PriceSourceError("; ".join(body["error"]))
+        (ticker,) = body.get("result", {}).values()
+        return _positive_decimal(ticker["c"][0])  # last trade price
+
+
+class StaticSource:
+    """Fixed price; a network-free stub for tests and offline development."""
+
+    name = "static"
+
+    def __init__(self, price: Any):
+        self.price = _positive_decimal(price)
+
+    def fetch(self, session: requests.Session, timeout: float) -> Decimal:
+        return self.price
+
+
+def sources_from_spec(spec: str) -> List[Any]:
+    """Build sources from ``"coingecko,kraken"`` / ``"static:65000"``."""
+    sources: List[Any] = []
+    for item in (part.strip() for part in (spec or "").split(",")):
+        if not item:
+            continue
+        name, _, arg = item.partition(":")
+        if name == "coingecko":
+            sources.append(CoinGeckoSource())
+        elif name == "kraken":
+            sources.append(KrakenSource())
+        elif name == "static":
+            sources.append(StaticSource(arg))
+        else:
+            raise ValueError(f"Unknown price source: {name}")
+    return sources
+
+
+@dataclass(frozen=True)
+class PriceQuote:
+    price: Decimal
+    source: str
+    fetched_at: float  # wall-clock time, for display
+    monotonic_at: float
+
+    @property
+    def age(self) -> float:
+        return time.monotonic() - self.monotonic_at
+
+
+class PriceFeed:
+    """
+    Periodically refreshed BTC price.
+
+    Args:
+        sources: Price sources, tried in order on each refresh
+        interval: Seconds between refreshes
+        max_age: Quotes older than this are no longer served by ``price()``
+        timeout: Per-request timeout for a source
+        session: HTTP session (a keep-alive one is created if omitted)
+    """
+
+    def __init__(
+        self,
+        sources: Sequence[Any],
+        interval: float = DEFAULT_INTERVAL,
+        max_age: float = DEFAULT_MAX_AGE,
+        timeout: float = DEFAULT_TIMEOUT,
+        session: Optional[requests.Session] = None,
+    ):
+        if not sources:
+            raise ValueError("PriceFeed needs at least one source")
+        self.sources = list(sources)
+        self.interval = interval
+        self.max_age = max_age
+        self.timeout = timeout
+        if session is None:
+            session = requests.Session()
+            session.headers.update({"User-Agent": "HODLXXI-PriceFeed/1.0"})
+            session.mount("https://", HTTPAdapter(pool_connections=2, pool_maxsize=2, max_retries=0))
+        self._session = session
+        self._quote: Optional[PriceQuote] = None
+        self._attempted = threading.Event()
+        self._refresh_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.refreshes = 0
+        self.failures = 0
+        self.last_error: Optional[str] = None
+
+    def refresh(self) -> Optional[PriceQuote]:
+        """Fetch once from the first source that answers; keeps the previous quote on failure."""
+        with self._refresh_lock:
+            errors = []
+            for source in self.sources:
+                try:
+                    price = source.fetch(self._session, self.timeout)
+                except Exception as e:
+                    errors.append(f"{source.name}: {e}")
+                    continue
+                self._quote = PriceQuote(price, source.name, time.time(), time.monotonic())
+                self.refreshes += 1
+                self.last_error = None
+                self._attempted.set()
+                return self._quote
+
+            self.failures += 1
+            self.last_error = "; ".join(errors)
+            self._attempted.set()
+            logger.warning(f"BTC price refresh failed: {self.last_error}")
+            return None
+
+    def latest(self, wait: float = 0.0) -> Optional[PriceQuote]:
+        """
+        Last good quote, however old (None if there never was one).
+
+        Args:
+            wait: Seconds to wait for the first refresh attempt after startup
+                (no wait once any attempt has finished, even a failed one)
+        """
+        if self._quote is None and wait > 0:
+            self._attempted.wait(wait)
+        return self._quote
+
+    def price(self, wait: float = 0.0) -> Optional[Decimal]:
+        """Latest price, or None if unknown or older than ``max_age``."""
+        quote = self.latest(wait)
+        if quote is None or quote.age > self.max_age:
+            return None
+        return quote.price
+
+    def start(self) -> None:
+        """Start the background refresh thread (idempotent)."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="price-feed", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self.refresh()
+            self._stop.wait(self.interval)
+
+    def stats(self) -> Dict[str, Any]:
+        """State for the metrics endpoint."""
+        quote = self._quote
+        age = quote.age if quote else None
+        return {
+            "source": quote.source if quote else None,
+            "price": str(quote.price) if quote else None,
+            "age_seconds": round(age, 3) if age is not None else None,
+            "stale": age is None or age > self.interval * 2,
+            "expired": age is None or age > self.max_age,
+            "refreshes": self.refreshes,
+            "failures": self.failures,
+            "last_error": self.last_error,
+        }
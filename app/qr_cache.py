@@ -0,0 +1,283 @@
+"""
+Content-addressed cache for rendered QR codes.
+
+``generate_qr_code`` rasterizes a PNG and base64-encodes it, which costs
+milliseconds per code, and the same addresses and descriptors are drawn over
+and over (every covenant card, every decode, every labeling run). A QR image
+depends only on ``(data, box_size, border)``, so results are cached under a
+digest of exactly that:
+
+* an in-process LRU bounded by total payload bytes, not entry count
+* optionally Redis and/or a disk directory as shared second tiers, so other
+  gunicorn workers and restarts reuse the same images. Redis entries expire
+  after ``redis_ttl`` seconds; the directory is kept under ``disk_max_bytes``
+  by deleting the least recently used files (by mtime, touched on every hit)
+* concurrent requests for the same key render it once (single-flight)
+
+``sign_qr_token``/``parse_qr_token`` name a QR by a signed, URL-safe token so
+JSON responses can link to ``/qr/<token>`` instead of inlining the image.
+"""
+
+import base64
+import hashlib
+import hmac
+import logging
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_BYTES = 32 * 1024 * 1024
+DEFAULT_REDIS_TTL = 7 * 24 * 3600
+DEFAULT_DISK_MAX_BYTES = 256 * 1024 * 1024
+_DISK_PRUNE_TO = 0.9  # prune below the budget so we don't rescan on every write
+
+
+def qr_key(data: str, box_size: int, border: int, variant: str = "png") -> str:
+    """Digest naming one rendering of ``data``."""
+    return hashlib.sha256(f"{variant}:{box_size}:{border}:{data}".encode("utf-8")).hexdigest()
+
+
+class QRTokenError(ValueError):
+    """A QR token is malformed or was not signed with our key."""
+
+
+def _b64url(raw: bytes) -> str:
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _unb64url(text: str) -> bytes:
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+
+def sign_qr_token(key: bytes, data: str, box_size: int = 12, border: int = 4) -> str:
+    """URL-safe token carrying ``(data, box_size, border)`` with a truncated HMAC-SHA256."""
+    body = _b64url(f"{box_size}:{border}:{data}".encode("utf-8"))
+    mac = hmac.new(key, body.encode("ascii"), hashlib.sha256).digest()[:16]
+    return f"{body}.{_b64url(mac)}"
+
+
+def parse_qr_token(key: bytes, token: str) -> Tuple[str, int, int]:
+    """Inverse of ``sign_qr_token``; raises QRTokenError unless the signature checks out."""
+    body, _, mac = token.partition(".")
+    try:
+        expected = hmac.new(key, body.encode("ascii"), hashlib.sha256).digest()[:16]
+        if not hmac.compare_digest(_unb64url(mac), expected):
+            raise QRTokenError("bad QR token signature")
+        box_size, border, data = _unb64url(body).decode("utf-8").split(":", 2)
+        return data, int(box_size), int(border)
+    except QRTokenError:
+        raise
+    except (ValueError, UnicodeError) as e:
+        raise QRTokenError(f"malformed QR token: {e}") from e
+
+
+class QRCache:
+    """
+    Byte-bounded QR image cache with optional Redis/disk tiers.
+
+    Args:
+        render: ``render(data, box_size, border) -> str`` producing the cached payload
+        max_bytes: Budget for the in-process tier (sum of payload lengths)
+        redis_client: Optional Redis client shared between workers
+        disk_dir: Optional directory for a persistent tier
+        variant: Part of the key, so differently rendered payloads never collide
+        prefix: Redis key prefix
+        redis_ttl: Seconds a Redis entry lives (None or 0 for no expiry)
+        disk_max_bytes: Budget for the disk tier (None or 0 for no limit)
+    """
+
+    def __init__(
+        self,
+        render: Callable[[str, int, int], str],
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        redis_client: Any = None,
+        disk_dir: Optional[str] = None,
+        variant: str = "png",
+        prefix: str = "hodlxxi:qr:",
+        redis_ttl: Optional[int] = DEFAULT_REDIS_TTL,
+        disk_max_bytes: Optional[int] = DEFAULT_DISK_MAX_BYTES,
+    ):
+        self.render = render
+        self.max_bytes = max_bytes
+        self.variant = variant
+        self.prefix = prefix
+        self._redis = redis_client
+        self.redis_ttl = redis_ttl or None
+        self.disk_dir = disk_dir
+        self.disk_max_bytes = disk_max_bytes or None
+        self._disk_lock = threading.Lock()
+        self._disk_bytes = 0
+        self.disk_evictions = 0
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+            self._disk_bytes = sum(size for _, size, _ in self._disk_files())
+        self._entries: "OrderedDict[str, str]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, threading.Event] = {}
+        self.hits = 0
+        self.misses = 0
+        self.renders = 0
+        self.redis_hits = 0
+        self.disk_hits = 0
+        self.evictions = 0
+
+    def get(self, data: str, box_size: int = 12, border: int = 4) -> str:
+        """The rendered QR for ``data``, rendering it only if no tier has it."""
+        key = qr_key(data, box_size, border, self.variant)
+        while True:
+            with self._lock:
+                value = self._entries.get(key)
+                if value is not None:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                pending = self._inflight.get(key)
+                if pending is None:
+                    self._inflight[key] = threading.Event()
+                    self.misses += 1
+                    break
+            pending.wait()  # another thread is producing this key; then re-check
+
+        try:
+            value = self._load_shared(key)
+            if value is None:
+                value = self.render(data, box_size, border)
+                self.renders += 1
+                self._store_shared(key, value)
+            with self._lock:
+                self._store_local(key, value)
+            return value
+        finally:
+            with self._lock:
+                self._inflight.pop(key).set()
+
+    def clear(self) -> None:
+        """Drop the in-process tier (shared tiers are left untouched)."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters for the metrics endpoint."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "renders": self.renders,
+                "redis_hits": self.redis_hits,
+                "disk_hits": self.disk_hits,
+                "evictions": self.evictions,
+                "disk_bytes": self._disk_bytes if self.disk_dir else None,
+                "disk_evictions": self.disk_evictions,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+                "shared": self._redis is not None or bool(self.disk_dir),
+            }
+
+    def _store_local(self, key: str, value: str) -> None:
+        size = len(value)
+        if size > self.max_bytes:
+            return
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self._bytes -= len(old)
+        self._entries[key] = value
+        self._bytes += size
+        while self._bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= len(evicted)
+            self.evictions += 1
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, key[:2], key)
+
+    def _load_shared(self, key: str) -> Optional[str]:
+        if self._redis is not None:
+            try:
+                raw = self._redis.get(self.prefix + key)
+            except Exception as e:
+                logger.debug(f"QR cache redis get failed: {e}")
+                raw = None
+            if raw is not None:
+                self.redis_hits += 1
+                return raw.decode("ascii") if isinstance(raw, bytes) else raw
+
+        if self.disk_dir:
+            path = self._disk_path(key)
+            try:
+                with open(path, "r", encoding="ascii") as f:
+                    value = f.read()
+                os.utime(path)  # recently used: pruned last
+            except OSError:
+                value = None
+            if value:
+                self.disk_hits += 1
+                self._redis_set(key, value)
+                return value
+        return None
+
+    def _store_shared(self, key: str, value: str) -> None:
+        self._redis_set(key, value)
+        if self.disk_dir:
+            path = self._disk_path(key)
+            try:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path))
+                with os.fdopen(fd, "w", encoding="ascii") as f:
+                    f.write(value)
+                os.replace(tmp, path)  # atomic, so readers never see a partial file
+            except OSError as e:
+                logger.debug(f"QR cache disk write failed: {e}")
+                return
+            with self._disk_lock:
+                self._disk_bytes += len(value)
+                if self.disk_max_bytes and self._disk_bytes > self.disk_max_bytes:
+                    self._prune_disk()
+
+    def _disk_files(self) -> List[Tuple[str, int, float]]:
+        """``(path, size, mtime)`` of every file in the disk tier."""
+        files = []
+        for root, _, names in os.walk(self.disk_dir):
+            for name in names:
+                path = os.path.join(root, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue  # removed by another worker
+                files.append((path, st.st_size, st.st_mtime))
+        return files
+
+    def _prune_disk(self) -> None:
+        # Rescan rather than trust our running total: other workers write to the same directory
+        files = sorted(self._disk_files(), key=lambda f: f[2])
+        total = sum(size for _, size, _ in files)
+        target = self.disk_max_bytes * _DISK_PRUNE_TO
+        for path, size, _ in files:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logger.debug(f"QR cache disk prune failed: {e}")
+                continue
+            total -= size
+            self.disk_evictions += 1
+        self._disk_bytes = total
+
+    def _redis_set(self, key: str, value: str) -> None:
+        if self._redis is None:
+            return
+        try:
+            self._redis.set(self.prefix + key, value, ex=self.redis_ttl)
+        except Exception as e:
+            logger.debug(f"QR cache redis set failed: {e}")
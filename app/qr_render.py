@@ -0,0 +1,122 @@
+"""
+Lean QR code rendering: 1-bit PNG and SVG.
+
+The old helpers drew a PIL image, converted it to RGB and re-saved it at
+300 dpi, so every code cost a full-colour raster encode and shipped three
+bytes per pixel through zlib. A QR code is a boolean matrix; this module
+encodes that matrix directly:
+
+* ``png`` - a 1-bit greyscale PNG written with zlib (no PIL round trip),
+  pixel-identical to the old output at the same ``box_size``/``border``
+* ``svg`` - one stroked ``<path>`` of horizontal runs, resolution independent
+  and scaled by the browser rather than rasterized here
+
+``render_qr`` returns the base64 PNG (what the JSON endpoints always carried)
+or an SVG data URI; ``qr_data_uri`` gives a data URI for either format.
+"""
+
+import base64
+import struct
+import zlib
+from typing import List, Tuple
+
+import qrcode
+from qrcode.constants import ERROR_CORRECT_H, ERROR_CORRECT_L, ERROR_CORRECT_M, ERROR_CORRECT_Q
+
+FORMATS = ("png", "svg")
+
+_ECC = {"L": ERROR_CORRECT_L, "M": ERROR_CORRECT_M, "Q": ERROR_CORRECT_Q, "H": ERROR_CORRECT_H}
+
+
+def qr_matrix(data: str, ecc: str = "Q") -> List[List[bool]]:
+    """Module matrix for ``data`` (True = dark), smallest version that fits, without quiet zone."""
+    qr = qrcode.QRCode(version=None, error_correction=_ECC[ecc], border=0)
+    qr.add_data(data)
+    qr.make(fit=True)
+    return qr.get_matrix()
+
+
+def _png_chunk(tag: bytes, body: bytes) -> bytes:
+    return struct.pack(">I", len(body)) + tag + body + struct.pack(">I", zlib.crc32(tag + body) & 0xFFFFFFFF)
+
+
+def matrix_to_png(matrix: List[List[bool]], box_size: int = 12, border: int = 4) -> bytes:
+    """1-bit greyscale PNG with ``box_size`` pixels per module and a ``border``-module quiet zone."""
+    n = len(matrix) + 2 * border
+    width = n * box_size
+    row_len = (width + 7) // 8
+    blank = b"\x00" + b"\xff" * row_len  # filter byte + all-white row
+
+    white = (1 << box_size) - 1  # one module's worth of white pixels (1 = white in 1-bit greyscale)
+    raw = bytearray()
+    raw += blank * (border * box_size)
+    for row in matrix:
+        bits = 0
+        for dark in [False] * border + row + [False] * border:
+            bits = (bits << box_size) | (0 if dark else white)
+        bits <<= row_len * 8 - width
+        scanline = b"\x00" + bits.to_bytes(row_len, "big")
+        raw += scanline * box_size
+    raw += blank * (border * box_size)
+
+    header = struct.pack(">IIBBBBB", width, width, 1, 0, 0, 0, 0)
+    return (
+        b"\x89PNG\r\n\x1a\n"
+        + _png_chunk(b"IHDR", header)
+        + _png_chunk(b"IDAT", zlib.compress(bytes(raw), 6))
+        + _png_chunk(b"IEND", b"")
+    )
+
+
+def matrix_to_svg(matrix: List[List[bool]], border: int = 4) -> str:
+    """SVG stroking each run of dark modules as a 1-unit line in a single path (1 unit = 1 module)."""
+    n = len(matrix) + 2 * border
+    parts = []
+    for y, row in enumerate(matrix, start=border):
+        pen = None  # x where the previous run on this row ended
+        x = 0
+        while x < len(row):
+            if not row[x]:
+                x += 1
+                continue
+            start = x
+            while x < len(row) and row[x]:
+                x += 1
+            if pen is None:
+                parts.append(f"M{start + border} {y}.5h{x - start}")
+            else:
+                parts.append(f"m{start - pen} 0h{x - start}")
+            pen = x
+    return (
+        f'<svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 {n} {n}" shape-rendering="crispEdges">'
+        f'<rect width="{n}" height="{n}" fill="#fff"/><path stroke="#000" d="{"".join(parts)}"/></svg>'
+    )
+
+
+def qr_data_uri(payload: bytes, fmt: str) -> str:
+    mime = "image/svg+xml" if fmt == "svg" else "image/png"
+    return f"data:{mime};base64,{base64.b64encode(payload).decode('ascii')}"
+
+
+def decode_qr_payload(payload: str) -> Tuple[bytes, str]:
+    """Image bytes and MIME type of a ``render_qr`` result."""
+    if payload.startswith("data:"):
+        header, _, b64 = payload.partition(",")
+        return base64.b64decode(b64), header[len("data:") :].split(";")[0]
+    return base64.b64decode(payload), "image/png"
+
+
+def render_qr(data: str, box_size: int = 12, border: int = 4, fmt: str = "png", ecc: str = "Q") -> str:
+    """
+    Render ``data`` as a QR code for embedding in JSON.
+
+    Returns:
+        Base64 PNG for ``png`` (the front end prefixes the data URI itself),
+        a complete ``data:image/svg+xml`` URI for ``svg``.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown QR format: {fmt}")
+    matrix = qr_matrix(data, ecc)
+    if fmt == "svg":
+        return qr_data_uri(matrix_to_svg(matrix, border).encode("utf-8"), "svg")
+    return base64.b64encode(matrix_to_png(matrix, box_size, border)).decode("ascii")
@@ -0,0 +1,158 @@
+"""
+Content-addressed cache for deterministic Bitcoin Core RPC results.
+
+``decodescript`` and ``getdescriptorinfo`` depend only on their input (script
+hex or descriptor string), so their results can be reused forever. Entries live
+in a bounded in-process LRU and, optionally, in Redis so every gunicorn worker
+shares the same warm cache. Keys include caller-supplied input, so Redis
+entries expire after ``redis_ttl`` seconds rather than accumulating forever.
+"""
+
+import copy
+import json
+import logging
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+CACHEABLE_METHODS = frozenset({"decodescript", "getdescriptorinfo"})
+
+DEFAULT_REDIS_TTL = 7 * 24 * 3600
+
+_MISS = object()
+
+
+class ScriptCache:
+    """
+    Bounded LRU keyed by ``(method, input)`` with hit/miss counters.
+
+    Only single-argument calls to methods in ``methods`` are cached; anything
+    else is reported as a miss and left to the node. Redis entries live
+    ``redis_ttl`` seconds (None or 0 for no expiry).
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 4096,
+        redis_client: Any = None,
+        methods: Iterable[str] = CACHEABLE_METHODS,
+        prefix: str = "hodlxxi:rpccache:",
+        redis_ttl: Optional[int] = DEFAULT_REDIS_TTL,
+    ):
+        self.maxsize = maxsize
+        self.redis_ttl = redis_ttl or None
+        self.methods = frozenset(methods)
+        self.prefix = prefix
+        self._redis = redis_client
+        self._entries: "OrderedDict[str, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.redis_hits = 0
+
+    def key_for(self, method: str, params: Sequence[Any]) -> Optional[str]:
+        """Return the cache key for a call, or None when the call is not cacheable."""
+        if method not in self.methods or len(params) != 1 or not isinstance(params[0], str):
+            return None
+        value = params[0].strip()
+        if method == "decodescript":
+            value = value.lower()  # hex is case-insensitive; descriptors are not
+        return f"{method}:{value}"
+
+    def get(self, method: str, params: Sequence[Any]) -> Tuple[bool, Any]:
+        """Look up a call. Returns ``(hit, result)``."""
+        key = self.key_for(method, params)
+        if key is None:
+            return False, None
+
+        with self._lock:
+            value = self._entries.get(key, _MISS)
+            if value is not _MISS:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return True, copy.deepcopy(value)
+
+        value = self._redis_get(key)
+        with self._lock:
+            if value is _MISS:
+                self.misses += 1
+                return False, None
+            self.hits += 1
+            self.redis_hits += 1
+            self._store_local(key, value)
+        return True, copy.deepcopy(value)
+
+    def set(self, method: str, params: Sequence[Any], result: Any) -> None:
+        """Remember the result of a successful call."""
+        key = self.key_for(method, params)
+        if key is None:
+            return
+        with self._lock:
+            self._store_local(key, copy.deepcopy(result))
+        self._redis_set(key, result)
+
+    def clear(self) -> None:
+        """Drop all local entries and reset counters (Redis is left untouched)."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = self.misses = self.redis_hits = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters for the metrics endpoint."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "redis_hits": self.redis_hits,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else None,
+                "shared": self._redis is not None,
+            }
+
+    def _store_local(self, key: str, value: Any) -> None:
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def _redis_get(self, key: str) -> Any:
+        if self._redis is None:
+            return _MISS
+        try:
+            raw = self._redis.get(self.prefix + key)
+        except Exception as e:
+            logger.debug(f"RPC cache redis get failed: {e}")
+            return _MISS
+        if raw is None:
+            return _MISS
+        try:
+            return json.loads(raw)
+        except ValueError:
+            return _MISS
+
+    def _redis_set(self, key: str, value: Any) -> None:
+        if self._redis is None:
+            return
+        try:
+            self._redis.set(self.prefix + key, json.dumps(value, default=str), ex=self.redis_ttl)
+        except Exception as e:
+            logger.debug(f"RPC cache redis set failed: {e}")
+
+
+def redis_client_from_url(url: Optional[str]) -> Any:
+    """Build a Redis client for the shared cache, or None if unset/unavailable."""
+    if not url:
+        return None
+    try:
+        import redis
+
+        client = redis.Redis.from_url(url, socket_timeout=0.5, socket_connect_timeout=0.5)
+        client.ping()
+        return client
+    except Exception as e:
+        logger.warning(f"RPC cache: Redis at {url} unavailable, using in-process cache only ({e})")
+        return None
@@ -0,0 +1,448 @@
+"""
+Pooled Bitcoin Core JSON-RPC client for HODLXXI.
+
+A single process-wide client per (node, wallet) keeps HTTP connections alive
+between requests instead of building a fresh AuthServiceProxy (and TCP
+handshake) for every call. The underlying urllib3 pool is lock-protected, so it
+is safe to share between threads and gevent greenlets.
+
+Each client can carry a ``CircuitBreaker``: once the node keeps failing or
+answering slowly, calls fail immediately with ``RPCUnavailable`` instead of
+tying up a worker for the full timeout. A per-request deadline (a context
+variable, see ``rpc_deadline_scope``) caps every call's HTTP timeout; a call
+cut short by the deadline is not counted against the node.
+"""
+
+import collections
+import contextlib
+import contextvars
+import itertools
+import json
+import logging
+import threading
+import time
+from decimal import Decimal
+from typing import Any, Deque, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import requests
+from bitcoinrpc.authproxy import EncodeDecimal, JSONRPCException
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_POOL_SIZE = 10
+DEFAULT_TIMEOUT = 60
+
+_CLIENTS: Dict[Tuple[str, int, str, str, str], "RPCClient"] = {}
+_CLIENTS_LOCK = threading.Lock()
+
+# Absolute time.monotonic() deadline of the current request, if any
+_DEADLINE: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar("rpc_deadline", default=None)
+
+# Node error codes that mean "not ready" rather than "bad request"
+RPC_IN_WARMUP = -28
+_TRANSPORT_CODES = (-341, -342)
+
+
+class RPCUnavailable(JSONRPCException):
+    """
+    Raised without contacting the node when its circuit is open or the request
+    deadline has passed, and when a call is cut short by the request deadline
+    (rather than the client's own timeout). ``retry_after`` is a hint in
+    seconds for clients.
+    """
+
+    def __init__(self, message: str, retry_after: float = 0.0, reason: str = "circuit_open"):
+        super().__init__({"code": -344, "message": message})
+        self.retry_after = retry_after
+        self.reason = reason
+
+
+def current_rpc_deadline() -> Optional[float]:
+    """Deadline set for the current context, or None."""
+    return _DEADLINE.get()
+
+
+def set_rpc_deadline(deadline: Optional[float]) -> contextvars.Token:
+    """Set the absolute deadline for RPC calls made from this context."""
+    return _DEADLINE.set(deadline)
+
+
+def reset_rpc_deadline(token: contextvars.Token) -> None:
+    _DEADLINE.reset(token)
+
+
+@contextlib.contextmanager
+def rpc_deadline_scope(seconds: Optional[float]) -> Iterator[Optional[float]]:
+    """Bound every RPC call in the block to ``seconds`` from now (never extending an outer deadline)."""
+    outer = _DEADLINE.get()
+    deadline = None if seconds is None else time.monotonic() + seconds
+    if outer is not None and (deadline is None or outer < deadline):
+        deadline = outer
+    token = _DEADLINE.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _DEADLINE.reset(token)
+
+
+class CircuitBreaker:
+    """
+    Closed → open → half-open breaker over a sliding window of recent calls.
+
+    The circuit opens when, over at least ``min_calls`` of the last ``window``
+    calls, the failure rate reaches ``failure_threshold`` or the share of calls
+    slower than ``slow_call_seconds`` reaches ``slow_call_threshold``. After
+    ``reset_timeout`` seconds one probe call is let through (half-open); its
+    outcome closes the circuit or opens it again.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        window: int = 20,
+        min_calls: int = 5,
+        failure_threshold: float = 0.5,
+        slow_call_seconds: float = 5.0,
+        slow_call_threshold: float = 0.8,
+        reset_timeout: float = 15.0,
+    ):
+        self.window = window
+        self.min_calls = min_calls
+        self.failure_threshold = failure_threshold
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_call_threshold = slow_call_threshold
+        self.reset_timeout = reset_timeout
+        self._calls: Deque[Tuple[bool, bool]] = collections.deque(maxlen=window)  # (failed, slow)
+        self._state = self.CLOSED
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+        self.rejected = 0
+        self.opened = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                return self.HALF_OPEN
+            return self._state
+
+    def before_call(self) -> None:
+        """Admit a call or raise ``RPCUnavailable``."""
+        with self._lock:
+            if self._state == self.CLOSED:
+                return
+            remaining = self.reset_timeout - (time.monotonic() - self._opened_at)
+            if self._state == self.OPEN and remaining > 0:
+                self.rejected += 1
+                raise RPCUnavailable("Bitcoin Core RPC circuit is open", retry_after=round(remaining, 1))
+            if self._probe_in_flight:
+                self.rejected += 1
+                raise RPCUnavailable("Bitcoin Core RPC circuit is half-open; probe in flight", retry_after=1.0)
+            self._state = self.HALF_OPEN
+            self._probe_in_flight = True
+
+    def record(self, failed: bool, duration: float) -> None:
+        """Report the outcome of an admitted call."""
+        slow = duration >= self.slow_call_seconds
+        with self._lock:
+            if self._state == self.HALF_OPEN:
+                self._probe_in_flight = False
+                if failed or slow:
+                    self._trip()
+                else:
+                    self._state = self.CLOSED
+                    self._calls.clear()
+                return
+
+            self._calls.append((failed, slow))
+            n = len(self._calls)
+            if self._state == self.CLOSED and n >= self.min_calls:
+                failures = sum(1 for f, _ in self._calls if f)
+                slows = sum(1 for _, sl in self._calls if sl)
+                if failures / n >= self.failure_threshold or slows / n >= self.slow_call_threshold:
+                    self._trip()
+
+    def release(self) -> None:
+        """Report an admitted call whose outcome says nothing about the node (e.g. cut short by a deadline)."""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def _trip(self) -> None:
+        self._state = self.OPEN
+        self._opened_at = time.monotonic()
+        self._calls.clear()
+        self.opened += 1
+        logger.warning(f"Bitcoin Core RPC circuit opened for {self.reset_timeout}s")
+
+    def stats(self) -> Dict[str, Any]:
+        """State and counters for health/metrics endpoints."""
+        state = self.state
+        with self._lock:
+            n = len(self._calls)
+            return {
+                "state": state,
+                "window_calls": n,
+                "failure_rate": round(sum(1 for f, _ in self._calls if f) / n, 3) if n else None,
+                "slow_rate": round(sum(1 for _, sl in self._calls if sl) / n, 3) if n else None,
+                "opened": self.opened,
+                "rejected": self.rejected,
+            }
+
+
+class RPCClient:
+    """
+    Drop-in replacement for AuthServiceProxy backed by a keep-alive pool.
+
+    Methods are resolved dynamically, so ``client.getblockchaininfo()`` works
+    exactly like it did with AuthServiceProxy: floats come back as Decimal and
+    node errors raise ``JSONRPCException``.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        user: str,
+        password: str,
+        wallet: str = "",
+        pool_size: int = DEFAULT_POOL_SIZE,
+        timeout: float = DEFAULT_TIMEOUT,
+        cache: Any = None,
+        breaker: Optional[CircuitBreaker] = None,
+    ):
+        self.url = f"http://{host}:{port}/wallet/{wallet}"
+        self.wallet = wallet
+        self.pool_size = pool_size
+        self.timeout = timeout
+        # Optional result cache with get(method, params) -> (hit, value) and set(method, params, value)
+        self.cache = cache
+        self.breaker = breaker
+        self._ids = itertools.count(1)
+
+        self._session = requests.Session()
+        self._session.auth = (user, password)
+        self._session.headers.update({"Content-Type": "application/json", "User-Agent": "HODLXXI-RPC/1.0"})
+        # pool_block=True caps concurrent sockets to pool_size; extra callers wait for a free connection.
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, pool_block=True, max_retries=0)
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+
+    def __getattr__(self, name: str):
+        if name.startswith("__") and name.endswith("__"):
+            raise AttributeError(name)
+
+        def _method(*args):
+            return self.call(name, *args)
+
+        _method.__name__ = name
+        return _method
+
+    def call(self, method: str, *params) -> Any:
+        """Execute a single JSON-RPC call and return its result."""
+        if self.cache is not None:
+            hit, value = self.cache.get(method, params)
+            if hit:
+                return value
+
+        payload = {"version": "1.1", "method": method, "params": list(params), "id": next(self._ids)}
+        response = self._post(payload)
+        if not isinstance(response, dict):
+            raise JSONRPCException({"code": -342, "message": "unexpected JSON-RPC response shape"})
+        if response.get("error") is not None:
+            raise JSONRPCException(response["error"])
+        if "result" not in response:
+            raise JSONRPCException({"code": -343, "message": "missing JSON-RPC result"})
+        if self.cache is not None:
+            self.cache.set(method, params, response["result"])
+        return response["result"]
+
+    def batch(self, calls: Sequence[Tuple[str, Sequence[Any]]], return_exceptions: bool = False) -> List[Any]:
+        """
+        Send several calls in one JSON-RPC batch round trip.
+
+        Args:
+            calls: Sequence of ``(method, params)`` pairs
+            return_exceptions: Put a ``JSONRPCException`` in the result slot of
+                failed calls instead of raising the first error
+
+        Returns:
+            Results in the same order as ``calls``.
+        """
+        results: List[Any] = [None] * len(calls)
+        requests_by_id = {}
+        payload = []
+        for idx, (method, params) in enumerate(calls):
+            if self.cache is not None:
+                hit, value = self.cache.get(method, params)
+                if hit:
+                    results[idx] = value
+                    continue
+            call_id = next(self._ids)
+            requests_by_id[call_id] = idx
+            payload.append({"jsonrpc": "2.0", "method": method, "params": list(params), "id": call_id})
+
+        if not payload:
+            return results
+
+        responses = self._post(payload)
+        if not isinstance(responses, list):
+            # Core answers a malformed batch with a single error object
+            raise JSONRPCException((responses or {}).get("error") or {"code": -342, "message": "bad batch reply"})
+
+        seen = set()
+        for response in responses:
+            idx = requests_by_id.get(response.get("id"))
+            if idx is None:
+                continue
+            seen.add(idx)
+            if response.get("error") is not None:
+                err = JSONRPCException(response["error"])
+                if not return_exceptions:
+                    raise err
+                results[idx] = err
+            else:
+                results[idx] = response.get("result")
+                if self.cache is not None:
+                    self.cache.set(calls[idx][0], calls[idx][1], results[idx])
+
+        missing = set(requests_by_id.values()) - seen
+        if missing:
+            err = JSONRPCException({"code": -343, "message": "missing JSON-RPC result in batch"})
+            if not return_exceptions:
+                raise err
+            for idx in missing:
+                results[idx] = err
+        return results
+
+    def _effective_timeout(self) -> float:
+        deadline = _DEADLINE.get()
+        if deadline is None:
+            return self.timeout
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise RPCUnavailable("request deadline exceeded before RPC call", reason="deadline_exceeded")
+        return min(self.timeout, remaining)
+
+    def _post(self, payload: Any) -> Any:
+        timeout = self._effective_timeout()
+        if self.breaker is None:
+            return self._send(payload, timeout)
+
+        self.breaker.before_call()
+        start = time.monotonic()
+        failed: Optional[bool] = True
+        try:
+            result = self._send(payload, timeout)
+            failed = _is_warmup_reply(result)
+            return result
+        except RPCUnavailable:
+            # Timed out on the request's budget, not the node's: no verdict for the breaker
+            failed = None
+            raise
+        except JSONRPCException as e:
+            failed = e.code in _TRANSPORT_CODES
+            raise
+        finally:
+            if failed is None:
+                self.breaker.release()
+            else:
+                self.breaker.record(failed, time.monotonic() - start)
+
+    def _send(self, payload: Any, timeout: float) -> Any:
+        body = json.dumps(payload, default=EncodeDecimal)
+        try:
+            http_response = self._session.post(self.url, data=body, timeout=timeout)
+        except requests.Timeout as e:
+            if timeout < self.timeout:
+                raise RPCUnavailable("request deadline exceeded during RPC call", reason="deadline_exceeded") from e
+            raise JSONRPCException({"code": -341, "message": f"RPC transport error: {e}"}) from e
+        except requests.RequestException as e:
+            raise JSONRPCException({"code": -341, "message": f"RPC transport error: {e}"}) from e
+
+        # Core answers RPC errors with HTTP 500/404 and a JSON body, so only the content type matters here.
+        content_type = http_response.headers.get("Content-Type", "")
+        if not content_type.startswith("application/json"):
+            raise JSONRPCException(
+                {
+                    "code": -342,
+                    "message": f"non-JSON HTTP response with '{http_response.status_code} {http_response.reason}' from server",
+                }
+            )
+        return json.loads(http_response.content.decode("utf-8"), parse_float=Decimal)
+
+    def close(self) -> None:
+        """Close all pooled connections."""
+        self._session.close()
+
+
+def _is_warmup_reply(reply: Any) -> bool:
+    # A node that is still loading answers every call with RPC_IN_WARMUP
+    replies = reply if isinstance(reply, list) else [reply]
+    return any(isinstance(r, dict) and (r.get("error") or {}).get("code") == RPC_IN_WARMUP for r in replies)
+
+
+def get_rpc_client(
+    host: str,
+    port: int,
+    user: str,
+    password: str,
+    wallet: str = "",
+    pool_size: int = DEFAULT_POOL_SIZE,
+    timeout: float = DEFAULT_TIMEOUT,
+    cache: Any = None,
+    breaker_factory: Optional[Any] = None,
+) -> RPCClient:
+    """
+    Return the shared client for this node/wallet, creating it on first use.
+
+    Clients are cached per process; gunicorn workers each get their own pool.
+    ``cache`` and ``breaker_factory`` (called once to build the client's
+    ``CircuitBreaker``) are only applied when the client is first created.
+    """
+    key = (host, int(port), user, password, wallet)
+    client = _CLIENTS.get(key)
+    if client is not None:
+        return client
+
+    with _CLIENTS_LOCK:
+        client = _CLIENTS.get(key)
+        if client is None:
+            client = RPCClient(
+                host,
+                int(port),
+                user,
+                password,
+                wallet,
+                pool_size=pool_size,
+                timeout=timeout,
+                cache=cache,
+                breaker=breaker_factory() if breaker_factory else None,
+            )
+            _CLIENTS[key] = client
+            logger.info(f"RPC client pool created for wallet '{wallet}' (size={pool_size})")
+    return client
+
+
+def reset_rpc_clients() -> None:
+    """Close and forget every cached client (used by tests and config reloads)."""
+    with _CLIENTS_LOCK:
+        for client in _CLIENTS.values():
+            try:
+                client.close()
+            except Exception:
+                pass
+        _CLIENTS.clear()
+
+
+def get_pool_stats() -> Dict[str, Any]:
+    """Summarize the cached client pools (and their breakers) for the metrics endpoint."""
+    return {
+        "rpc_clients": len(_CLIENTS),
+        "rpc_pool_size": max((c.pool_size for c in _CLIENTS.values()), default=None),
+        "rpc_breakers": {c.wallet or "default": c.breaker.stats() for c in _CLIENTS.values() if c.breaker is not None},
+    }
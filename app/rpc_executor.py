@@ -0,0 +1,175 @@
+"""
+Concurrent fan-out for independent Bitcoin Core RPC calls.
+
+Calls that depend on each other's results (getdescriptorinfo → deriveaddresses
+→ getaddressinfo) cannot share one JSON-RPC batch, but independent chains can
+run side by side. ``RPCExecutor`` runs such tasks on a shared worker pool with
+a per-node concurrency limit and an optional absolute deadline.
+
+Under gunicorn's gevent/eventlet workers ``threading`` is monkey-patched, so
+the pool's workers are greenlets; with sync workers they are OS threads.
+Each task runs in a copy of the caller's ``contextvars`` context, so Flask's
+``g``/``request`` and other context-local state remain available.
+"""
+
+import contextvars
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_WORKERS = 16
+DEFAULT_PER_NODE_LIMIT = 4
+
+
+class DeadlineExceeded(TimeoutError):
+    """The request ran out of time before all fan-out tasks finished."""
+
+
+def deadline_after(seconds: Optional[float]) -> Optional[float]:
+    """Absolute ``time.monotonic()`` deadline ``seconds`` from now (None = no deadline)."""
+    return None if seconds is None else time.monotonic() + seconds
+
+
+class RPCExecutor:
+    """
+    Bounded worker pool for RPC fan-out.
+
+    Args:
+        max_workers: Pool size shared by all requests
+        per_node_limit: Maximum concurrent tasks per node key (e.g. RPC URL),
+            so one request cannot occupy every connection to bitcoind
+    """
+
+    def __init__(self, max_workers: int = DEFAULT_MAX_WORKERS, per_node_limit: int = DEFAULT_PER_NODE_LIMIT):
+        self.max_workers = max_workers
+        self.per_node_limit = per_node_limit
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="rpc-fanout")
+        self._limits: Dict[Hashable, threading.BoundedSemaphore] = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.submitted = 0
+        self.inline = 0
+        self.deadline_misses = 0
+
+    def _limit_for(self, node: Hashable) -> threading.BoundedSemaphore:
+        with self._lock:
+            sem = self._limits.get(node)
+            if sem is None:
+                sem = self._limits[node] = threading.BoundedSemaphore(self.per_node_limit)
+            return sem
+
+    def _invoke(self, fn: Callable[[], Any], node: Hashable, deadline: Optional[float]) -> Any:
+        sem = self._limit_for(node)
+        timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+        if not sem.acquire(timeout=timeout):
+            raise DeadlineExceeded("deadline exceeded waiting for an RPC slot")
+        try:
+            if deadline is not None and time.monotonic() >= deadline:
+                raise DeadlineExceeded("deadline exceeded before the call started")
+            return fn()
+        finally:
+            sem.release()
+
+    def _run_in_worker(self, ctx: contextvars.Context, fn: Callable[[], Any], node: Hashable, deadline: Optional[float]):
+        self._local.active = True
+        try:
+            return ctx.run(self._invoke, fn, node, deadline)
+        finally:
+            self._local.active = False
+
+    def submit(self, fn: Callable[[], Any], node: Hashable = None, deadline: Optional[float] = None) -> Future:
+        """Schedule one zero-argument callable; returns its Future."""
+        if getattr(self._local, "active", False):
+            # Already on a pool worker: run inline instead of waiting on our own pool
+            fut: Future = Future()
+            self.inline += 1
+            try:
+                fut.set_result(self._invoke(fn, node, deadline))
+            except Exception as e:
+                fut.set_exception(e)
+            return fut
+
+        self.submitted += 1
+        return self._pool.submit(self._run_in_worker, contextvars.copy_context(), fn, node, deadline)
+
+    def run(
+        self,
+        tasks: Sequence[Callable[[], Any]],
+        node: Hashable = None,
+        deadline: Optional[float] = None,
+        return_exceptions: bool = False,
+    ) -> List[Any]:
+        """
+        Run independent callables concurrently and return their results in order.
+
+        Args:
+            tasks: Zero-argument callables
+            node: Concurrency-limit key (tasks for the same node share its limit)
+            deadline: Absolute ``time.monotonic()`` deadline for the whole group
+            return_exceptions: Put exceptions in the result list instead of raising
+                the first one
+
+        Raises:
+            DeadlineExceeded: If the deadline passes first (unless ``return_exceptions``)
+        """
+        futures = [self.submit(task, node=node, deadline=deadline) for task in tasks]
+        results: List[Any] = []
+        expired = False
+        for fut in futures:
+            timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                if expired and (not fut.done() or fut.cancelled()):
+                    raise FutureTimeout()
+                results.append(fut.result(timeout=timeout))
+            except FutureTimeout:
+                if not expired:
+                    expired = True
+                    self.deadline_misses += 1
+                    for pending in futures:
+                        pending.cancel()
+                err = DeadlineExceeded("RPC task missed the request deadline")
+                if not return_exceptions:
+                    raise err
+                results.append(err)
+            except Exception as e:
+                if not return_exceptions:
+                    for pending in futures:
+                        pending.cancel()
+                    raise
+                results.append(e)
+        return results
+
+    def map(
+        self,
+        fn: Callable[[Any], Any],
+        items: Iterable[Any],
+        node: Hashable = None,
+        deadline: Optional[float] = None,
+        return_exceptions: bool = False,
+    ) -> List[Any]:
+        """``[fn(item) for item in items]``, run concurrently (see ``run``)."""
+        return self.run(
+            [lambda item=item: fn(item) for item in items],
+            node=node,
+            deadline=deadline,
+            return_exceptions=return_exceptions,
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters for the metrics endpoint."""
+        return {
+            "max_workers": self.max_workers,
+            "per_node_limit": self.per_node_limit,
+            "nodes": len(self._limits),
+            "submitted": self.submitted,
+            "inline": self.inline,
+            "deadline_misses": self.deadline_misses,
+        }
+
+    def shutdown(self, wait: bool = False) -> None:
+        self._pool.shutdown(wait=wait, cancel_futures=True)
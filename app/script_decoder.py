@@ -0,0 +1,318 @@
+"""
+Pure-Python ``decodescript`` for HODLXXI.
+
+Covenant handling only needs a script's ASM, its P2SH address and its segwit
+(P2WSH/P2WPKH) program and address; all of these follow from the script bytes
+with a tokenizer, SHA256/RIPEMD160 and bech32. ``decode_script`` reproduces the
+fields of Bitcoin Core's ``decodescript`` the app reads, using Core's rules:
+
+* ASM as ``ScriptToAsmStr``: pushes of up to 4 bytes are shown as script
+  numbers, longer pushes as hex, ``OP_0``/``OP_1NEGATE``/``OP_1``..``OP_16``
+  as ``0``/``-1``/``1``..``16`` and a truncated push ends with ``[error]``
+* ``type`` as Core's ``Solver``
+* ``p2sh`` and ``segwit`` only when Core would offer them (P2PK/P2PKH wrap as
+  P2WPKH, other scripts as P2WSH, uncompressed keys and witness programs are
+  never wrapped)
+
+The ``desc`` fields are not produced.
+"""
+
+import hashlib
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import base58
+
+try:
+    from bech32_codec import segwit_address
+except ImportError:  # imported as app.script_decoder (tests, scripts)
+    from app.bech32_codec import segwit_address
+
+OP_0 = 0x00
+OP_PUSHDATA1 = 0x4C
+OP_PUSHDATA2 = 0x4D
+OP_PUSHDATA4 = 0x4E
+OP_1NEGATE = 0x4F
+OP_1 = 0x51
+OP_16 = 0x60
+OP_RETURN = 0x6A
+OP_EQUAL = 0x87
+OP_EQUALVERIFY = 0x88
+OP_HASH160 = 0xA9
+OP_DUP = 0x76
+OP_CHECKSIG = 0xAC
+OP_CHECKMULTISIG = 0xAE
+OP_CHECKSIGADD = 0xBA
+MAX_OPCODE = 0xB9  # OP_NOP10
+MAX_SCRIPT_SIZE = 10_000
+MAX_SCRIPT_ELEMENT_SIZE = 520
+
+_OP_NAMES = {
+    0x4C: "OP_PUSHDATA1", 0x4D: "OP_PUSHDATA2", 0x4E: "OP_PUSHDATA4", 0x4F: "-1", 0x50: "OP_RESERVED",
+    0x61: "OP_NOP", 0x62: "OP_VER", 0x63: "OP_IF", 0x64: "OP_NOTIF", 0x65: "OP_VERIF", 0x66: "OP_VERNOTIF",
+    0x67: "OP_ELSE", 0x68: "OP_ENDIF", 0x69: "OP_VERIFY", 0x6A: "OP_RETURN",
+    0x6B: "OP_TOALTSTACK", 0x6C: "OP_FROMALTSTACK", 0x6D: "OP_2DROP", 0x6E: "OP_2DUP", 0x6F: "OP_3DUP",
+    0x70: "OP_2OVER", 0x71: "OP_2ROT", 0x72: "OP_2SWAP", 0x73: "OP_IFDUP", 0x74: "OP_DEPTH", 0x75: "OP_DROP",
+    0x76: "OP_DUP", 0x77: "OP_NIP", 0x78: "OP_OVER", 0x79: "OP_PICK", 0x7A: "OP_ROLL", 0x7B: "OP_ROT",
+    0x7C: "OP_SWAP", 0x7D: "OP_TUCK",
+    0x7E: "OP_CAT", 0x7F: "OP_SUBSTR", 0x80: "OP_LEFT", 0x81: "OP_RIGHT", 0x82: "OP_SIZE",
+    0x83: "OP_INVERT", 0x84: "OP_AND", 0x85: "OP_OR", 0x86: "OP_XOR", 0x87: "OP_EQUAL", 0x88: "OP_EQUALVERIFY",
+    0x89: "OP_RESERVED1", 0x8A: "OP_RESERVED2",
+    0x8B: "OP_1ADD", 0x8C: "OP_1SUB", 0x8D: "OP_2MUL", 0x8E: "OP_2DIV", 0x8F: "OP_NEGATE", 0x90: "OP_ABS",
+    0x91: "OP_NOT", 0x92: "OP_0NOTEQUAL", 0x93: "OP_ADD", 0x94: "OP_SUB", 0x95: "OP_MUL", 0x96: "OP_DIV",
+    0x97: "OP_MOD", 0x98: "OP_LSHIFT", 0x99: "OP_RSHIFT", 0x9A: "OP_BOOLAND", 0x9B: "OP_BOOLOR",
+    0x9C: "OP_NUMEQUAL", 0x9D: "OP_NUMEQUALVERIFY", 0x9E: "OP_NUMNOTEQUAL", 0x9F: "OP_LESSTHAN",
+    0xA0: "OP_GREATERTHAN", 0xA1: "OP_LESSTHANOREQUAL", 0xA2: "OP_GREATERTHANOREQUAL", 0xA3: "OP_MIN",
+    0xA4: "OP_MAX", 0xA5: "OP_WITHIN",
+    0xA6: "OP_RIPEMD160", 0xA7: "OP_SHA1", 0xA8: "OP_SHA256", 0xA9: "OP_HASH160", 0xAA: "OP_HASH256",
+    0xAB: "OP_CODESEPARATOR", 0xAC: "OP_CHECKSIG", 0xAD: "OP_CHECKSIGVERIFY", 0xAE: "OP_CHECKMULTISIG",
+    0xAF: "OP_CHECKMULTISIGVERIFY",
+    0xB0: "OP_NOP1", 0xB1: "OP_CHECKLOCKTIMEVERIFY", 0xB2: "OP_CHECKSEQUENCEVERIFY", 0xB3: "OP_NOP4",
+    0xB4: "OP_NOP5", 0xB5: "OP_NOP6", 0xB6: "OP_NOP7", 0xB7: "OP_NOP8", 0xB8: "OP_NOP9", 0xB9: "OP_NOP10",
+    0xBA: "OP_CHECKSIGADD", 0xFF: "OP_INVALIDOPCODE",
+}  # fmt: skip
+_OP_NAMES.update({op: str(op - OP_1 + 1) for op in range(OP_1, OP_16 + 1)})
+
+# Network parameters: bech32 HRP and base58 version bytes
+NETWORKS = {
+    "main": {"hrp": "bc", "p2pkh": 0x00, "p2sh": 0x05},
+    "test": {"hrp": "tb", "p2pkh": 0x6F, "p2sh": 0xC4},
+    "signet": {"hrp": "tb", "p2pkh": 0x6F, "p2sh": 0xC4},
+    "regtest": {"hrp": "bcrt", "p2pkh": 0x6F, "p2sh": 0xC4},
+}
+
+_P2A_PROGRAM = bytes.fromhex("4e73")
+
+
+class ScriptError(ValueError):
+    """Raised by ``iter_ops`` for a truncated push."""
+
+
+def iter_ops(script: bytes) -> Iterator[Tuple[int, Optional[bytes]]]:
+    """Yield ``(opcode, push_data)``; ``push_data`` is None for non-push opcodes."""
+    i, n = 0, len(script)
+    while i < n:
+        op = script[i]
+        i += 1
+        if op > OP_PUSHDATA4:
+            yield op, None
+            continue
+        if op < OP_PUSHDATA1:
+            size = op
+        else:
+            width = {OP_PUSHDATA1: 1, OP_PUSHDATA2: 2, OP_PUSHDATA4: 4}[op]
+            if n - i < width:
+                raise ScriptError("truncated push length")
+            size = int.from_bytes(script[i : i + width], "little")
+            i += width
+        if n - i < size:
+            raise ScriptError("truncated push data")
+        yield op, script[i : i + size]
+        i += size
+
+
+def script_num(data: bytes) -> int:
+    """Decode a (non-minimal) CScriptNum of up to 4 bytes."""
+    if not data:
+        return 0
+    value = int.from_bytes(data, "little")
+    if data[-1] & 0x80:
+        return -(value & ~(0x80 << (8 * (len(data) - 1))))
+    return value
+
+
+def script_to_asm(script: bytes) -> str:
+    """Core's ``ScriptToAsmStr`` (without sighash decoding)."""
+    out: List[str] = []
+    try:
+        for op, data in iter_ops(script):
+            if data is None:
+                out.append(_OP_NAMES.get(op, "OP_UNKNOWN"))
+            elif len(data) <= 4:
+                out.append(str(script_num(data)))
+            else:
+                out.append(data.hex())
+    except ScriptError:
+        out.append("[error]")
+    return " ".join(out)
+
+
+def hash160(data: bytes) -> bytes:
+    return hashlib.new("ripemd160", hashlib.sha256(data).digest()).digest()
+
+
+def _base58_address(version: int, payload: bytes) -> str:
+    return base58.b58encode_check(bytes([version]) + payload).decode()
+
+
+def _valid_pubkey_size(data: Optional[bytes]) -> bool:
+    if not data:
+        return False
+    expected = {2: 33, 3: 33, 4: 65, 6: 65, 7: 65}.get(data[0])
+    return expected == len(data)
+
+
+def _witness_program(script: bytes) -> Optional[Tuple[int, bytes]]:
+    if not 4 <= len(script) <= 42:
+        return None
+    if script[0] != OP_0 and not OP_1 <= script[0] <= OP_16:
+        return None
+    if script[1] + 2 != len(script):
+        return None
+    version = 0 if script[0] == OP_0 else script[0] - OP_1 + 1
+    return version, script[2:]
+
+
+def _is_push_only(script: bytes) -> bool:
+    try:
+        return all(op <= OP_16 for op, _ in iter_ops(script))
+    except ScriptError:
+        return False
+
+
+def _match_multisig(script: bytes) -> Optional[List[bytes]]:
+    if not script or script[-1] != OP_CHECKMULTISIG:
+        return None
+    try:
+        ops = list(iter_ops(script[:-1]))
+    except ScriptError:
+        return None
+    if len(ops) < 2 or not OP_1 <= ops[0][0] <= OP_16 or not OP_1 <= ops[-1][0] <= OP_16:
+        return None
+    keys = [data for _, data in ops[1:-1]]
+    if not all(_valid_pubkey_size(k) for k in keys):
+        return None
+    required, total = ops[0][0] - OP_1 + 1, ops[-1][0] - OP_1 + 1
+    if len(keys) != total or total < required:
+        return None
+    return [bytes([required])] + keys + [bytes([total])]
+
+
+def solve(script: bytes) -> Tuple[str, List[bytes]]:
+    """Core's ``Solver``: output type name and its solutions."""
+    if len(script) == 23 and script[0] == OP_HASH160 and script[1] == 20 and script[22] == OP_EQUAL:
+        return "scripthash", [script[2:22]]
+
+    witness = _witness_program(script)
+    if witness:
+        version, program = witness
+        if version == 0 and len(program) == 20:
+            return "witness_v0_keyhash", [program]
+        if version == 0 and len(program) == 32:
+            return "witness_v0_scripthash", [program]
+        if version == 1 and len(program) == 32:
+            return "witness_v1_taproot", [program]
+        if version == 1 and program == _P2A_PROGRAM:
+            return "anchor", []
+        if version != 0:
+            return "witness_unknown", [bytes([version]), program]
+        return "nonstandard", []
+
+    if script[:1] == bytes([OP_RETURN]) and _is_push_only(script[1:]):
+        return "nulldata", []
+
+    for size in (33, 65):
+        if len(script) == size + 2 and script[0] == size and script[-1] == OP_CHECKSIG:
+            if _valid_pubkey_size(script[1:-1]):
+                return "pubkey", [script[1:-1]]
+
+    if (
+        len(script) == 25
+        and script[:3] == bytes([OP_DUP, OP_HASH160, 20])
+        and script[23:] == bytes([OP_EQUALVERIFY, OP_CHECKSIG])
+    ):
+        return "pubkeyhash", [script[3:23]]
+
+    solutions = _match_multisig(script)
+    if solutions:
+        return "multisig", solutions
+
+    return "nonstandard", []
+
+
+def _address(kind: str, solutions: List[bytes], script: bytes, net: Dict[str, Any]) -> Optional[str]:
+    if kind == "pubkeyhash":
+        return _base58_address(net["p2pkh"], solutions[0])
+    if kind == "scripthash":
+        return _base58_address(net["p2sh"], solutions[0])
+    if kind in ("witness_v0_keyhash", "witness_v0_scripthash", "witness_v1_taproot", "witness_unknown", "anchor"):
+        version, program = _witness_program(script)
+        return segwit_address(net["hrp"], version, program)
+    return None
+
+
+def _has_valid_ops(script: bytes) -> bool:
+    try:
+        return all(
+            op <= MAX_OPCODE and (data is None or len(data) <= MAX_SCRIPT_ELEMENT_SIZE) for op, data in iter_ops(script)
+        )
+    except ScriptError:
+        return False
+
+
+def _is_op_success(op: int) -> bool:
+    return (
+        op == 80
+        or op == 98
+        or 126 <= op <= 129
+        or 131 <= op <= 134
+        or 137 <= op <= 138
+        or 141 <= op <= 142
+        or 149 <= op <= 153
+        or 187 <= op <= 254
+    )
+
+
+def _describe(script: bytes, net: Dict[str, Any]) -> Dict[str, Any]:
+    kind, solutions = solve(script)
+    out: Dict[str, Any] = {"asm": script_to_asm(script), "type": kind}
+    address = _address(kind, solutions, script, net)
+    if address:
+        out["address"] = address
+    return out
+
+
+def decode_script(script_hex: str, network: str = "main") -> Dict[str, Any]:
+    """
+    Decode a hex script like ``bitcoin-cli decodescript``.
+
+    Returns:
+        ``{"asm", "type", ["address"], ["p2sh"], ["segwit": {"asm", "hex",
+        "type", "address", "p2sh-segwit"}]}``
+
+    Raises:
+        ValueError: If ``script_hex`` is not valid hex
+    """
+    script = bytes.fromhex((script_hex or "").strip())
+    net = NETWORKS[network]
+    kind, solutions = solve(script)
+    decoded = _describe(script, net)
+
+    can_wrap = kind in ("multisig", "nonstandard", "pubkey", "pubkeyhash", "witness_v0_keyhash", "witness_v0_scripthash")
+    if can_wrap:
+        can_wrap = _has_valid_ops(script) and len(script) <= MAX_SCRIPT_SIZE
+    if can_wrap:
+        can_wrap = not any(op == OP_CHECKSIGADD or _is_op_success(op) for op, _ in iter_ops(script))
+    if not can_wrap:
+        return decoded
+
+    decoded["p2sh"] = _base58_address(net["p2sh"], hash160(script))
+
+    if kind in ("multisig", "pubkey"):
+        wrap_p2wsh = all(len(s) == 1 or len(s) == 33 for s in solutions)
+    else:
+        wrap_p2wsh = kind in ("nonstandard", "pubkeyhash")
+    if not wrap_p2wsh:
+        return decoded
+
+    if kind == "pubkey":
+        segwit_script = bytes([OP_0, 20]) + hash160(solutions[0])
+    elif kind == "pubkeyhash":
+        segwit_script = bytes([OP_0, 20]) + solutions[0]
+    else:
+        segwit_script = bytes([OP_0, 32]) + hashlib.sha256(script).digest()
+
+    segwit = _describe(segwit_script, net)
+    segwit["hex"] = segwit_script.hex()
+    segwit["p2sh-segwit"] = _base58_address(net["p2sh"], hash160(segwit_script))
+    decoded["segwit"] = segwit
+    return decoded
@@ -0,0 +1,80 @@
+"""
+Bulk UTXO lookups for HODLXXI.
+
+Instead of one ``listunspent(0, 9999999, [addr])`` per covenant address, the
+service asks the node for every address at once (one call per chunk, all
+chunks in a single batch) and serves callers from the grouped result.
+"""
+
+import logging
+from decimal import Decimal
+from typing import Dict, Iterable, List
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 1000
+MIN_CONF = 0
+MAX_CONF = 9_999_999
+
+
+def fetch_utxos_by_address(
+    rpc, addresses: Iterable[str], chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> Dict[str, List[dict]]:
+    """
+    List unspent outputs for many addresses in one round trip.
+
+    Args:
+        rpc: RPC client with ``batch``
+        addresses: Addresses to query (duplicates are ignored)
+        chunk_size: Maximum addresses per ``listunspent`` call
+
+    Returns:
+        ``{address: [utxo, ...]}`` with an entry (possibly empty) for every address.
+    """
+    unique = list(dict.fromkeys(a for a in addresses if a))
+    grouped: Dict[str, List[dict]] = {a: [] for a in unique}
+    if not unique:
+        return grouped
+
+    chunks = [unique[i : i + chunk_size] for i in range(0, len(unique), chunk_size)]
+    results = rpc.batch([("listunspent", [MIN_CONF, MAX_CONF, chunk]) for chunk in chunks])
+    for utxos in results:
+        for utxo in utxos or []:
+            grouped.setdefault(utxo.get("address"), []).append(utxo)
+    return grouped
+
+
+class UTXOService:
+    """
+    Per-request UTXO view.
+
+    Call ``prefetch`` with every address the request will need; later
+    ``utxos``/``balance`` calls are answered from memory, and unknown
+    addresses are fetched on demand.
+    """
+
+    def __init__(self, rpc, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        self.rpc = rpc
+        self.chunk_size = chunk_size
+        self._by_address: Dict[str, List[dict]] = {}
+        self.calls = 0
+
+    def prefetch(self, addresses: Iterable[str]) -> None:
+        """Load UTXOs for all addresses not seen yet."""
+        missing = [a for a in dict.fromkeys(addresses) if a and a not in self._by_address]
+        if not missing:
+            return
+        self.calls += 1
+        fetched = fetch_utxos_by_address(self.rpc, missing, self.chunk_size)
+        for addr in missing:
+            self._by_address[addr] = fetched.get(addr, [])
+
+    def utxos(self, address: str) -> List[dict]:
+        """Unspent outputs paying ``address``."""
+        if address not in self._by_address:
+            self.prefetch([address])
+        return self._by_address.get(address, [])
+
+    def balance(self, address: str) -> Decimal:
+        """Sum of unspent outputs paying ``address`` in BTC."""
+        return sum((Decimal(u["amount"]) for u in self.utxos(address)), Decimal(0))
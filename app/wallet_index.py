@@ -0,0 +1,141 @@
+"""
+Hash indexes over wallet RPC results for HODLXXI.
+
+``listaddressgroupings`` returns nested lists of ``[address, amount(, label)]``.
+Scanning them for every covenant is O(descriptors × addresses); these indexes
+are built once per fetch and answer balance/label questions in O(1).
+
+Covenant addresses follow the labelling convention from ``indexed_label``:
+the P2WSH address carries the covenant's segwit script hex as its label and
+the checking (P2WPKH) addresses carry ``"<script_hex> [i]"``.
+"""
+
+import re
+from decimal import Decimal
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+
+class GroupingsIndex:
+    """
+    Address → (balance, label) and label → addresses maps for one
+    ``listaddressgroupings`` result.
+    """
+
+    def __init__(self, groupings: Iterable[Sequence[Sequence]]):
+        self.by_address: Dict[str, Tuple[Decimal, str]] = {}
+        self.by_label: Dict[str, List[str]] = {}
+        self._label_index: Optional["LabelIndex"] = None
+
+        for group in groupings or []:
+            for item in group:
+                try:
+                    addr = item[0]
+                    bal = Decimal(str(item[1]))
+                except (IndexError, TypeError, ValueError, ArithmeticError):
+                    continue
+                label = item[2] if len(item) > 2 and isinstance(item[2], str) else ""
+                if addr in self.by_address:
+                    continue  # an address belongs to a single grouping; keep the first sighting
+                self.by_address[addr] = (bal, label)
+                self.by_label.setdefault(label, []).append(addr)
+
+    def __len__(self) -> int:
+        return len(self.by_address)
+
+    def __iter__(self) -> Iterator[Tuple[str, Decimal, str]]:
+        for addr, (bal, label) in self.by_address.items():
+            yield addr, bal, label
+
+    def balance(self, address: str) -> Decimal:
+        """Balance of ``address`` (0 if unknown)."""
+        entry = self.by_address.get(address)
+        return entry[0] if entry else Decimal("0")
+
+    def label(self, address: str) -> Optional[str]:
+        """Label of ``address`` or None if unknown."""
+        entry = self.by_address.get(address)
+        return entry[1] if entry else None
+
+    def addresses_for_label(self, label: str) -> List[str]:
+        """Addresses carrying exactly ``label``."""
+        return list(self.by_label.get(label, ()))
+
+    def label_index(self) -> "LabelIndex":
+        """Covenant-keyed ``LabelIndex`` over this result's labels (built once)."""
+        if self._label_index is None:
+            self._label_index = LabelIndex((), self)
+        return self._label_index
+
+
+_INDEXED_LABEL_RE = re.compile(r"^(?P<base>\S+) \[(?P<index>\d+)\]$")
+
+
+def indexed_label(script_hex: str, index: int) -> str:
+    """Label of the ``index``-th checking (P2WPKH) address derived for a covenant."""
+    return f"{script_hex} [{index}]"
+
+
+class LabelIndex:
+    """
+    Covenant-keyed view of wallet labels.
+
+    Built from one ``listlabels`` result plus the ``GroupingsIndex`` of the
+    same moment. A label whose addresses show up in the groupings has
+    transaction history and therefore counts as used.
+    """
+
+    def __init__(self, labels: Iterable[str], groupings: Optional[GroupingsIndex] = None):
+        self.groupings = groupings
+        self._bare: Dict[str, str] = {}
+        self._indexed: Dict[str, Dict[int, str]] = {}
+
+        all_labels = list(labels or [])
+        if groupings is not None:
+            all_labels.extend(groupings.by_label.keys())
+        for label in all_labels:
+            if not isinstance(label, str) or not label:
+                continue
+            m = _INDEXED_LABEL_RE.match(label)
+            if m:
+                self._indexed.setdefault(m.group("base").lower(), {})[int(m.group("index"))] = label
+            else:
+                self._bare[label.lower()] = label
+
+    def labels_for_covenant(self, script_hex: str) -> List[str]:
+        """The covenant's own label (if any) followed by its "[i]" labels in index order."""
+        key = (script_hex or "").lower()
+        out = [self._bare[key]] if key in self._bare else []
+        indexed = self._indexed.get(key, {})
+        out.extend(indexed[i] for i in sorted(indexed))
+        return out
+
+    def indexes_for_covenant(self, script_hex: str) -> List[int]:
+        """Indexes ``i`` for which a ``"<script_hex> [i]"`` label exists."""
+        return sorted(self._indexed.get((script_hex or "").lower(), {}))
+
+    def addresses_for_covenant(self, script_hex: str) -> List[Tuple[str, Decimal]]:
+        """``(address, balance)`` for every address carrying one of the covenant's labels."""
+        if self.groupings is None:
+            return []
+        out = []
+        for label in self.labels_for_covenant(script_hex):
+            out.extend((a, self.groupings.by_address[a][0]) for a in self.groupings.by_label.get(label, ()))
+        return out
+
+    def is_used(self, label: str) -> bool:
+        """True if any address with ``label`` has transaction history."""
+        return self.groupings is not None and label in self.groupings.by_label
+
+    def unused_indexes(self, script_hex: str, max_scan: int = 20) -> List[int]:
+        """Labelled indexes below ``max_scan`` with no transaction history, lowest first."""
+        indexed = self._indexed.get((script_hex or "").lower(), {})
+        return [i for i in sorted(indexed) if i < max_scan and not self.is_used(indexed[i])]
+
+    def first_unused_index(self, script_hex: str, max_scan: int = 20) -> Optional[int]:
+        """Lowest labelled index without history, or None."""
+        unused = self.unused_indexes(script_hex, max_scan)
+        return unused[0] if unused else None
+
+    def label(self, script_hex: str, index: int) -> Optional[str]:
+        """The exact wallet label for ``(script_hex, index)``, preserving its case."""
+        return self._indexed.get((script_hex or "").lower(), {}).get(index)
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+bech32/npub micro-benchmark for HODLXXI.
+
+Compares app/bech32_codec.py with the reference implementation (the bech32
+package, which the app's previous inline encoders copied) for the
+conversions on the explorer's hot path.
+
+Usage: python scripts/bench_bech32.py [--rounds N]
+"""
+import argparse
+import os
+import sys
+import timeit
+
+# Add the app directory to the path (app modules import each other flat)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app"))
+
+import bech32
+
+import bech32_codec
+
+PUBKEY = "02" + "7e7e9c42a91bfef19fa929e5fda1b72e0ebc1a4c1141673e2794234d86addf4e"
+NPUB = bech32_codec.hex_to_npub(PUBKEY)
+URL = "https://hodlxxi.example/api/lnurl-auth/params?session_id=" + "ab" * 16
+
+
+def reference_npub(hex_pubkey):
+    return bech32.bech32_encode("npub", bech32.convertbits(bytes.fromhex(hex_pubkey[2:66]), 8, 5))
+
+
+def reference_npub_to_hex(npub):
+    _, data = bech32.bech32_decode(npub)
+    return bytes(bech32.convertbits(data, 5, 8, False)).hex()
+
+
+CASES = [
+    ("hex -> npub (reference)", lambda: reference_npub(PUBKEY)),
+    ("hex -> npub (codec, uncached)", lambda: bech32_codec.hex_to_npub.__wrapped__(PUBKEY)),
+    ("hex -> npub (codec, memo hit)", lambda: bech32_codec.hex_to_npub(PUBKEY)),
+    ("npub -> hex (reference)", lambda: reference_npub_to_hex(NPUB)),
+    ("npub -> hex (codec, uncached)", lambda: bech32_codec.npub_to_hex.__wrapped__(NPUB)),
+    ("lnurl encode (reference)", lambda: bech32.bech32_encode("lnurl", bech32.convertbits(URL.encode(), 8, 5))),
+    ("lnurl encode (codec)", lambda: bech32_codec.encode_lnurl(URL)),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rounds", type=int, default=20000)
+    args = parser.parse_args()
+
+    print(f"{'case':<32} {'us/op':>8}")
+    for name, fn in CASES:
+        best = min(timeit.repeat(fn, number=args.rounds, repeat=3)) / args.rounds
+        print(f"{name:<32} {best * 1e6:>8.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Covenant parsing benchmark for HODLXXI.
+
+Renders the explorer fields (branch keys, formatted ASM, masked descriptor)
+for a synthetic wallet of N covenants, once with the previous multi-pass
+helpers and once with app/covenant.py (cold and memoized).
+
+Usage: python scripts/bench_covenant.py [--covenants N]
+"""
+import argparse
+import os
+import re
+import sys
+import time
+
+# Add the app directory to the path (app modules import each other flat)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app"))
+
+from covenant import clickable_trunc, mask_descriptor, mask_timelocks, parse_covenant
+
+
+def legacy_op_if(asm):
+    ops = asm.split()
+    for i, op in enumerate(ops):
+        if op == "OP_IF":
+            for j in range(i + 1, min(i + 6, len(ops))):
+                if re.fullmatch(r"[0-9a-fA-F]{66}", ops[j]) or re.fullmatch(r"[0-9a-fA-F]{130}", ops[j]):
+                    return ops[j]
+    return None
+
+
+def legacy_op_else(asm):
+    ops = asm.split()
+    try:
+        idx = ops.index("OP_ELSE")
+        for token in ops[idx + 1 :]:
+            if re.fullmatch(r"[0-9a-fA-F]{66}", token) or re.fullmatch(r"[0-9a-fA-F]{130}", token):
+                return token
+    except ValueError:
+        return None
+    return None
+
+
+def legacy_format_asm(asm):
+    formatted, in_op_if = [], False
+    for op in asm.split():
+        if op == "OP_IF":
+            in_op_if = True
+        elif op == "OP_ENDIF":
+            in_op_if = False
+        if in_op_if and re.fullmatch(r"[0-9a-fA-F]{66}", op):
+            formatted.append(f'<span class="clickable-pubkey" onclick="handlePubKeyClick(\'{op}\');">{op}</span>')
+        else:
+            formatted.append(op)
+    return "\n".join(" ".join(formatted[i : i + 4]) for i in range(0, len(formatted), 4))
+
+
+def legacy_mask(text):
+    m = re.match(r"raw\((?P<hex>[0-9a-fA-F]+)\)(?P<suffix>.*)", text)
+    if not m:
+        return mask_timelocks(text)
+    masked = re.sub(r"(03)[0-9a-fA-F]{6}(?=b1)", r"\1*****", m.group("hex"))
+    masked = re.sub(
+        r"(b17521)((?:[0-9a-fA-F]{66}|[0-9a-fA-F]{130}))", lambda mo: mo.group(1) + clickable_trunc(mo.group(2)), masked
+    )
+    return f"raw({masked}){m.group('suffix')}"
+
+
+def wallet(n):
+    for i in range(n):
+        pk_if, pk_else = "02" + f"{i:064x}", "03" + f"{i + n:064x}"
+        script = f"6321{pk_if}ac6703{i % 0xFFFFFF:06x}b17521{pk_else}ac68"
+        asm = f"OP_IF {pk_if} OP_CHECKSIG OP_ELSE {i % 65535} OP_CHECKLOCKTIMEVERIFY OP_DROP {pk_else} OP_CHECKSIG OP_ENDIF"
+        yield f"raw({script})#00000000", asm
+
+
+def legacy(covenants):
+    return [(legacy_op_if(a), legacy_op_else(a), legacy_format_asm(a), legacy_mask(d)) for d, a in covenants]
+
+
+def single_pass(covenants):
+    out = []
+    for d, a in covenants:
+        cov = parse_covenant(a)
+        out.append((cov.op_if_pub, cov.op_else_pub, cov.formatted_asm, mask_descriptor(d)))
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--covenants", type=int, default=4000, help="wallet size (keep below COVENANT_CACHE_SIZE to measure warm hits)")
+    args = parser.parse_args()
+    covenants = list(wallet(args.covenants))
+    parse_covenant.cache_clear()
+
+    results = {}
+    for name, fn in (("legacy multi-pass", legacy), ("single pass (cold)", single_pass), ("single pass (memo)", single_pass)):
+        start = time.perf_counter()
+        results[name] = fn(covenants)
+        elapsed = time.perf_counter() - start
+        print(f"{name:<20} {elapsed * 1000:>9.1f} ms  {elapsed / len(covenants) * 1e6:>7.1f} us/covenant")
+    assert len({tuple(r) for r in map(tuple, results.values())}) == 1, "outputs differ"
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+QR rendering benchmark for HODLXXI.
+
+Compares the previous renderer (RGB PNG re-saved at 300 dpi) with the
+1-bit PNG and SVG modes of app/qr_render.py: encode time and the size of
+the base64 payload the JSON endpoints carry.
+
+Usage: python scripts/bench_qr.py [--rounds N]
+"""
+import argparse
+import base64
+import os
+import sys
+import time
+from io import BytesIO
+
+# Add the app directory to the path (app modules import each other flat)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app"))
+
+import qrcode
+
+from qr_render import render_qr
+
+SAMPLES = {
+    "p2wpkh address": "bc1qar0srrr7xfkvy5l643lydnw9re59gtzzwf5mdq",
+    "p2wsh address": "bc1qj77an7ljfw2epsvq98wtj6kfh9aynahdsrl6gxf2n405cvuak9dsx2yalv",
+    "covenant descriptor": (
+        "raw(63210" + "2" + "ab" * 32 + "ad029000b2" + "67210" + "3" + "cd" * 32 + "ad03a08601b168)#8x6ja5uq"
+    ),
+}
+
+
+def legacy_png_b64(data, box_size=12, border=4):
+    qr = qrcode.QRCode(
+        version=None, error_correction=qrcode.constants.ERROR_CORRECT_Q, box_size=box_size, border=border
+    )
+    qr.add_data(data)
+    qr.make(fit=True)
+    img = qr.make_image(fill_color="black", back_color="white").convert("RGB")
+    buf = BytesIO()
+    img.save(buf, format="PNG", dpi=(300, 300))
+    return base64.b64encode(buf.getvalue()).decode("utf-8")
+
+
+RENDERERS = {
+    "legacy rgb 300dpi": legacy_png_b64,
+    "png (1-bit)": lambda data: render_qr(data, fmt="png"),
+    "svg": lambda data: render_qr(data, fmt="svg"),
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'sample':<22} {'renderer':<20} {'ms/code':>9} {'b64 bytes':>10} {'vs legacy':>10}")
+    for sample, data in SAMPLES.items():
+        baseline = None
+        for name, render in RENDERERS.items():
+            start = time.perf_counter()
+            for _ in range(args.rounds):
+                payload = render(data)
+            ms = (time.perf_counter() - start) / args.rounds * 1000
+            baseline = baseline or len(payload)
+            print(f"{sample:<22} {name:<20} {ms:>9.2f} {len(payload):>10} {len(payload) / baseline:>9.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
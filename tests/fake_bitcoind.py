@@ -0,0 +1,652 @@
+"""
+Deterministic stand-in for bitcoind's JSON-RPC interface.
+
+Benchmarks and tests need a node that behaves like the real one without a
+mainnet wallet. ``FakeBitcoind`` serves the RPC methods ``app.py`` calls over
+real HTTP (keep-alive, Basic auth, JSON-RPC 1.0 batches), backed by a
+``FakeWallet`` generated from a seed:
+
+* ``covenants`` CSV covenant scripts (``OP_IF <a> OP_CHECKSIG OP_ELSE 144
+  OP_CHECKSEQUENCEVERIFY OP_DROP <b> OP_CHECKSIG OP_ENDIF``), imported as
+  ``raw()`` descriptors and labeled with their P2WSH hex
+* UTXOs on two out of three covenant addresses
+* ``labeled`` covenants with checking addresses labeled ``"<segwit hex> [i]"``
+
+The same seed always produces the same keys, scripts, txids and amounts.
+Latency can be injected per method (``"*"`` for all) and a fraction of calls
+per method can fail with an RPC error, a ``-28`` warm-up reply or a dropped
+connection, using a seeded RNG so failures are reproducible too.
+
+Run standalone (then point ``RPC_HOST``/``RPC_PORT`` at it)::
+
+    python -m tests.fake_bitcoind --covenants 10000 --port 18443 \\
+        --latency '*=0.002' --latency listunspent=0.02 --fail decodescript=0.05
+"""
+
+import argparse
+import base64
+import hashlib
+import json
+import random
+import threading
+import time
+from decimal import Decimal
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from coincurve import PrivateKey
+
+from app.bip32 import XpubDeriver, add_checksum, p2wpkh_address
+from app.message_verify import MessageVerifyError, verify_message
+from app.script_decoder import decode_script, script_to_asm
+
+COIN = Decimal("0.00000001")
+CSV_DELAY = "029000"  # push 144
+TIP_HEIGHT = 850_000
+
+RPC_MISC_ERROR = -1
+RPC_TYPE_ERROR = -3
+RPC_INVALID_ADDRESS_OR_KEY = -5
+RPC_WALLET_INVALID_LABEL_NAME = -11
+RPC_DESERIALIZATION_ERROR = -22
+RPC_IN_WARMUP = -28
+RPC_METHOD_NOT_FOUND = -32601
+
+
+class RPCError(Exception):
+    """An error reply (``{"code", "message"}``) from a fake RPC method."""
+
+    def __init__(self, code: int, message: str):
+        super().__init__(message)
+        self.code = code
+        self.message = message
+
+
+def _key(seed: int, tag: str, i: int) -> str:
+    secret = hashlib.sha256(f"fake-bitcoind:{seed}:{tag}:{i}".encode()).digest()
+    return PrivateKey(secret).public_key.format(compressed=True).hex()
+
+
+def _txid(seed: int, tag: str, i: int) -> str:
+    return hashlib.sha256(f"fake-bitcoind:{seed}:tx:{tag}:{i}".encode()).hexdigest()
+
+
+def covenant_script(op_if_pub: str, op_else_pub: str) -> str:
+    return f"6321{op_if_pub}ac67{CSV_DELAY}b27521{op_else_pub}ac68"
+
+
+class FakeWallet:
+    """
+    Seeded wallet contents and the RPC methods that read or modify them.
+
+    Args:
+        covenants: Number of covenant descriptors
+        labeled: Covenants that also get ``label_range`` labeled checking addresses
+        label_range: Checking addresses per labeled covenant
+        seed: Everything derived from this value
+        network: Address network for ``script_decoder`` (main/test/signet/regtest)
+    """
+
+    def __init__(
+        self,
+        covenants: int = 100,
+        labeled: int = 10,
+        label_range: int = 3,
+        seed: int = 0,
+        network: str = "main",
+    ):
+        self.seed = seed
+        self.network = network
+        self.descriptors: List[Dict[str, Any]] = []
+        self.covenants: List[Dict[str, Any]] = []
+        self.labels: Dict[str, str] = {}  # address -> label
+        self.utxos: Dict[str, List[Dict[str, Any]]] = {}  # address -> unspent outputs
+        self.received: Dict[str, Decimal] = {}
+        self.pubkeys: Dict[str, str] = {}  # address -> pubkey (single-key addresses)
+        self.scripts: Dict[str, str] = {}  # address -> scriptPubKey hex
+        self._spk: Dict[str, Dict[str, Any]] = {}
+        self._deriver = XpubDeriver()
+        self._lock = threading.Lock()
+
+        for i in range(covenants):
+            op_if, op_else = _key(seed, "if", i), _key(seed, "else", i)
+            script = covenant_script(op_if, op_else)
+            segwit = decode_script(script, network)["segwit"]
+            cov = {"script": script, "op_if": op_if, "op_else": op_else, "address": segwit["address"]}
+            cov["segwit_hex"] = segwit["hex"]
+            self.covenants.append(cov)
+            self.scripts[cov["address"]] = cov["segwit_hex"]
+            self.descriptors.append(self._descriptor(f"raw({script})"))
+            self.labels[cov["address"]] = cov["segwit_hex"]
+            if i % 3 != 2:
+                self._fund(cov["address"], _txid(seed, "cov", i), Decimal((i % 7 + 1) * 100_000) * COIN, i)
+
+            if i < labeled:
+                for j in range(label_range):
+                    pub = _key(seed, f"chk{i}", j)
+                    addr = p2wpkh_address(bytes.fromhex(pub), self._hrp())
+                    self.pubkeys[addr] = pub
+                    self.scripts[addr] = decode_script(f"21{pub}ac", network)["segwit"]["hex"]
+                    self.labels[addr] = f"{cov['segwit_hex']} [{j}]"
+                    if j == 0:  # first checking address is used, the rest are unused
+                        self._fund(addr, _txid(seed, f"chk{i}", j), Decimal(50_000) * COIN, i)
+
+    def _hrp(self) -> str:
+        return {"main": "bc", "test": "tb", "signet": "tb", "regtest": "bcrt"}[self.network]
+
+    @staticmethod
+    def _descriptor(desc: str, **extra) -> Dict[str, Any]:
+        return {"desc": add_checksum(desc), "timestamp": 1_700_000_000, "active": False, **extra}
+
+    def _fund(self, address: str, txid: str, amount: Decimal, i: int) -> None:
+        self.utxos.setdefault(address, []).append(
+            {"txid": txid, "vout": 0, "amount": amount, "confirmations": 1 + i % 100}
+        )
+        self.received[address] = self.received.get(address, Decimal(0)) + amount
+
+    def _utxo_entry(self, address: str, utxo: Dict[str, Any]) -> Dict[str, Any]:
+        entry = {"txid": utxo["txid"], "vout": utxo["vout"], "address": address}
+        if address in self.labels:
+            entry["label"] = self.labels[address]
+        entry.update(
+            {
+                "scriptPubKey": self._script_pub_key(address)["hex"],
+                "amount": utxo["amount"],
+                "confirmations": utxo["confirmations"],
+                "spendable": False,
+                "solvable": False,
+                "safe": True,
+            }
+        )
+        return entry
+
+    def _script_pub_key(self, address: str) -> Dict[str, Any]:
+        spk = self._spk.get(address)
+        if spk is None:
+            script = self.scripts.get(address, "")
+            decoded = decode_script(script, self.network)
+            spk = {"asm": decoded["asm"], "hex": script, "address": address, "type": decoded["type"]}
+            self._spk[address] = spk
+        return spk
+
+    # --- chain / node ---
+
+    def getblockcount(self):
+        return TIP_HEIGHT
+
+    def getbestblockhash(self):
+        return hashlib.sha256(f"fake-bitcoind:{self.seed}:block:{TIP_HEIGHT}".encode()).hexdigest()
+
+    def getmempoolinfo(self):
+        return {"loaded": True, "size": 0, "bytes": 0, "usage": 0, "total_fee": Decimal(0)}
+
+    def uptime(self):
+        return 3600
+
+    # --- wallet reads ---
+
+    def getbalance(self, *args):
+        return sum((u["amount"] for utxos in self.utxos.values() for u in utxos), Decimal(0))
+
+    def getwalletinfo(self):
+        return {
+            "walletname": "fake",
+            "walletversion": 169900,
+            "format": "sqlite",
+            "balance": self.getbalance(),
+            "txcount": sum(len(u) for u in self.utxos.values()),
+            "private_keys_enabled": False,
+            "descriptors": True,
+        }
+
+    def listdescriptors(self, private=False):
+        return {"wallet_name": "fake", "descriptors": list(self.descriptors)}
+
+    def listunspent(self, minconf=1, maxconf=9999999, addresses=None, *args):
+        wanted = self.utxos.keys() if addresses is None else addresses
+        out = []
+        for address in wanted:
+            for utxo in self.utxos.get(address, ()):
+                if minconf <= utxo["confirmations"] <= maxconf:
+                    out.append(self._utxo_entry(address, utxo))
+        return out
+
+    def listaddressgroupings(self):
+        groups = []
+        for address in self.received:
+            entry = [address, sum((u["amount"] for u in self.utxos.get(address, ())), Decimal(0))]
+            if address in self.labels:
+                entry.append(self.labels[address])
+            groups.append([entry])
+        return groups
+
+    def listlabels(self, purpose=None):
+        return sorted(set(self.labels.values()))
+
+    def getaddressesbylabel(self, label):
+        found = {a: {"purpose": "receive"} for a, lbl in self.labels.items() if lbl == label}
+        if not found:
+            raise RPCError(RPC_WALLET_INVALID_LABEL_NAME, f"No addresses with label {label}")
+        return found
+
+    def getreceivedbyaddress(self, address, minconf=1, *args):
+        if not address:
+            raise RPCError(RPC_INVALID_ADDRESS_OR_KEY, "Invalid Bitcoin address")
+        return self.received.get(address, Decimal(0))
+
+    def getreceivedbylabel(self, label, minconf=1, *args):
+        return sum((amt for a, amt in self.received.items() if self.labels.get(a) == label), Decimal(0))
+
+    def listreceivedbyaddress(self, *args):
+        return [
+            {"address": a, "amount": amt, "confirmations": 1, "label": self.labels.get(a, ""), "txids": []}
+            for a, amt in self.received.items()
+        ]
+
+    def listreceivedbylabel(self, *args):
+        totals: Dict[str, Decimal] = {}
+        for address, amount in self.received.items():
+            label = self.labels.get(address, "")
+            totals[label] = totals.get(label, Decimal(0)) + amount
+        return [{"amount": amt, "confirmations": 1, "label": lbl} for lbl, amt in totals.items()]
+
+    def listtransactions(self, *args):
+        return [
+            {"address": a, "category": "receive", "amount": u["amount"], "txid": u["txid"], "vout": u["vout"]}
+            for a, utxos in self.utxos.items()
+            for u in utxos
+        ]
+
+    def getaddressinfo(self, address):
+        info = {"address": address, "ismine": False, "iswatchonly": True, "solvable": address in self.pubkeys}
+        info["labels"] = [self.labels[address]] if address in self.labels else []
+        if address in self.pubkeys:
+            info["pubkey"] = self.pubkeys[address]
+        return info
+
+    def gettxout(self, txid, n, include_mempool=True):
+        for address, utxos in self.utxos.items():
+            for u in utxos:
+                if u["txid"] == txid and u["vout"] == n:
+                    return {
+                        "bestblock": self.getbestblockhash(),
+                        "confirmations": u["confirmations"],
+                        "value": u["amount"],
+                        "scriptPubKey": self._script_pub_key(address),
+                        "coinbase": False,
+                    }
+        return None
+
+    # --- scripts / descriptors ---
+
+    def decodescript(self, hexstring):
+        try:
+            return decode_script(hexstring, self.network)
+        except ValueError as e:
+            raise RPCError(RPC_DESERIALIZATION_ERROR, "argument must be hexadecimal string") from e
+
+    def getdescriptorinfo(self, descriptor):
+        try:
+            desc = add_checksum(descriptor)
+        except ValueError as e:
+            raise RPCError(RPC_INVALID_ADDRESS_OR_KEY, str(e)) from e
+        body, checksum = desc.split("#")
+        return {
+            "descriptor": desc,
+            "checksum": checksum,
+            "isrange": "*" in body,
+            "issolvable": not body.startswith(("raw(", "addr(")),
+            "hasprivatekeys": False,
+        }
+
+    def deriveaddresses(self, descriptor, range_=None):
+        body = descriptor.split("#", 1)[0]
+        if body.startswith("addr(") and body.endswith(")"):
+            return [body[5:-1]]
+        if body.startswith("raw(") and body.endswith(")"):
+            address = decode_script(body[4:-1], self.network).get("address")
+            if address:
+                return [address]
+        elif body.startswith("wpkh(") and body.endswith(")"):
+            xpub, *path = body[5:-1].split("/")
+            if path and path[-1] == "*":
+                start, end = (range_ if isinstance(range_, list) else [0, range_ or 0])
+                return self._deriver.addresses(xpub, start, end, branch=tuple(int(p) for p in path[:-1]))
+            if path:
+                *branch, last = (int(p) for p in path)
+                return self._deriver.addresses(xpub, last, last, branch=tuple(branch))
+        raise RPCError(RPC_INVALID_ADDRESS_OR_KEY, "Descriptor does not have a corresponding address")
+
+    # --- wallet writes ---
+
+    def importdescriptors(self, requests):
+        results = []
+        with self._lock:
+            for req in requests:
+                desc = req["desc"]
+                self.descriptors.append(self._descriptor(desc, active=bool(req.get("active"))))
+                if req.get("label") is not None and desc.startswith("addr("):
+                    self.labels[desc.split("#", 1)[0][5:-1]] = req["label"]
+                results.append({"success": True})
+        return results
+
+    def setlabel(self, address, label):
+        with self._lock:
+            self.labels[address] = label
+        return None
+
+    def rescanblockchain(self, *args):
+        return {"start_height": 0, "stop_height": TIP_HEIGHT}
+
+    def backupwallet(self, destination):
+        return None
+
+    # --- messages / PSBT ---
+
+    def verifymessage(self, address, signature, message):
+        try:
+            return verify_message(address, signature, message)
+        except MessageVerifyError as e:
+            raise RPCError(RPC_INVALID_ADDRESS_OR_KEY if "address" in str(e) else RPC_TYPE_ERROR, str(e)) from e
+
+    def decodepsbt(self, psbt):
+        try:
+            return decode_psbt(psbt, self.network)
+        except (ValueError, IndexError) as e:
+            raise RPCError(RPC_DESERIALIZATION_ERROR, f"TX decode failed {e}") from e
+
+
+# --- PSBT (BIP174 v0): only the unsigned transaction is decoded ---
+
+
+def _read_compact_size(data: bytes, pos: int) -> Tuple[int, int]:
+    first = data[pos]
+    if first < 0xFD:
+        return first, pos + 1
+    size = {0xFD: 2, 0xFE: 4, 0xFF: 8}[first]
+    return int.from_bytes(data[pos + 1 : pos + 1 + size], "little"), pos + 1 + size
+
+
+def _decode_tx(raw: bytes, network: str) -> Dict[str, Any]:
+    pos = 4
+    version = int.from_bytes(raw[:4], "little")
+    n_in, pos = _read_compact_size(raw, pos)
+    vin = []
+    for _ in range(n_in):
+        txid = raw[pos : pos + 32][::-1].hex()
+        vout = int.from_bytes(raw[pos + 32 : pos + 36], "little")
+        slen, pos = _read_compact_size(raw, pos + 36)
+        script_sig = raw[pos : pos + slen]
+        pos += slen
+        sequence = int.from_bytes(raw[pos : pos + 4], "little")
+        pos += 4
+        vin.append(
+            {
+                "txid": txid,
+                "vout": vout,
+                "scriptSig": {"asm": script_to_asm(script_sig), "hex": script_sig.hex()},
+                "sequence": sequence,
+            }
+        )
+    n_out, pos = _read_compact_size(raw, pos)
+    vout_list = []
+    for n in range(n_out):
+        value = int.from_bytes(raw[pos : pos + 8], "little")
+        slen, pos = _read_compact_size(raw, pos + 8)
+        spk = raw[pos : pos + slen]
+        pos += slen
+        decoded = decode_script(spk.hex(), network)
+        script_pub_key = {"asm": decoded["asm"], "hex": spk.hex(), "type": decoded["type"]}
+        if "address" in decoded:
+            script_pub_key["address"] = decoded["address"]
+        vout_list.append({"value": Decimal(value) * COIN, "n": n, "scriptPubKey": script_pub_key})
+    locktime = int.from_bytes(raw[pos : pos + 4], "little")
+    txid = hashlib.sha256(hashlib.sha256(raw).digest()).digest()[::-1].hex()
+    return {
+        "txid": txid,
+        "hash": txid,
+        "version": version,
+        "size": len(raw),
+        "locktime": locktime,
+        "vin": vin,
+        "vout": vout_list,
+    }
+
+
+def decode_psbt(psbt_b64: str, network: str = "main") -> Dict[str, Any]:
+    data = base64.b64decode(psbt_b64, validate=True)
+    if data[:5] != b"psbt\xff":
+        raise ValueError("Invalid PSBT magic bytes")
+    pos = 5
+    tx = None
+    while data[pos] != 0x00:
+        klen, pos = _read_compact_size(data, pos)
+        key = data[pos : pos + klen]
+        pos += klen
+        vlen, pos = _read_compact_size(data, pos)
+        if key == b"\x00":
+            tx = _decode_tx(data[pos : pos + vlen], network)
+        pos += vlen
+    if tx is None:
+        raise ValueError("No unsigned transaction was provided")
+    return {
+        "tx": tx,
+        "global_xpubs": [],
+        "psbt_version": 0,
+        "proprietary": [],
+        "unknown": {},
+        "inputs": [{} for _ in tx["vin"]],
+        "outputs": [{} for _ in tx["vout"]],
+    }
+
+
+# --- HTTP server ---
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: "FakeBitcoind"
+
+    def do_POST(self):
+        if self.server.auth and self.headers.get("Authorization") != self.server.auth:
+            self.send_response(401)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])), parse_float=Decimal)
+        if isinstance(body, list):
+            replies = [self.server.dispatch(item) for item in body]
+            if any(r is None for r in replies):
+                self.close_connection = True
+                return
+            self._reply([r[0] for r in replies], 200)
+            return
+        reply = self.server.dispatch(body)
+        if reply is None:
+            self.close_connection = True  # injected transport failure
+            return
+        self._reply(*reply)
+
+    def _reply(self, payload: Any, status: int) -> None:
+        data = json.dumps(payload, default=_json_default).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+def _json_default(obj):
+    if isinstance(obj, Decimal):
+        return float(obj)
+    raise TypeError(f"{type(obj).__name__} is not JSON serializable")
+
+
+class FakeBitcoind(ThreadingHTTPServer):
+    """
+    Threaded JSON-RPC server over a ``FakeWallet``.
+
+    Args:
+        wallet: Wallet to serve (a default-sized one if omitted)
+        host, port: Bind address (port 0 picks a free port)
+        user, password: Required Basic-auth credentials (None accepts any)
+        latency: Seconds to sleep per call, by method name or ``"*"``
+        failures: Fraction of calls (0..1) that fail, by method name or ``"*"``
+        failure_mode: ``"error"`` (RPC_MISC_ERROR), ``"warmup"`` (-28) or
+            ``"disconnect"`` (close the connection without a reply)
+        seed: Seed for the failure RNG
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        wallet: Optional[FakeWallet] = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        user: Optional[str] = None,
+        password: Optional[str] = None,
+        latency: Optional[Dict[str, float]] = None,
+        failures: Optional[Dict[str, float]] = None,
+        failure_mode: str = "error",
+        seed: int = 0,
+    ):
+        super().__init__((host, port), _Handler)
+        self.wallet = wallet if wallet is not None else FakeWallet(seed=seed)
+        self.auth = None
+        if user is not None:
+            self.auth = "Basic " + base64.b64encode(f"{user}:{password or ''}".encode()).decode()
+        self.latency = dict(latency or {})
+        self.failures = dict(failures or {})
+        self.failure_mode = failure_mode
+        self._rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+        self._calls_lock = threading.Lock()
+        self.calls: Dict[str, int] = {}
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def port(self) -> int:
+        return self.server_address[1]
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.server_address[0]}:{self.port}"
+
+    def _should_fail(self, method: str) -> bool:
+        rate = self.failures.get(method, self.failures.get("*", 0.0))
+        if rate <= 0:
+            return False
+        with self._rng_lock:
+            return self._rng.random() < rate
+
+    def dispatch(self, body: Dict[str, Any]) -> Optional[Tuple[Dict[str, Any], int]]:
+        """Run one JSON-RPC request; ``(reply, http status)`` or None to drop the connection."""
+        method, params, req_id = body.get("method"), body.get("params") or [], body.get("id")
+        with self._calls_lock:
+            self.calls[method] = self.calls.get(method, 0) + 1
+
+        delay = self.latency.get(method, self.latency.get("*", 0.0))
+        if delay:
+            time.sleep(delay)
+
+        if self._should_fail(method):
+            if self.failure_mode == "disconnect":
+                return None
+            if self.failure_mode == "warmup":
+                return _error(req_id, RPC_IN_WARMUP, "Loading block index..."), 500
+            return _error(req_id, RPC_MISC_ERROR, f"injected failure in {method}"), 500
+
+        handler: Optional[Callable[..., Any]] = getattr(self.wallet, method, None) if method else None
+        if handler is None or method.startswith("_"):
+            return _error(req_id, RPC_METHOD_NOT_FOUND, "Method not found"), 404
+        try:
+            return {"result": handler(*params), "error": None, "id": req_id}, 200
+        except RPCError as e:
+            return _error(req_id, e.code, e.message), 500
+        except TypeError as e:
+            return _error(req_id, RPC_MISC_ERROR, str(e)), 500
+
+    def start(self) -> "FakeBitcoind":
+        self._thread = threading.Thread(
+            target=self.serve_forever, kwargs={"poll_interval": 0.05}, name="fake-bitcoind", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+
+    def __enter__(self) -> "FakeBitcoind":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+
+def _error(req_id: Any, code: int, message: str) -> Dict[str, Any]:
+    return {"result": None, "error": {"code": code, "message": message}, "id": req_id}
+
+
+def _parse_rates(pairs: List[str]) -> Dict[str, float]:
+    out = {}
+    for pair in pairs:
+        method, _, value = pair.partition("=")
+        out[method] = float(value)
+    return out
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Deterministic fake bitcoind JSON-RPC server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=18443)
+    parser.add_argument("--user", default=None)
+    parser.add_argument("--password", default=None)
+    parser.add_argument("--covenants", type=int, default=1000)
+    parser.add_argument("--labeled", type=int, default=10)
+    parser.add_argument("--label-range", type=int, default=3)
+    parser.add_argument("--network", default="main", choices=["main", "test", "signet", "regtest"])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--latency", action="append", default=[], metavar="METHOD=SECONDS")
+    parser.add_argument("--fail", action="append", default=[], metavar="METHOD=RATE")
+    parser.add_argument("--failure-mode", default="error", choices=["error", "warmup", "disconnect"])
+    args = parser.parse_args(argv)
+
+    started = time.monotonic()
+    wallet = FakeWallet(
+        covenants=args.covenants,
+        labeled=args.labeled,
+        label_range=args.label_range,
+        seed=args.seed,
+        network=args.network,
+    )
+    server = FakeBitcoind(
+        wallet,
+        host=args.host,
+        port=args.port,
+        user=args.user,
+        password=args.password,
+        latency=_parse_rates(args.latency),
+        failures=_parse_rates(args.fail),
+        failure_mode=args.failure_mode,
+        seed=args.seed,
+    )
+    print(
+        f"fake bitcoind: {args.covenants} covenants built in {time.monotonic() - started:.1f}s, "
+        f"listening on {server.url} (RPC_HOST={args.host} RPC_PORT={server.port})",
+        flush=True,
+    )
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
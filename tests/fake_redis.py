@@ -0,0 +1,24 @@
+"""
+In-memory stand-in for the few Redis commands the shared caches use.
+
+Covers ``get``, ``set`` (recording the ``ex`` TTL per key) and ``incr``;
+expiry itself is not simulated. Pass one instance to several cache objects to
+model gunicorn workers sharing a Redis.
+"""
+
+
+class FakeRedis:
+    def __init__(self):
+        self.data = {}
+        self.ttls = {}
+
+    def get(self, key):
+        return self.data.get(key)
+
+    def set(self, key, value, ex=None):
+        self.data[key] = value
+        self.ttls[key] = ex
+
+    def incr(self, key):
+        self.data[key] = int(self.data.get(key) or 0) + 1
+        return self.data[key]
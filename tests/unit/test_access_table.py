@@ -0,0 +1,265 @@
+"""
+Unit tests for the materialized per-pubkey access table.
+"""
+
+import json
+import time
+from decimal import Decimal
+
+import pytest
+
+from app.access_table import AccessTable, access_level_for
+from app.chain_watcher import ChainTipWatcher, ManualTipSource
+from tests.fake_redis import FakeRedis
+
+PK_A = "02" + "aa" * 32
+PK_B = "03" + "bb" * 32
+
+
+@pytest.fixture
+def chain():
+    source = ManualTipSource()
+    watcher = ChainTipWatcher(source, interval=0.01)
+    return source, watcher
+
+
+def _scan(totals):
+    calls = []
+
+    def scan():
+        calls.append(1)
+        return dict(totals)
+
+    return scan, calls
+
+
+class TestAccessLevel:
+    """Test the login rule."""
+
+    @pytest.mark.parametrize(
+        "in_total,out_total,level",
+        [("0", "0", "limited"), ("0", "1", "limited"), ("1", "0.5", "limited"), ("1", "1", "full"), ("1", "2", "full")],
+    )
+    def test_ratio(self, in_total, out_total, level):
+        """Test that out/in >= 1 grants full access and no deposits never does."""
+        assert access_level_for(Decimal(in_total), Decimal(out_total)) == level
+
+
+class TestAccessTable:
+    """Test refresh and lookup."""
+
+    def test_not_ready_until_first_refresh(self, chain):
+        """Test that lookups fall back before a tip and a table exist."""
+        _, watcher = chain
+        scan, calls = _scan({PK_A: (Decimal(1), Decimal(2))})
+        table = AccessTable(scan, watcher)
+        assert table.lookup(PK_A) is None
+        assert table.refresh() is False and calls == []
+
+        watcher.poll()
+        assert table.refresh() is True
+        entry = table.lookup(PK_A.upper())
+        assert (entry.in_total, entry.out_total, entry.access_level) == (Decimal(1), Decimal(2), "full")
+        assert table.lookup(PK_B).access_level == "limited"
+
+    def test_one_sweep_per_tip(self, chain):
+        """Test that the wallet is swept once per tip, not per lookup."""
+        source, watcher = chain
+        scan, calls = _scan({PK_A: (Decimal(1), Decimal(0))})
+        table = AccessTable(scan, watcher)
+        watcher.poll()
+        table.refresh()
+        table.refresh()
+        for _ in range(10):
+            table.lookup(PK_A)
+        assert len(calls) == 1
+
+        source.advance("block2")
+        watcher.poll()
+        table.refresh()
+        assert len(calls) == 2
+
+    def test_previous_table_serves_within_max_lag(self, chain):
+        """Test that a tip change keeps the old table only for max_lag seconds."""
+        source, watcher = chain
+        scan, _ = _scan({PK_A: (Decimal(1), Decimal(1))})
+        table = AccessTable(scan, watcher, max_lag=0.05)
+        watcher.poll()
+        table.refresh()
+
+        source.advance("block2")
+        watcher.poll()
+        assert table.lookup(PK_A).access_level == "full"
+        time.sleep(0.06)
+        assert table.lookup(PK_A) is None
+
+    def test_invalidate_rebuilds_same_tip(self, chain):
+        """Test that a wallet change without a new tip triggers another sweep."""
+        _, watcher = chain
+        totals = {PK_A: (Decimal(1), Decimal(0))}
+        table = AccessTable(lambda: dict(totals), watcher)
+        watcher.poll()
+        table.refresh()
+
+        totals[PK_A] = (Decimal(1), Decimal(1))
+        table.invalidate()
+        table.refresh()
+        assert table.lookup(PK_A).access_level == "full"
+
+    def test_invalidated_table_does_not_serve(self, chain):
+        """Test that after invalidate() lookups fall back to a live scan until the rebuild lands."""
+        _, watcher = chain
+        totals = {PK_A: (Decimal(1), Decimal(0))}
+        table = AccessTable(lambda: dict(totals), watcher, max_lag=30)
+        watcher.poll()
+        table.refresh()
+        assert table.ready
+
+        totals[PK_A] = (Decimal(1), Decimal(1))
+        table.invalidate()
+        assert not table.ready and table.lookup(PK_A) is None
+        table.refresh()
+        assert table.ready and table.lookup(PK_A).access_level == "full"
+
+    def test_invalidated_table_stays_off_while_rebuild_fails(self, chain):
+        """Test that a failed rebuild after invalidate() does not bring the stale table back."""
+        _, watcher = chain
+        results = [{PK_A: (Decimal(1), Decimal(0))}]
+
+        def scan():
+            if not results:
+                raise ConnectionError("node down")
+            return results.pop()
+
+        table = AccessTable(scan, watcher, max_lag=30)
+        watcher.poll()
+        table.refresh()
+        table.invalidate()
+        assert table.refresh() is False
+        assert table.lookup(PK_A) is None
+
+    def test_failed_scan_keeps_old_table(self, chain):
+        """Test that a failing sweep leaves the previous table and counts the error."""
+        source, watcher = chain
+        results = [{PK_A: (Decimal(1), Decimal(1))}]
+
+        def scan():
+            if not results:
+                raise ConnectionError("node down")
+            return results.pop()
+
+        table = AccessTable(scan, watcher)
+        watcher.poll()
+        table.refresh()
+        source.advance("block2")
+        watcher.poll()
+        assert table.refresh() is False
+        assert table.lookup(PK_A).access_level == "full"
+        assert table.stats()["errors"] == 1
+
+    def test_background_thread_follows_tip(self, chain):
+        """Test that the worker rebuilds after watcher notifications."""
+        source, watcher = chain
+        scan, calls = _scan({PK_A: (Decimal(2), Decimal(3))})
+        table = AccessTable(scan, watcher)
+        table.start()
+        try:
+            watcher.poll()
+            deadline = time.monotonic() + 2
+            while table.stats()["tip"] != "genesis" and time.monotonic() < deadline:
+                time.sleep(0.01)
+            assert table.lookup(PK_A).access_level == "full"
+        finally:
+            table.stop()
+
+    def test_shared_table_is_adopted(self, chain):
+        """Test that a second worker loads the same tip's table from Redis instead of sweeping."""
+        _, watcher = chain
+        redis = FakeRedis()
+        scan, calls = _scan({PK_A: (Decimal("0.5"), Decimal("0.5"))})
+        watcher.poll()
+
+        AccessTable(scan, watcher, redis_client=redis).refresh()
+        other = AccessTable(scan, watcher, redis_client=redis)
+        assert other.refresh() is True
+        assert len(calls) == 1
+        assert other.lookup(PK_A).out_total == Decimal("0.5")
+        assert json.loads(redis.data["hodlxxi:access:table:0"])["tip"] == "genesis"
+
+    def test_invalidate_reaches_other_workers(self, chain):
+        """Test that invalidate() in one worker stops every worker serving, and a rebuild is shared again."""
+        _, watcher = chain
+        redis = FakeRedis()
+        totals = {PK_A: (Decimal(1), Decimal(0))}
+        scan, calls = _scan(totals)
+        watcher.poll()
+        writer = AccessTable(lambda: dict(totals), watcher, redis_client=redis, max_lag=30)
+        reader = AccessTable(scan, watcher, redis_client=redis, max_lag=30)
+        writer.refresh()
+        reader.refresh()
+        assert reader.lookup(PK_A).access_level == "limited" and calls == []
+
+        totals[PK_A] = (Decimal(1), Decimal(1))
+        writer.invalidate()
+        assert reader.lookup(PK_A) is None
+        writer.refresh()
+        assert reader.refresh() is True and calls == []
+        assert reader.lookup(PK_A).access_level == "full"
+
+    def test_tip_faster_than_max_lag(self):
+        """Test that a chain moving faster than max_lag keeps being served from recent sweeps."""
+        source = ManualTipSource()
+        watcher = ChainTipWatcher(source, interval=1)
+        scan, calls = _scan({PK_A: (Decimal(1), Decimal(1))})
+
+        def slow_scan():
+            # The tip moves during every sweep
+            source.advance()
+            watcher.poll()
+            return scan()
+
+        table = AccessTable(slow_scan, watcher, max_lag=0.3)
+        watcher.poll()
+        served = 0
+        for _ in range(8):
+            table.refresh()
+            time.sleep(0.1)
+            served += table.lookup(PK_A) is not None
+        assert served == 8 and len(calls) == 8
+
+    def test_lag_counts_from_first_tip_change(self):
+        """Test that later tip changes do not extend how long a stale table serves."""
+        source = ManualTipSource()
+        watcher = ChainTipWatcher(source, interval=1)
+        scan, _ = _scan({PK_A: (Decimal(1), Decimal(1))})
+        table = AccessTable(scan, watcher, max_lag=0.2)
+        watcher.poll()
+        table.refresh()
+        for _ in range(4):
+            source.advance()
+            watcher.poll()
+            time.sleep(0.07)
+        assert table.lookup(PK_A) is None
+
+    def test_background_thread_retries_failures(self, chain):
+        """Test that a failed first sweep is retried without waiting for a new tip."""
+        _, watcher = chain
+        attempts = []
+
+        def scan():
+            attempts.append(1)
+            if len(attempts) == 1:
+                raise ConnectionError("node warming up")
+            return {PK_A: (Decimal(1), Decimal(1))}
+
+        watcher.poll()
+        table = AccessTable(scan, watcher, retry_interval=0.01)
+        table.start()
+        try:
+            deadline = time.monotonic() + 2
+            while not table.ready and time.monotonic() < deadline:
+                time.sleep(0.01)
+            assert table.lookup(PK_A).access_level == "full"
+            assert len(attempts) == 2
+        finally:
+            table.stop()
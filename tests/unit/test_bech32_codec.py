@@ -0,0 +1,90 @@
+"""
+Unit tests for the bech32/npub codec.
+"""
+
+import os
+
+import bech32
+import pytest
+
+from app.bech32_codec import (
+    BECH32M,
+    Bech32Error,
+    bytes_to_5bit,
+    decode,
+    decode_bytes,
+    encode,
+    encode_lnurl,
+    five_bit_to_bytes,
+    hex_to_npub,
+    npub_to_hex,
+    segwit_address,
+)
+
+# NIP-19 test vector
+NPUB = "npub10elfcs4fr0l0r8af98jlmgdh9c8tcxjvz9qkw038js35mp4dma8qzvjptg"
+NPUB_HEX = "7e7e9c42a91bfef19fa929e5fda1b72e0ebc1a4c1141673e2794234d86addf4e"
+
+
+class TestCodec:
+    """Test against the reference implementation and BIP vectors."""
+
+    def test_matches_reference(self):
+        """Test that regrouping and encoding agree with the bech32 package."""
+        for n in range(0, 48):
+            payload = os.urandom(n)
+            assert bytes_to_5bit(payload) == bech32.convertbits(payload, 8, 5)
+            assert five_bit_to_bytes(bytes_to_5bit(payload)) == payload
+            expected = bech32.bech32_encode("nsec", bech32.convertbits(payload, 8, 5))
+            assert encode("nsec", bytes_to_5bit(payload)) == expected
+
+    def test_segwit_vectors(self):
+        """Test BIP-173 (v0) and BIP-350 (v1) addresses."""
+        program = bytes.fromhex("751e76e8199196d454941c45d1b3a323f1433bd6")
+        assert segwit_address("bc", 0, program) == "bc1qw508d6qejxtdg4y5r3zarvary0c5xw7kv8f3t4"
+        assert segwit_address("bc", 1, program * 2) == (
+            "bc1pw508d6qejxtdg4y5r3zarvary0c5xw7kw508d6qejxtdg4y5r3zarvary0c5xw7kt5nd6y"
+        )
+        assert decode("A1LQFN3A")[2] == BECH32M
+
+    @pytest.mark.parametrize("bad", ["npub1", "N" + NPUB[1:], NPUB[:-1] + "q"])
+    def test_rejects_invalid(self, bad):
+        """Test that mixed case, short strings and bad checksums are errors."""
+        with pytest.raises(Bech32Error):
+            decode(bad)
+
+    def test_lnurl_has_no_length_limit(self):
+        """Test that long LNURLs encode and round-trip."""
+        url = "https://example.com/api/lnurl-auth/params?session_id=" + "a" * 64
+        lnurl = encode_lnurl(url)
+        assert decode_bytes(lnurl, "lnurl", max_length=None) == url.encode()
+
+
+class TestNpub:
+    """Test hex <-> npub conversion."""
+
+    def test_nip19_vector(self):
+        """Test the NIP-19 example in both directions."""
+        assert hex_to_npub(NPUB_HEX) == NPUB
+        assert hex_to_npub("02" + NPUB_HEX) == NPUB
+        assert npub_to_hex(NPUB) == NPUB_HEX
+
+    def test_uncompressed_uses_x_coordinate(self):
+        """Test that 130-hex keys map to the npub of their x coordinate."""
+        assert hex_to_npub("04" + NPUB_HEX + "00" * 32) == NPUB
+
+    def test_memoized(self):
+        """Test that repeated conversions are served from the memo."""
+        hex_to_npub.cache_clear()
+        for _ in range(5):
+            hex_to_npub("03" + NPUB_HEX)
+        assert hex_to_npub.cache_info().hits == 4
+
+    def test_rejects_bad_input(self):
+        """Test that wrong lengths, hrps and non-hex are errors."""
+        with pytest.raises(ValueError):
+            hex_to_npub("02abcd")
+        with pytest.raises(ValueError):
+            hex_to_npub("02" + "zz" * 32)
+        with pytest.raises(Bech32Error):
+            npub_to_hex(encode("nsec", bytes_to_5bit(bytes(32))))
@@ -0,0 +1,93 @@
+"""
+Unit tests for local BIP32 public derivation and descriptor checksums.
+"""
+
+import pytest
+
+from app.bip32 import BIP32Error, ExtendedPubKey, XpubDeriver, add_checksum, descriptor_checksum
+
+# BIP84 test vector (account 0 of "abandon ... about")
+ZPUB = (
+    "zpub6rFR7y4Q2AijBEqTUquhVz398htDFrtymD9xYYfG1m4wAcvPhXNfE3EfH1r1ADqtfSdVCToUG868RvUUkgDKf31mGDtKsAYz2oz2AGutZYs"
+)
+BIP84_RECEIVE = [
+    ("0330d54fd0dd420a6e5f8d3624f5f3482cae350f79d5f0753bf5beef9c2d91af3c", "bc1qcr8te4kr609gcawutmrza0j4xv80jy8z306fyu"),
+    ("03e775fd51f0dfb8cd865d9ff1cca2a158cf651fe997fdc9fee9c1d3b5e995ea77", "bc1qnjg0jd8228aq7egyzacy8cys3knf9xvrerkf9g"),
+]
+BIP84_CHANGE_0 = "bc1q8c6fshw2dlwun7ekn9qwf37cu2rn755upcp6el"
+
+# BIP32 test vector 1: M/0H and M/0H/1
+XPUB_0H = "xpub68Gmy5EdvgibQVfPdqkBBCHxA5htiqg55crXYuXoQRKfDBFA1WEjWgP6LHhwBZeNK1VTsfTFUHCdrfp1bgwQ9xv5ski8PX9rL2dZXvgGDnw"
+XPUB_0H_1 = "xpub6ASuArnXKPbfEwhqN6e3mwBcDTgzisQN1wXN9BJcM47sSikHjJf3UFHKkNAWbWMiGj7Wf5uMash7SyYq527Hqck2AxYysAA7xmALppuCkwQ"
+
+
+class TestExtendedPubKey:
+    """Test parsing and CKDpub."""
+
+    def test_child_matches_bip32_vector(self):
+        """Test public child derivation against BIP32 test vector 1."""
+        assert ExtendedPubKey.parse(XPUB_0H).child(1).serialize() == XPUB_0H_1
+
+    def test_slip132_versions(self):
+        """Test that a zpub converts to the xpub with the same key data."""
+        key = ExtendedPubKey.parse(ZPUB)
+        assert key.network == "main"
+        xpub = ExtendedPubKey.parse(key.to_xpub())
+        assert (xpub.chain_code, xpub.key) == (key.chain_code, key.key)
+
+    def test_rejects_bad_keys(self):
+        """Test checksum, private-key and hardened-index errors."""
+        with pytest.raises(BIP32Error):
+            ExtendedPubKey.parse(ZPUB[:-1] + "t")
+        with pytest.raises(BIP32Error):
+            ExtendedPubKey.parse(XPUB_0H).child(0x80000000)
+
+
+class TestXpubDeriver:
+    """Test range derivation and memoization."""
+
+    def test_bip84_addresses(self):
+        """Test receive and change P2WPKH addresses from the BIP84 vector."""
+        deriver = XpubDeriver()
+        derived = deriver.derive(ZPUB, 0, 1)
+        assert [(d.pubkey, d.address) for d in derived] == BIP84_RECEIVE
+        assert [d.index for d in derived] == [0, 1]
+        assert deriver.addresses(ZPUB, 0, 0, branch=(1,)) == [BIP84_CHANGE_0]
+
+    def test_memoizes_children(self):
+        """Test that a repeated range is served from the memo."""
+        deriver = XpubDeriver()
+        first = deriver.derive(ZPUB, 0, 19)
+        assert deriver.derive(ZPUB, 0, 19) == first
+        assert deriver.stats() == {"keys": 1, "hits": 20, "misses": 20}
+
+    def test_evicts_least_recently_used_key(self):
+        """Test the bound on remembered extended keys."""
+        deriver = XpubDeriver(max_keys=1)
+        deriver.derive(ZPUB, 0, 0)
+        deriver.derive(XPUB_0H, 0, 0)
+        deriver.derive(ZPUB, 0, 0)
+        assert deriver.stats()["misses"] == 3
+
+    def test_invalid_range(self):
+        """Test that an inverted range is rejected."""
+        with pytest.raises(BIP32Error):
+            XpubDeriver().derive(ZPUB, 5, 1)
+
+
+class TestDescriptorChecksum:
+    """Test Core's descriptor checksum."""
+
+    def test_known_checksum(self):
+        """Test the example from Core's doc/descriptors.md."""
+        desc = (
+            "wpkh([d34db33f/84h/0h/0h]xpub6DJ2dNUysrn5Vt36jH2KLBT2i1auw1tTSSomg8PhqNiUtx8QX2SvC9nrHu81fT41fvDUnhMjEzQgXnQ"
+            "jKEu3oaqMSzhSrHMxyyoEAmUHQbY/0/*)"
+        )
+        assert descriptor_checksum(desc) == "cjjspncu"
+        assert add_checksum(desc + "#qqqqqqqq") == desc + "#cjjspncu"
+
+    def test_invalid_character(self):
+        """Test that characters outside the descriptor charset are rejected."""
+        with pytest.raises(BIP32Error):
+            descriptor_checksum("raw(é)")
@@ -0,0 +1,125 @@
+"""
+Unit tests for the chain-tip watcher and tip-keyed cache.
+"""
+
+import time
+from unittest.mock import MagicMock
+
+from app.chain_watcher import ChainTipWatcher, ManualTipSource, RPCTipSource, TipCache
+
+
+def _watcher(**kwargs):
+    source = ManualTipSource()
+    watcher = ChainTipWatcher(source, interval=0.01, **kwargs)
+    return source, watcher
+
+
+class TestChainTipWatcher:
+    """Test polling and change notification."""
+
+    def test_tip_unknown_until_first_poll(self):
+        """Test that caches are bypassed before the watcher has data."""
+        _, watcher = _watcher()
+        assert watcher.current is None
+        assert watcher.poll() is True
+        assert watcher.current == "genesis"
+
+    def test_subscribers_notified_on_change_only(self):
+        """Test that events fire once per tip change."""
+        source, watcher = _watcher()
+        events = []
+        watcher.subscribe(lambda old, new: events.append((old, new)))
+
+        watcher.poll()
+        watcher.poll()
+        source.advance("block2")
+        watcher.poll()
+
+        assert events == [(None, "genesis"), ("genesis", "block2")]
+
+    def test_failed_polls_make_tip_stale(self):
+        """Test that a dead source eventually reports an unknown tip."""
+        source, watcher = _watcher(max_staleness=0.05)
+        watcher.poll()
+        source.fail = True
+        assert watcher.poll() is False
+        assert watcher.current == "genesis"
+        time.sleep(0.06)
+        assert watcher.current is None
+        assert watcher.errors == 1
+
+    def test_background_thread_picks_up_changes(self):
+        """Test that the polling thread publishes new tips."""
+        source, watcher = _watcher()
+        watcher.start()
+        try:
+            source.advance("block2")
+            deadline = time.time() + 2
+            while watcher.current != "block2" and time.time() < deadline:
+                time.sleep(0.01)
+            assert watcher.current == "block2"
+        finally:
+            watcher.stop()
+
+    def test_rpc_source_fingerprint(self):
+        """Test that by default only the best block hash is fingerprinted."""
+        rpc = MagicMock()
+        rpc.getbestblockhash.return_value = "00ab"
+        assert RPCTipSource(lambda: rpc).fetch() == "00ab"
+        rpc.batch.assert_not_called()
+
+    def test_rpc_source_mempool_is_debounced(self):
+        """Test that the opt-in mempool summary is refetched at most once per interval."""
+        rpc = MagicMock()
+        rpc.batch.return_value = ["00ab", {"size": 3, "bytes": 900}]
+        rpc.getbestblockhash.return_value = "00ab"
+        source = RPCTipSource(lambda: rpc, include_mempool=True, mempool_interval=60)
+        first = source.fetch()
+        assert first.startswith("00ab:3:900")
+
+        rpc.batch.return_value = ["00ab", {"size": 4, "bytes": 1200}]
+        assert source.fetch() == first
+        rpc.getbestblockhash.return_value = "00cd"
+        assert source.fetch() == "00cd:" + first.split(":", 1)[1]
+        rpc.batch.assert_called_once()
+
+        source.mempool_interval = 0
+        assert source.fetch().startswith("00ab:4:1200")
+
+
+class TestTipCache:
+    """Test tip-keyed memoization."""
+
+    def test_hit_until_tip_changes(self):
+        """Test that values are reused until the chain moves."""
+        source, watcher = _watcher()
+        watcher.poll()
+        cache = TipCache(watcher)
+        compute = MagicMock(side_effect=[1, 2])
+
+        assert cache.get_or_compute("bal", compute) == 1
+        assert cache.get_or_compute("bal", compute) == 1
+        source.advance()
+        watcher.poll()
+        assert cache.get_or_compute("bal", compute) == 2
+        assert compute.call_count == 2
+
+    def test_no_caching_without_tip(self):
+        """Test that an unknown tip always computes live."""
+        _, watcher = _watcher()
+        cache = TipCache(watcher)
+        compute = MagicMock(return_value=1)
+        cache.get_or_compute("bal", compute)
+        cache.get_or_compute("bal", compute)
+        assert compute.call_count == 2
+
+    def test_invalidate_single_key(self):
+        """Test that app-initiated wallet changes can drop one entry."""
+        _, watcher = _watcher()
+        watcher.poll()
+        cache = TipCache(watcher)
+        cache.get_or_compute("a", lambda: 1)
+        cache.get_or_compute("b", lambda: 2)
+        cache.invalidate("a")
+        assert cache.get_or_compute("a", lambda: 3) == 3
+        assert cache.get_or_compute("b", lambda: 4) == 2
@@ -0,0 +1,60 @@
+"""
+Unit tests for the single-pass covenant parser.
+"""
+
+from app.covenant import mask_descriptor, mask_script_hex, mask_timelocks, parse_covenant
+
+PK_IF = "02" + "11" * 32
+PK_ELSE = "03" + "22" * 32
+ASM = f"OP_IF {PK_IF} OP_CHECKSIG OP_ELSE 144 OP_CHECKSEQUENCEVERIFY OP_DROP {PK_ELSE} OP_CHECKSIG OP_ENDIF"
+SCRIPT = "63" + "21" + PK_IF + "ac67" + "03a08601" + "b17521" + PK_ELSE + "ac68"
+
+
+class TestParseCovenant:
+    """Test the fields extracted in one pass."""
+
+    def test_branches_and_pubkeys(self):
+        """Test both branch keys and the distinct pubkeys, in script order."""
+        cov = parse_covenant(ASM)
+        assert cov.branches == (PK_IF, PK_ELSE)
+        assert cov.pubkeys == (PK_IF, PK_ELSE)
+        assert parse_covenant(f"{ASM} OP_DROP {PK_IF} " + "ab" * 64).pubkeys == (PK_IF, PK_ELSE)
+
+    def test_op_if_window(self):
+        """Test that the OP_IF key must follow within five tokens, from any OP_IF."""
+        far = f"OP_IF 1 2 3 4 5 {PK_IF} OP_ENDIF"
+        assert parse_covenant(far).op_if_pub is None
+        assert parse_covenant(f"{far} OP_IF OP_DUP {PK_ELSE}").op_if_pub == PK_ELSE
+        assert parse_covenant(f"{PK_IF} OP_ELSE").branches == (None, None)
+
+    def test_formatted_asm(self):
+        """Test that only keys inside OP_IF..OP_ENDIF are clickable and lines hold four ops."""
+        lines = parse_covenant(ASM).formatted_asm.split("\n")
+        assert len(lines) == 3 and lines[2] == "OP_CHECKSIG OP_ENDIF"
+        assert lines[0].startswith('OP_IF <span class="clickable-pubkey"')
+        assert lines[1].endswith(f"handlePubKeyClick('{PK_ELSE}');\">{PK_ELSE}</span>")
+        assert parse_covenant(f"{PK_IF} OP_CHECKSIG").formatted_asm == f"{PK_IF} OP_CHECKSIG"
+
+    def test_memoized(self):
+        """Test that the same ASM is parsed once."""
+        parse_covenant.cache_clear()
+        first = parse_covenant(ASM)
+        assert parse_covenant(ASM) is first
+        assert parse_covenant.cache_info().hits == 1
+
+
+class TestMasking:
+    """Test the explorer's descriptor masking."""
+
+    def test_raw_descriptor(self):
+        """Test that the CLTV push is hidden and the OP_ELSE key shortened."""
+        masked = mask_descriptor(f"raw({SCRIPT})#abcd1234")
+        assert "03*****b175" in masked and masked.endswith(")#abcd1234")
+        assert PK_ELSE not in masked.split("handlePubKeyClick")[0]
+        assert mask_script_hex(SCRIPT) in masked
+
+    def test_other_descriptors(self):
+        """Test timelock masking for non-raw descriptors and passthrough for malformed raw()."""
+        assert mask_timelocks("older 144 OP_CHECKSEQUENCEVERIFY") == "older ***** OP_CHECKSEQUENCEVERIFY"
+        assert mask_descriptor("sh(x 10 OP_CHECKLOCKTIMEVERIFY y)") == "sh(x ***** OP_CHECKLOCKTIMEVERIFY y)"
+        assert mask_descriptor("raw(zz)") == "raw(zz)"
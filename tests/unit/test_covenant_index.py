@@ -0,0 +1,115 @@
+"""
+Unit tests for the in-memory covenant index.
+"""
+
+from unittest.mock import MagicMock
+
+import pytest
+
+from app.bech32_codec import hex_to_npub, npub_to_hex
+from app.covenant import parse_covenant
+from app.covenant_index import CovenantIndex, script_from_descriptor
+
+PK_IF = "02" + "11" * 32
+PK_ELSE = "03" + "22" * 32
+PK_OTHER = "02" + "33" * 32
+
+
+def _script(pk_if, pk_else):
+    return "63" + "21" + pk_if + "ac67" + "029000b275" + "21" + pk_else + "ac68"
+
+
+def _decoded(pk_if, pk_else):
+    return {
+        "asm": f"OP_IF {pk_if} OP_CHECKSIG OP_ELSE 144 OP_CHECKSEQUENCEVERIFY OP_DROP {pk_else} OP_CHECKSIG OP_ENDIF",
+        "p2sh": "3Example",
+        "segwit": {"address": f"bc1q{pk_if[-6:]}", "hex": "0020" + pk_if[-64:]},
+    }
+
+
+def _rpc(pairs):
+    """RPC mock whose wallet holds one raw() covenant per (if, else) pair."""
+    by_script = {_script(a, b): _decoded(a, b) for a, b in pairs}
+    rpc = MagicMock()
+    rpc.listdescriptors.return_value = {"descriptors": [{"desc": f"raw({s})#chk"} for s in by_script]}
+    rpc.batch.side_effect = lambda calls, return_exceptions=False: [by_script[p[0]] for _, p in calls]
+    return rpc
+
+
+@pytest.fixture
+def index():
+    return CovenantIndex(parse_covenant, npub_decoder=npub_to_hex)
+
+
+class TestCovenantIndex:
+    """Test building and querying the index."""
+
+    def test_script_from_wrapped_descriptor(self):
+        """Test that wrapped raw() descriptors are recognized."""
+        assert script_from_descriptor("wsh(raw(AB12))#x") == "ab12"
+        assert script_from_descriptor("wpkh(xpub/0/*)") is None
+
+    def test_sync_and_lookup_by_hex(self, index):
+        """Test that both branch keys resolve to the covenant."""
+        index.sync(_rpc([(PK_IF, PK_ELSE)]))
+
+        for key in (PK_IF, PK_ELSE.upper()):
+            [entry] = index.lookup(key)
+            assert entry.op_if_pub == PK_IF
+            assert entry.op_else_pub == PK_ELSE
+            assert entry.segwit_hex.startswith("0020")
+            assert entry.p2sh_address == "3Example"
+        assert index.lookup(PK_OTHER) == []
+
+    def test_lookup_by_npub(self, index):
+        """Test that an npub query is decoded once and matches the key's x-only form."""
+        index.sync(_rpc([(PK_IF, PK_ELSE)]))
+        assert len(index.lookup(hex_to_npub(PK_ELSE))) == 1
+        assert index.lookup(hex_to_npub(PK_OTHER)) == []
+        assert index.lookup("npub1invalid") == []
+
+    def test_sync_only_decodes_new_scripts(self, index):
+        """Test that a second sync does not decode already indexed scripts."""
+        rpc = _rpc([(PK_IF, PK_ELSE)])
+        assert index.sync(rpc) == 1
+        assert index.sync(rpc) == 0
+        assert rpc.batch.call_count == 1
+
+    def test_sync_drops_removed_covenants(self, index):
+        """Test that covenants no longer in the wallet disappear from lookups."""
+        index.sync(_rpc([(PK_IF, PK_ELSE), (PK_OTHER, PK_ELSE)]))
+        assert len(index.lookup(PK_ELSE)) == 2
+
+        index.sync(_rpc([(PK_OTHER, PK_ELSE)]))
+        assert index.lookup(PK_IF) == []
+        assert [e.op_if_pub for e in index.lookup(PK_ELSE)] == [PK_OTHER]
+
+    def test_add_updates_incrementally(self, index):
+        """Test that an imported descriptor is searchable without a sync."""
+        index.add(f"raw({_script(PK_IF, PK_ELSE)})", _decoded(PK_IF, PK_ELSE))
+        assert len(index.lookup(PK_IF)) == 1
+        assert len(index) == 1
+
+    def test_entries_keep_wallet_order(self, index):
+        """Test that results follow the order covenants were indexed in."""
+        index.sync(_rpc([(PK_IF, PK_ELSE), (PK_OTHER, PK_ELSE)]))
+        assert [e.op_if_pub for e in index.lookup(PK_ELSE)] == [PK_IF, PK_OTHER]
+
+    def test_local_decoder_skips_rpc(self):
+        """Test that a local decoder replaces the decodescript batch, with RPC as fallback."""
+
+        def decoder(script):
+            if script == _script(PK_OTHER, PK_ELSE):
+                raise ValueError("unsupported")
+            return _decoded(PK_IF, PK_ELSE)
+
+        index = CovenantIndex(parse_covenant, npub_decoder=npub_to_hex, decoder=decoder)
+        rpc = _rpc([(PK_IF, PK_ELSE)])
+        assert index.sync(rpc) == 1
+        rpc.batch.assert_not_called()
+
+        rpc = _rpc([(PK_IF, PK_ELSE), (PK_OTHER, PK_ELSE)])
+        assert index.sync(rpc) == 1
+        [call] = rpc.batch.call_args_list
+        assert [tuple(c) for c in call.args[0]] == [("decodescript", [_script(PK_OTHER, PK_ELSE)])]
+        assert len(index.lookup(PK_ELSE)) == 2
@@ -0,0 +1,98 @@
+"""
+Unit tests for covenant listing pagination and field selection.
+"""
+
+import pytest
+
+from app.covenant_listing import (
+    CARD_FIELDS,
+    FIELD_GROUPS,
+    MAX_LIMIT,
+    ListingError,
+    covenant_id,
+    paginate,
+    parse_fields,
+    parse_ids,
+    parse_limit,
+    script_from_id,
+)
+
+SCRIPTS = [f"63{i:02x}21" + "ab" * 33 + "ac68" for i in (7, 1, 5, 3, 9)]
+
+
+class TestCovenantId:
+    """Test the URL-safe covenant ids used as cursors."""
+
+    def test_round_trip(self):
+        """Test that ids decode back to the lower-case script and are URL-safe."""
+        script = "63" + "Ff" * 40 + "68"
+        token = covenant_id(script.lower())
+        assert script_from_id(token) == script.lower()
+        assert all(c.isalnum() or c in "-_" for c in token)
+
+    @pytest.mark.parametrize("token", ["", "!!", "a b", "@"])
+    def test_rejects_malformed(self, token):
+        """Test that garbage cursors raise ListingError."""
+        with pytest.raises(ListingError):
+            script_from_id(token)
+
+
+class TestParsing:
+    """Test fields/limit/ids query parameters."""
+
+    def test_fields_expand_groups(self):
+        """Test that group names expand and single fields are kept."""
+        assert parse_fields("summary,qr_code") == frozenset(FIELD_GROUPS["summary"]) | {"qr_code"}
+        assert parse_fields(" balances , id ") == frozenset(FIELD_GROUPS["balances"])
+        assert parse_fields(None) is None and parse_fields(" ") is None
+        assert set(parse_fields(",".join(FIELD_GROUPS))) == CARD_FIELDS
+
+    def test_unknown_field(self):
+        """Test that a typo is an error rather than an empty card."""
+        with pytest.raises(ListingError):
+            parse_fields("summary,balance")
+
+    @pytest.mark.parametrize("value", ["0", "-1", str(MAX_LIMIT + 1), "ten"])
+    def test_bad_limit(self, value):
+        """Test that limits outside 1..MAX_LIMIT are refused."""
+        with pytest.raises(ListingError):
+            parse_limit(value)
+
+    def test_limit_and_ids(self):
+        """Test the happy paths of limit and ids."""
+        assert parse_limit("25") == 25 and parse_limit(None) is None and parse_limit("") is None
+        assert parse_ids(",".join(covenant_id(s) for s in SCRIPTS[:2])) == frozenset(SCRIPTS[:2])
+        assert parse_ids(None) is None
+
+
+class TestPaginate:
+    """Test cursor pagination over script-hex order."""
+
+    def test_walks_all_pages_in_order(self):
+        """Test that following next_cursor visits every covenant once, in sorted order."""
+        seen, cursor = [], None
+        while True:
+            page, cursor = paginate(SCRIPTS, lambda s: s, limit=2, cursor=cursor)
+            seen.extend(page)
+            if cursor is None:
+                break
+        assert seen == sorted(SCRIPTS)
+
+    def test_order_independent_of_input(self):
+        """Test that the same cursor gives the same page whatever order the index returns."""
+        first, cursor = paginate(SCRIPTS, lambda s: s, limit=2)
+        again, _ = paginate(list(reversed(SCRIPTS)), lambda s: s, limit=2, cursor=cursor)
+        rest, _ = paginate(SCRIPTS, lambda s: s, limit=2, cursor=cursor)
+        assert again == rest and not set(first) & set(rest)
+
+    def test_cursor_survives_removal(self):
+        """Test that a cursor still works after the covenant it names is gone."""
+        page, cursor = paginate(SCRIPTS, lambda s: s, limit=2)
+        remaining = [s for s in SCRIPTS if s != page[-1]]
+        nxt, _ = paginate(remaining, lambda s: s, limit=2, cursor=cursor)
+        assert nxt == sorted(SCRIPTS)[2:4]
+
+    def test_last_page_has_no_cursor(self):
+        """Test that an exact fit or no limit ends the listing."""
+        assert paginate(SCRIPTS, lambda s: s, limit=len(SCRIPTS))[1] is None
+        assert paginate(SCRIPTS, lambda s: s) == (sorted(SCRIPTS), None)
@@ -0,0 +1,56 @@
+"""
+Unit tests for the CPU offload pool.
+"""
+
+import threading
+import time
+
+import pytest
+
+from app.cpu_offload import CPUOffload
+
+
+class TestCPUOffload:
+    """Test offloading, bounds and metrics."""
+
+    def test_runs_on_a_pool_thread(self):
+        """Test that the call runs off the caller's thread and returns its result."""
+        offload = CPUOffload(max_workers=2)
+        caller = threading.get_ident()
+        ident, value = offload.run(lambda x, y=0: (threading.get_ident(), x + y), 1, y=2)
+        assert value == 3 and ident != caller
+        assert offload.stats()["submitted"] == 1 and offload.stats()["in_flight"] == 0
+
+    def test_exceptions_propagate(self):
+        """Test that errors reach the caller and are counted."""
+        offload = CPUOffload()
+        with pytest.raises(ZeroDivisionError):
+            offload.run(lambda: 1 / 0)
+        assert offload.stats()["errors"] == 1
+
+    def test_saturation_runs_inline(self):
+        """Test that calls beyond workers + queue run on the caller instead of queueing."""
+        offload = CPUOffload(max_workers=1, max_queue=1)
+        release = threading.Event()
+        started = threading.Semaphore(0)
+
+        def block():
+            started.release()
+            release.wait(2)
+
+        threads = [threading.Thread(target=offload.run, args=(block,)) for _ in range(2)]
+        for t in threads:
+            t.start()
+        started.acquire(timeout=2)  # one running, one queued
+        deadline = time.monotonic() + 2
+        while offload.stats()["in_flight"] < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        stats = offload.stats()
+        assert stats["in_flight"] == 2 and stats["queued"] == 1
+
+        assert offload.run(threading.get_ident) == threading.get_ident()
+        assert offload.stats()["inline"] == 1
+        release.set()
+        for t in threads:
+            t.join()
+        assert offload.stats()["peak_in_flight"] == 2
@@ -0,0 +1,157 @@
+"""
+Unit tests for the fake bitcoind used by benchmarks.
+"""
+
+import base64
+import time
+
+import pytest
+import requests
+from bitcoinrpc.authproxy import JSONRPCException
+
+from app.rpc_client import RPCClient
+from app.script_decoder import decode_script
+from app.wallet_index import GroupingsIndex, LabelIndex
+from tests.fake_bitcoind import RPC_IN_WARMUP, FakeBitcoind, FakeWallet
+
+
+@pytest.fixture
+def node():
+    with FakeBitcoind(FakeWallet(covenants=12, labeled=2, label_range=3), user="u", password="p") as server:
+        yield server
+
+
+def _client(server, **kwargs):
+    return RPCClient("127.0.0.1", server.port, "u", "p", wallet="fake", **kwargs)
+
+
+def _psbt(spk_hex: str) -> str:
+    tx = (
+        (2).to_bytes(4, "little")
+        + b"\x01"
+        + bytes.fromhex("11" * 32)
+        + (1).to_bytes(4, "little")
+        + b"\x00"
+        + b"\xff\xff\xff\xff"
+        + b"\x01"
+        + (1000).to_bytes(8, "little")
+        + bytes([len(spk_hex) // 2])
+        + bytes.fromhex(spk_hex)
+        + b"\x00\x00\x00\x00"
+    )
+    psbt = b"psbt\xff" + b"\x01\x00" + bytes([len(tx)]) + tx + b"\x00" + b"\x00" + b"\x00"
+    return base64.b64encode(psbt).decode()
+
+
+class TestFakeWallet:
+    """Test the generated wallet contents."""
+
+    def test_same_seed_same_wallet(self):
+        """Test that wallets are reproducible and seeds change them."""
+        a, b, c = FakeWallet(covenants=5), FakeWallet(covenants=5), FakeWallet(covenants=5, seed=1)
+        assert a.listdescriptors() == b.listdescriptors()
+        assert a.listunspent(0) == b.listunspent(0)
+        assert a.listdescriptors() != c.listdescriptors()
+
+    def test_covenants_decode_like_the_app_expects(self):
+        """Test that covenant descriptors, labels and UTXOs line up."""
+        wallet = FakeWallet(covenants=6, labeled=1, label_range=3)
+        cov = wallet.covenants[0]
+        desc = wallet.listdescriptors()["descriptors"][0]["desc"]
+        assert desc.startswith(f"raw({cov['script']})#")
+        assert decode_script(cov["script"])["segwit"]["address"] == cov["address"]
+        assert len(wallet.listunspent(0)) == 4 + 1  # 2 of every 3 covenants, plus one checking address
+
+        labels = LabelIndex(wallet.listlabels(), GroupingsIndex(wallet.listaddressgroupings()))
+        assert labels.first_unused_index(cov["segwit_hex"]) == 1
+
+
+class TestFakeBitcoind:
+    """Test the JSON-RPC server through the app's client."""
+
+    def test_calls_and_batches(self, node):
+        """Test single calls, batches and per-method counters."""
+        rpc = _client(node)
+        assert rpc.getblockcount() == 850_000
+        descs = rpc.listdescriptors()["descriptors"]
+        scripts = [d["desc"][4:].split(")")[0] for d in descs]
+        decoded = rpc.batch([("decodescript", [s]) for s in scripts])
+        assert [d["segwit"]["address"] for d in decoded] == [c["address"] for c in node.wallet.covenants]
+        assert node.calls["decodescript"] == len(scripts)
+
+    def test_errors_match_core(self, node):
+        """Test RPC error codes for unknown labels and methods."""
+        rpc = _client(node)
+        with pytest.raises(JSONRPCException) as exc:
+            rpc.getaddressesbylabel("nope")
+        assert exc.value.error["code"] == -11
+        with pytest.raises(JSONRPCException) as exc:
+            rpc.nosuchmethod()
+        assert exc.value.error["code"] == -32601
+
+    def test_requires_auth(self, node):
+        """Test that wrong credentials get HTTP 401."""
+        resp = requests.post(f"{node.url}/", json={"method": "getblockcount", "params": [], "id": 1}, timeout=5)
+        assert resp.status_code == 401
+
+    def test_writes_are_visible(self, node):
+        """Test that setlabel/importdescriptors change later reads."""
+        rpc = _client(node)
+        rpc.setlabel("bc1qtest", "mine")
+        assert rpc.getaddressesbylabel("mine") == {"bc1qtest": {"purpose": "receive"}}
+        before = len(rpc.listdescriptors()["descriptors"])
+        assert rpc.importdescriptors([{"desc": "addr(bc1qother)", "label": "x"}]) == [{"success": True}]
+        assert len(rpc.listdescriptors()["descriptors"]) == before + 1
+        assert "x" in rpc.listlabels()
+
+    def test_decodepsbt_and_gettxout(self, node):
+        """Test the proof-of-funds RPCs."""
+        rpc = _client(node)
+        tx = rpc.decodepsbt(_psbt("6a0568656c6c6f"))["tx"]
+        assert tx["vin"][0]["txid"] == "11" * 32 and tx["vin"][0]["vout"] == 1
+        assert tx["vout"][0]["scriptPubKey"]["asm"] == "OP_RETURN 68656c6c6f"
+
+        utxo = rpc.listunspent(0)[0]
+        assert rpc.gettxout(utxo["txid"], utxo["vout"])["value"] == utxo["amount"]
+        assert rpc.gettxout("00" * 32, 0) is None
+
+
+class TestInjection:
+    """Test latency and failure injection."""
+
+    def test_latency(self):
+        """Test per-method latency."""
+        with FakeBitcoind(FakeWallet(covenants=1), latency={"getblockcount": 0.1}) as server:
+            rpc = _client(server)
+            start = time.monotonic()
+            rpc.uptime()
+            assert time.monotonic() - start < 0.1
+            start = time.monotonic()
+            rpc.getblockcount()
+            assert time.monotonic() - start >= 0.1
+
+    def test_failures_are_reproducible(self):
+        """Test that the same seed fails the same calls."""
+
+        def outcomes():
+            with FakeBitcoind(FakeWallet(covenants=1), failures={"*": 0.5}, seed=7) as server:
+                return [
+                    isinstance(r, JSONRPCException)
+                    for r in _client(server).batch([("uptime", [])] * 20, return_exceptions=True)
+                ]
+
+        first = outcomes()
+        assert first == outcomes()
+        assert 0 < sum(first) < 20
+
+    def test_warmup_and_disconnect_modes(self):
+        """Test the -28 reply and dropped connections."""
+        with FakeBitcoind(FakeWallet(covenants=1), failures={"uptime": 1.0}, failure_mode="warmup") as server:
+            with pytest.raises(JSONRPCException) as exc:
+                _client(server).uptime()
+            assert exc.value.error["code"] == RPC_IN_WARMUP
+
+        with FakeBitcoind(FakeWallet(covenants=1), failures={"uptime": 1.0}, failure_mode="disconnect") as server:
+            with pytest.raises(JSONRPCException) as exc:
+                _client(server, timeout=5).uptime()
+            assert exc.value.error["code"] in (-341, -342)
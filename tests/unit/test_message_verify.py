@@ -0,0 +1,115 @@
+"""
+Unit tests for local Bitcoin signed-message verification.
+"""
+
+import base64
+
+import base58
+import pytest
+from coincurve import PrivateKey
+
+from app.message_verify import (
+    MessageVerifyError,
+    SignerIndex,
+    hash160,
+    message_hash,
+    recover_pubkey,
+    verify_message,
+    verify_message_for_pubkey,
+)
+
+# Vector from Bitcoin Core's functional test rpc_signmessagewithprivkey.py
+CORE_TESTNET_ADDRESS = "mpLQjfK79b7CCV4VMJWEWAj5Mpx8Up5zxB"
+CORE_MESSAGE = "This is just a test message"
+CORE_SIGNATURE = "INbVnW4e6PeRmsv2Qgu8NuopvrVjkcxob+sX8OcZG0SALhWybUjzMLPdAsXI46YZGb0KQTRii+wWIQzRpG/U+S0="
+
+KEY = PrivateKey(bytes.fromhex("11" * 32))
+CHALLENGE = "3f1c2a9e-6b1e-4c51-9e0a-2a7b1d6a9c11"
+
+
+def _address(pub: bytes) -> str:
+    return base58.b58encode_check(b"\x00" + hash160(pub)).decode()
+
+
+def _sign(message: str, compressed: bool = True, header_base: int = 27) -> str:
+    sig = KEY.sign_recoverable(message_hash(message), hasher=None)
+    header = header_base + sig[64] + (4 if compressed else 0)
+    return base64.b64encode(bytes([header]) + sig[:64]).decode()
+
+
+class TestVerifyMessage:
+    """Test verification results against Core's behaviour."""
+
+    def test_core_vector(self):
+        """Test the signature from Core's signmessagewithprivkey functional test."""
+        assert verify_message(CORE_TESTNET_ADDRESS, CORE_SIGNATURE, CORE_MESSAGE, versions=(0x6F,))
+        assert not verify_message(CORE_TESTNET_ADDRESS, CORE_SIGNATURE, CORE_MESSAGE + ".", versions=(0x6F,))
+
+    def test_compressed_and_uncompressed_keys(self):
+        """Test that the header's compression flag selects which address matches."""
+        comp = _address(KEY.public_key.format(compressed=True))
+        uncomp = _address(KEY.public_key.format(compressed=False))
+        assert verify_message(comp, _sign(CHALLENGE, compressed=True), CHALLENGE)
+        assert not verify_message(uncomp, _sign(CHALLENGE, compressed=True), CHALLENGE)
+        assert verify_message(uncomp, _sign(CHALLENGE, compressed=False), CHALLENGE)
+
+    def test_segwit_style_headers_are_masked_like_core(self):
+        """Test that Electrum-style headers (35-42) are read with Core's (h - 27) & 7 rule."""
+        comp = _address(KEY.public_key.format(compressed=True))
+        assert verify_message(comp, _sign(CHALLENGE, header_base=35), CHALLENGE)
+
+    def test_wrong_message_or_bad_signature_is_false(self):
+        """Test that non-recoverable or mismatched signatures return False, not errors."""
+        comp = _address(KEY.public_key.format(compressed=True))
+        assert not verify_message(comp, _sign("other"), CHALLENGE)
+        assert not verify_message(comp, base64.b64encode(b"\x1f" + b"\xff" * 64).decode(), CHALLENGE)
+        assert not verify_message(comp, base64.b64encode(b"\x1f" * 10).decode(), CHALLENGE)
+
+    def test_invalid_inputs_raise(self):
+        """Test the cases Core answers with an RPC error."""
+        comp = _address(KEY.public_key.format(compressed=True))
+        with pytest.raises(MessageVerifyError, match="base64"):
+            verify_message(comp, "not base64!", CHALLENGE)
+        with pytest.raises(MessageVerifyError, match="Invalid address"):
+            verify_message("1invalid", _sign(CHALLENGE), CHALLENGE)
+        p2sh = base58.b58encode_check(b"\x05" + b"\x00" * 20).decode()
+        with pytest.raises(MessageVerifyError, match="does not refer to key"):
+            verify_message(p2sh, _sign(CHALLENGE), CHALLENGE)
+
+
+class TestRecoverPubkey:
+    """Test public key recovery helpers."""
+
+    def test_recover_and_verify_for_pubkey(self):
+        """Test recovery of the signer's key and the direct pubkey check."""
+        pub_hex = KEY.public_key.format(compressed=True).hex()
+        sig = _sign(CHALLENGE)
+        assert recover_pubkey(sig, CHALLENGE).hex() == pub_hex
+        assert verify_message_for_pubkey(pub_hex, sig, CHALLENGE)
+        assert not verify_message_for_pubkey(pub_hex, _sign(CHALLENGE, compressed=False), CHALLENGE)
+
+    def test_long_messages_use_compact_size(self):
+        """Test that messages longer than 252 bytes are length-prefixed correctly."""
+        message = "x" * 300
+        comp = _address(KEY.public_key.format(compressed=True))
+        assert verify_message(comp, _sign(message), message)
+
+
+class TestSignerIndex:
+    """Test constant-time matching against a set of known signers."""
+
+    def test_match_returns_listed_pubkey(self):
+        """Test that the signer is found among many candidates without per-candidate checks."""
+        others = [PrivateKey(bytes([i]) * 32).public_key.format().hex() for i in range(40, 88)]
+        pub_hex = KEY.public_key.format().hex()
+        index = SignerIndex(others + [pub_hex.upper(), "zz-not-hex"])
+        assert len(index) == 49
+        assert index.match(_sign(CHALLENGE), CHALLENGE) == pub_hex.upper()
+
+    def test_no_match(self):
+        """Test wrong messages, other compression and malformed signatures."""
+        index = SignerIndex([KEY.public_key.format().hex()])
+        assert index.match(_sign("other"), CHALLENGE) is None
+        assert index.match(_sign(CHALLENGE, compressed=False), CHALLENGE) is None
+        assert index.match("not base64!", CHALLENGE) is None
+        assert SignerIndex([]).match(_sign(CHALLENGE), CHALLENGE) is None
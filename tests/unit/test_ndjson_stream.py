@@ -0,0 +1,126 @@
+"""
+Unit tests for NDJSON streaming of covenant listings.
+"""
+
+import json
+import logging
+from decimal import Decimal
+
+import pytest
+
+from app.ndjson_stream import (
+    NDJSON_MIMETYPE,
+    StreamError,
+    covenant_card_events,
+    ndjson_lines,
+    stream_requested,
+)
+
+
+def _cards(n, fail_at=None):
+    for i in range(n):
+        if i == fail_at:
+            raise RuntimeError("groupings lookup failed")
+        yield {"id": f"c{i}"}
+
+
+class TestCovenantCardEvents:
+    """Test the event sequence of a streamed listing."""
+
+    def test_start_descriptors_end(self):
+        """Test that cards are framed by start and end, in order."""
+        events = list(covenant_card_events(lambda: (_cards(3), "abc"), {"usd": "50000"}))
+        assert [e["event"] for e in events] == ["start", "descriptor", "descriptor", "descriptor", "end"]
+        assert events[0] == {"event": "start", "valid": True, "btc_price": {"usd": "50000"}}
+        assert [e["descriptor"]["id"] for e in events[1:-1]] == ["c0", "c1", "c2"]
+        assert events[-1] == {"event": "end", "count": 3, "next_cursor": "abc"}
+
+    def test_start_before_load(self):
+        """Test that start is emitted before the RPC work in load() runs."""
+        loaded = []
+
+        def load():
+            loaded.append(1)
+            return _cards(1), None
+
+        events = covenant_card_events(load)
+        assert next(events)["event"] == "start" and loaded == []
+        assert next(events)["event"] == "descriptor" and loaded == [1]
+
+    def test_cards_are_built_lazily(self):
+        """Test that the first card is emitted before later cards are built."""
+        built = []
+
+        def cards():
+            for i in range(3):
+                built.append(i)
+                yield {"id": i}
+
+        events = covenant_card_events(lambda: (cards(), None))
+        next(events)
+        next(events)
+        assert built == [0]
+
+    def test_error_mid_stream(self, caplog):
+        """Test that a failing card ends the stream in-band with the number already sent, and is logged."""
+        with caplog.at_level(logging.ERROR, logger="app.ndjson_stream"):
+            events = list(covenant_card_events(lambda: (_cards(5, fail_at=2), None)))
+        assert [e["event"] for e in events] == ["start", "descriptor", "descriptor", "error"]
+        assert events[-1] == {"event": "error", "valid": False, "error": "groupings lookup failed", "count": 2}
+        assert caplog.records and caplog.records[0].exc_info is not None
+
+    def test_expected_error_from_load(self, caplog):
+        """Test that a StreamError from load() is sent with its fields and not logged as a failure."""
+
+        def load():
+            raise StreamError("circuit open", reason="circuit_open", retry_after=15)
+
+        with caplog.at_level(logging.ERROR, logger="app.ndjson_stream"):
+            events = list(covenant_card_events(load))
+        assert [e["event"] for e in events] == ["start", "error"]
+        assert events[-1] == {
+            "event": "error",
+            "valid": False,
+            "error": "circuit open",
+            "count": 0,
+            "reason": "circuit_open",
+            "retry_after": 15,
+        }
+        assert not caplog.records
+
+    def test_empty_page(self):
+        """Test that a page past the last cursor still starts and ends."""
+        assert [e["event"] for e in covenant_card_events(lambda: (iter(()), None))] == ["start", "end"]
+
+
+class TestNdjsonLines:
+    """Test serialisation."""
+
+    def test_one_compact_line_per_event(self):
+        """Test that every event is a single newline-terminated JSON document."""
+        lines = list(ndjson_lines([{"a": 1}, {"b": Decimal("1.5"), "text": "two\nlines"}]))
+        assert lines[0] == '{"a":1}\n'
+        assert all(line.endswith("\n") and line.count("\n") == 1 for line in lines)
+        assert json.loads(lines[1]) == {"b": "1.5", "text": "two\nlines"}
+
+
+class TestStreamRequested:
+    """Test how ?stream= and the Accept header combine."""
+
+    @pytest.mark.parametrize(
+        "args, accept, expected",
+        [
+            ({}, None, False),
+            ({}, "application/json", False),
+            ({}, NDJSON_MIMETYPE, True),
+            ({}, f"{NDJSON_MIMETYPE}, application/json;q=0.5", True),
+            ({"stream": "1"}, None, True),
+            ({"stream": "true"}, "application/json", True),
+            ({"stream": "0"}, NDJSON_MIMETYPE, False),
+            ({"stream": "no"}, NDJSON_MIMETYPE, False),
+            ({"stream": ""}, NDJSON_MIMETYPE, False),
+        ],
+    )
+    def test_resolution(self, args, accept, expected):
+        """Test that an explicit ?stream= overrides the Accept header."""
+        assert stream_requested(args, accept) is expected
@@ -0,0 +1,134 @@
+"""
+Unit tests for the background BTC price feed.
+"""
+
+import time
+from decimal import Decimal
+from unittest.mock import MagicMock
+
+import pytest
+
+from app.price_feed import (
+    CoinGeckoSource,
+    KrakenSource,
+    PriceFeed,
+    PriceSourceError,
+    StaticSource,
+    sources_from_spec,
+)
+
+
+class _Flaky:
+    """Source that fails while ``down`` is set."""
+
+    name = "flaky"
+
+    def __init__(self, price="50000"):
+        self.price = Decimal(price)
+        self.down = False
+        self.calls = 0
+
+    def fetch(self, session, timeout):
+        self.calls += 1
+        if self.down:
+            raise ConnectionError("upstream timeout")
+        return self.price
+
+
+def _session(payload):
+    session = MagicMock()
+    session.get.return_value.json.return_value = payload
+    return session
+
+
+class TestSources:
+    """Test parsing of upstream responses."""
+
+    def test_coingecko(self):
+        """Test the simple/price response shape."""
+        assert CoinGeckoSource().fetch(_session({"bitcoin": {"usd": 64123.5}}), 5) == Decimal("64123.5")
+
+    def test_kraken(self):
+        """Test the Ticker response shape (last trade price)."""
+        payload = {"error": [], "result": {"XXBTZUSD": {"c": ["64000.10000", "0.01"]}}}
+        assert KrakenSource().fetch(_session(payload), 5) == Decimal("64000.10000")
+
+    def test_rejects_implausible_prices(self):
+        """Test that missing, zero and non-numeric prices are errors."""
+        for payload in ({}, {"bitcoin": {"usd": 0}}, {"bitcoin": {"usd": "n/a"}}):
+            with pytest.raises(PriceSourceError):
+                CoinGeckoSource().fetch(_session(payload), 5)
+
+    def test_spec(self):
+        """Test building sources from the PRICE_SOURCES setting."""
+        sources = sources_from_spec("coingecko, static:65000")
+        assert [s.name for s in sources] == ["coingecko", "static"]
+        assert sources[1].price == Decimal("65000")
+        with pytest.raises(ValueError):
+            sources_from_spec("nope")
+
+
+class TestPriceFeed:
+    """Test refresh, fallback and staleness."""
+
+    def test_unknown_until_first_refresh(self):
+        """Test that nothing is served before a quote exists."""
+        feed = PriceFeed([StaticSource("1")], session=MagicMock())
+        assert feed.latest() is None and feed.price() is None
+        assert feed.stats()["stale"] is True
+
+    def test_falls_through_sources(self):
+        """Test that the next source answers when the first one fails."""
+        flaky = _Flaky()
+        flaky.down = True
+        feed = PriceFeed([flaky, StaticSource("42000")], session=MagicMock())
+        quote = feed.refresh()
+        assert (quote.price, quote.source) == (Decimal("42000"), "static")
+
+    def test_failure_keeps_last_good_quote(self):
+        """Test stale-while-revalidate: the old quote stays until max_age."""
+        flaky = _Flaky("50000")
+        feed = PriceFeed([flaky], max_age=0.05, session=MagicMock())
+        feed.refresh()
+        flaky.down = True
+        assert feed.refresh() is None
+        assert feed.price() == Decimal("50000")
+        assert feed.stats()["failures"] == 1 and "upstream timeout" in feed.stats()["last_error"]
+
+        time.sleep(0.06)
+        assert feed.price() is None
+        assert feed.latest().price == Decimal("50000")
+        assert feed.stats()["expired"] is True
+
+    def test_background_refresh(self):
+        """Test that the thread refreshes on its interval and readers never call the source."""
+        flaky = _Flaky()
+        feed = PriceFeed([flaky], interval=0.01, session=MagicMock())
+        feed.start()
+        try:
+            assert feed.price(wait=2) == Decimal("50000")
+            calls = flaky.calls
+            for _ in range(100):
+                feed.price()
+            assert flaky.calls - calls < 100
+            deadline = time.monotonic() + 2
+            while feed.stats()["refreshes"] < 3 and time.monotonic() < deadline:
+                time.sleep(0.01)
+            assert feed.stats()["refreshes"] >= 3
+        finally:
+            feed.stop()
+
+    def test_requires_a_source(self):
+        """Test that an empty source list is rejected."""
+        with pytest.raises(ValueError):
+            PriceFeed([])
+
+    def test_first_wait_ends_after_failed_attempt(self):
+        """Test that an unreachable upstream does not make every reader wait."""
+        flaky = _Flaky()
+        flaky.down = True
+        feed = PriceFeed([flaky], session=MagicMock())
+        feed.refresh()
+        start = time.monotonic()
+        assert feed.price(wait=1) is None
+        assert time.monotonic() - start < 0.5
@@ -0,0 +1,176 @@
+"""
+Unit tests for the content-addressed QR code cache.
+"""
+
+import os
+import threading
+import time
+
+import pytest
+
+from app.qr_cache import QRCache, QRTokenError, parse_qr_token, qr_key, sign_qr_token
+from tests.fake_redis import FakeRedis
+
+
+def _renderer(size=10, delay=0.0):
+    calls = []
+
+    def render(data, box_size, border):
+        calls.append((data, box_size, border))
+        time.sleep(delay)
+        return (f"{data}|{box_size}|{border}|" * size)[:size]
+
+    return render, calls
+
+
+class TestQRCache:
+    """Test rendering, eviction and shared tiers."""
+
+    def test_renders_once_per_key(self):
+        """Test that repeated lookups are served without re-rendering."""
+        render, calls = _renderer()
+        cache = QRCache(render)
+        first = cache.get("bc1qexample")
+        assert cache.get("bc1qexample") == first
+        assert len(calls) == 1
+        assert cache.stats()["hits"] == 1 and cache.stats()["renders"] == 1
+
+    def test_key_includes_geometry(self):
+        """Test that box_size and border are part of the key."""
+        render, calls = _renderer()
+        cache = QRCache(render)
+        cache.get("x", 12, 4)
+        cache.get("x", 8, 4)
+        cache.get("x", 12, 2)
+        assert len(calls) == 3
+        assert qr_key("x", 12, 4) != qr_key("x", 12, 4, variant="svg")
+
+    def test_evicts_by_bytes(self):
+        """Test that the local tier stays within max_bytes, dropping least recently used first."""
+        render, calls = _renderer(size=100)
+        cache = QRCache(render, max_bytes=250)
+        cache.get("a")
+        cache.get("b")
+        cache.get("a")
+        cache.get("c")
+        stats = cache.stats()
+        assert stats["bytes"] <= 250 and stats["entries"] == 2 and stats["evictions"] == 1
+        cache.get("a")
+        assert len(calls) == 3  # "b" was evicted, "a" survived
+
+    def test_oversized_payload_is_not_kept(self):
+        """Test that a payload larger than the whole budget is returned but not cached."""
+        render, calls = _renderer(size=100)
+        cache = QRCache(render, max_bytes=50)
+        cache.get("big")
+        assert cache.stats()["entries"] == 0
+
+    def test_concurrent_misses_render_once(self):
+        """Test single-flight: threads asking for the same code share one render."""
+        render, calls = _renderer(delay=0.05)
+        cache = QRCache(render)
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(cache.get("same"))) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert len(calls) == 1 and len(set(results)) == 1
+
+    def test_render_failure_is_not_cached(self):
+        """Test that an exception propagates and the next call tries again."""
+        attempts = []
+
+        def render(data, box_size, border):
+            attempts.append(1)
+            if len(attempts) == 1:
+                raise ValueError("data too long")
+            return "ok"
+
+        cache = QRCache(render)
+        try:
+            cache.get("x")
+        except ValueError:
+            pass
+        assert cache.get("x") == "ok" and len(attempts) == 2
+
+    def test_redis_tier_shared_between_workers(self):
+        """Test that a second cache adopts images rendered by the first."""
+        redis = FakeRedis()
+        render, calls = _renderer()
+        QRCache(render, redis_client=redis).get("shared")
+        other = QRCache(render, redis_client=redis)
+        assert other.get("shared") == "shared|12|"
+        assert len(calls) == 1 and other.stats()["redis_hits"] == 1
+
+    def test_redis_entries_expire(self):
+        """Test that shared entries are written with the configured TTL."""
+        redis = FakeRedis()
+        render, _ = _renderer()
+        QRCache(render, redis_client=redis, redis_ttl=600).get("a")
+        QRCache(render, redis_client=redis, redis_ttl=0).get("b")
+        assert sorted(redis.ttls.values(), key=str) == [600, None]
+
+    def test_disk_tier_is_pruned_oldest_first(self, tmp_path):
+        """Test that the directory stays within its budget, dropping least recently used files."""
+        render, calls = _renderer(size=100)
+        cache = QRCache(render, disk_dir=str(tmp_path), disk_max_bytes=350)
+        for i, data in enumerate(["a", "b", "c"]):
+            cache.get(data)
+            path = cache._disk_path(qr_key(data, 12, 4))
+            os.utime(path, (1000 + i, 1000 + i))
+        cache.get("d")  # 400 bytes > 350: prune to 90% of the budget, oldest ("a") first
+        files = [f for _, _, names in os.walk(tmp_path) for f in names]
+        assert len(files) == 3 and cache.stats()["disk_bytes"] == 300
+        assert cache.stats()["disk_evictions"] == 1
+        fresh = QRCache(render, disk_dir=str(tmp_path), disk_max_bytes=350)
+        assert fresh.stats()["disk_bytes"] == 300
+        fresh.get("b")
+        fresh.get("a")
+        assert fresh.stats()["disk_hits"] == 1 and len(calls) == 5
+
+    def test_disk_hit_refreshes_age(self, tmp_path):
+        """Test that reading a file from disk protects it from the next prune."""
+        render, _ = _renderer(size=100)
+        cache = QRCache(render, disk_dir=str(tmp_path), disk_max_bytes=350)
+        for i, data in enumerate(["a", "b", "c"]):
+            cache.get(data)
+            os.utime(cache._disk_path(qr_key(data, 12, 4)), (1000 + i, 1000 + i))
+        QRCache(render, disk_dir=str(tmp_path)).get("a")  # another worker reads "a" from disk
+        cache.get("d")
+        assert os.path.exists(cache._disk_path(qr_key("a", 12, 4)))
+        assert not os.path.exists(cache._disk_path(qr_key("b", 12, 4)))
+
+    def test_disk_tier_survives_restart(self, tmp_path):
+        """Test that a fresh cache over the same directory reuses stored images."""
+        render, calls = _renderer()
+        QRCache(render, disk_dir=str(tmp_path)).get("persisted")
+        fresh = QRCache(render, disk_dir=str(tmp_path))
+        assert fresh.get("persisted") == "persisted|"
+        assert len(calls) == 1 and fresh.stats()["disk_hits"] == 1
+
+
+class TestQRToken:
+    """Test the signed tokens behind /qr/<token>."""
+
+    KEY = b"k" * 32
+
+    def test_round_trip(self):
+        """Test that data with separators and unicode survives, URL-safe."""
+        data = "wsh(or_d(pk(02ab),older(144)))#x:y ü"
+        token = sign_qr_token(self.KEY, data, 8, 2)
+        assert parse_qr_token(self.KEY, token) == (data, 8, 2)
+        assert all(c.isalnum() or c in "-_." for c in token)
+
+    @pytest.mark.parametrize(
+        "mangle", [lambda t: t[:-2] + "AA", lambda t: "x" + t, lambda t: t.split(".")[0], lambda t: "!"]
+    )
+    def test_rejects_forged_or_malformed(self, mangle):
+        """Test that tampered or truncated tokens are refused."""
+        with pytest.raises(QRTokenError):
+            parse_qr_token(self.KEY, mangle(sign_qr_token(self.KEY, "bc1qexample")))
+
+    def test_key_bound(self):
+        """Test that a token signed with another key is refused."""
+        with pytest.raises(QRTokenError):
+            parse_qr_token(self.KEY, sign_qr_token(b"other", "bc1qexample"))
@@ -0,0 +1,87 @@
+"""
+Unit tests for the lean QR renderer.
+"""
+
+import base64
+import io
+import re
+import zlib
+
+import pytest
+import qrcode
+from PIL import Image
+
+from app.qr_render import decode_qr_payload, matrix_to_png, matrix_to_svg, qr_matrix, render_qr
+
+ADDRESS = "bc1qj77an7ljfw2epsvq98wtj6kfh9aynahdsrl6gxf2n405cvuak9dsx2yalv"
+
+
+def _legacy(data, box_size=12, border=4):
+    qr = qrcode.QRCode(
+        version=None, error_correction=qrcode.constants.ERROR_CORRECT_Q, box_size=box_size, border=border
+    )
+    qr.add_data(data)
+    qr.make(fit=True)
+    img = qr.make_image(fill_color="black", back_color="white").convert("RGB")
+    buf = io.BytesIO()
+    img.save(buf, format="PNG", dpi=(300, 300))
+    return buf.getvalue()
+
+
+class TestPNG:
+    """Test the 1-bit PNG mode."""
+
+    @pytest.mark.parametrize("box_size,border", [(12, 4), (10, 4), (3, 1)])
+    def test_pixels_match_legacy_renderer(self, box_size, border):
+        """Test that the image is pixel-identical to the old RGB output."""
+        old = Image.open(io.BytesIO(_legacy(ADDRESS, box_size, border))).convert("L")
+        new = Image.open(io.BytesIO(matrix_to_png(qr_matrix(ADDRESS), box_size, border)))
+        assert new.mode == "1" and new.size == old.size
+        assert new.convert("L").tobytes() == old.tobytes()
+
+    def test_payload_is_smaller(self):
+        """Test that the base64 payload is a fraction of the old one."""
+        legacy = base64.b64encode(_legacy(ADDRESS))
+        assert len(render_qr(ADDRESS)) < len(legacy) / 2
+
+
+class TestSVG:
+    """Test the vector mode."""
+
+    def test_paths_cover_dark_modules(self):
+        """Test that the stroked runs add up to the dark modules of the matrix."""
+        matrix = qr_matrix(ADDRESS)
+        svg = matrix_to_svg(matrix, border=4)
+        n = len(matrix) + 8
+        assert f'viewBox="0 0 {n} {n}"' in svg
+        path = svg.split(' d="')[1].split('"')[0]
+        drawn = sum(int(run) for run in re.findall(r"h(\d+)", path))
+        assert drawn == sum(map(sum, matrix))
+
+    def test_data_uri(self):
+        """Test that svg mode returns a complete data URI."""
+        uri = render_qr(ADDRESS, fmt="svg")
+        assert uri.startswith("data:image/svg+xml;base64,")
+        assert base64.b64decode(uri.split(",", 1)[1]).startswith(b"<svg")
+
+
+def test_png_is_valid_zlib_stream():
+    """Test that IDAT decompresses to one filter byte plus packed row per scanline."""
+    png = matrix_to_png(qr_matrix("x"), box_size=2, border=1)
+    idat_len = int.from_bytes(png[33:37], "big")
+    raw = zlib.decompress(png[41 : 41 + idat_len])
+    width = int.from_bytes(png[16:20], "big")
+    assert len(raw) == width * (1 + (width + 7) // 8)
+
+
+def test_unknown_format():
+    """Test that an unknown format is rejected."""
+    with pytest.raises(ValueError):
+        render_qr(ADDRESS, fmt="gif")
+
+
+@pytest.mark.parametrize("fmt,mimetype,magic", [("png", "image/png", b"\x89PNG"), ("svg", "image/svg+xml", b"<svg")])
+def test_decode_payload(fmt, mimetype, magic):
+    """Test that both payload forms decode back to image bytes with the right MIME type."""
+    body, mime = decode_qr_payload(render_qr(ADDRESS, fmt=fmt))
+    assert mime == mimetype and body.startswith(magic)
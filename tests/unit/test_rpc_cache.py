@@ -0,0 +1,84 @@
+"""
+Unit tests for the content-addressed RPC result cache.
+"""
+
+import pytest
+
+from app.rpc_cache import ScriptCache
+
+DECODED = {"asm": "OP_DUP OP_HASH160", "segwit": {"address": "bc1qexample", "hex": "0020" + "ab" * 32}}
+
+
+class TestScriptCache:
+    """Test the in-process LRU."""
+
+    def test_miss_then_hit(self):
+        """Test that a stored result is returned on the next lookup."""
+        cache = ScriptCache()
+        assert cache.get("decodescript", ["76a9"]) == (False, None)
+        cache.set("decodescript", ["76a9"], DECODED)
+        assert cache.get("decodescript", ["76a9"]) == (True, DECODED)
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 1
+
+    def test_script_hex_is_case_insensitive(self):
+        """Test that upper- and lower-case hex share an entry."""
+        cache = ScriptCache()
+        cache.set("decodescript", ["76A9"], DECODED)
+        assert cache.get("decodescript", ["76a9"])[0] is True
+
+    def test_descriptor_is_case_sensitive(self):
+        """Test that descriptors are keyed verbatim."""
+        cache = ScriptCache()
+        cache.set("getdescriptorinfo", ["raw(76A9)"], {"descriptor": "raw(76a9)#x"})
+        assert cache.get("getdescriptorinfo", ["raw(76a9)"])[0] is False
+
+    def test_non_cacheable_calls_are_ignored(self):
+        """Test that stateful methods are never served from cache."""
+        cache = ScriptCache()
+        cache.set("listunspent", ["x"], [])
+        assert cache.get("listunspent", ["x"]) == (False, None)
+        assert cache.key_for("decodescript", ["a", "b"]) is None
+
+    def test_lru_eviction(self):
+        """Test that the least recently used entry is dropped at capacity."""
+        cache = ScriptCache(maxsize=2)
+        cache.set("decodescript", ["aa"], 1)
+        cache.set("decodescript", ["bb"], 2)
+        cache.get("decodescript", ["aa"])
+        cache.set("decodescript", ["cc"], 3)
+        assert cache.get("decodescript", ["bb"])[0] is False
+        assert cache.get("decodescript", ["aa"]) == (True, 1)
+        assert cache.stats()["size"] == 2
+
+    def test_returned_values_are_copies(self):
+        """Test that callers cannot mutate cached results."""
+        cache = ScriptCache()
+        cache.set("decodescript", ["aa"], {"asm": "x"})
+        _, value = cache.get("decodescript", ["aa"])
+        value["asm"] = "mutated"
+        assert cache.get("decodescript", ["aa"])[1] == {"asm": "x"}
+
+
+class TestSharedScriptCache:
+    """Test the optional Redis layer."""
+
+    def test_entries_are_shared_between_caches(self):
+        """Test that a second worker's cache is warmed through Redis."""
+        fakeredis = pytest.importorskip("fakeredis")
+        server = fakeredis.FakeServer()
+        worker_a = ScriptCache(redis_client=fakeredis.FakeRedis(server=server))
+        worker_b = ScriptCache(redis_client=fakeredis.FakeRedis(server=server))
+
+        worker_a.set("decodescript", ["aa"], DECODED)
+        assert worker_b.get("decodescript", ["aa"]) == (True, DECODED)
+        assert worker_b.stats()["redis_hits"] == 1
+
+    def test_entries_expire(self):
+        """Test that shared entries carry the configured TTL (caller-supplied keys must not pile up)."""
+        fakeredis = pytest.importorskip("fakeredis")
+        redis = fakeredis.FakeRedis()
+        ScriptCache(redis_client=redis, redis_ttl=600).set("decodescript", ["aa"], DECODED)
+        ScriptCache(redis_client=redis, redis_ttl=0).set("decodescript", ["bb"], DECODED)
+        assert 0 < redis.ttl("hodlxxi:rpccache:decodescript:aa") <= 600
+        assert redis.ttl("hodlxxi:rpccache:decodescript:bb") == -1
@@ -0,0 +1,303 @@
+"""
+Unit tests for the pooled Bitcoin Core RPC client.
+"""
+
+import json
+import threading
+import time
+from decimal import Decimal
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from bitcoinrpc.authproxy import JSONRPCException
+
+from app.rpc_cache import ScriptCache
+from app.rpc_client import (
+    CircuitBreaker,
+    RPCClient,
+    RPCUnavailable,
+    get_rpc_client,
+    reset_rpc_clients,
+    rpc_deadline_scope,
+)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        self.server.connections += 1
+
+    @staticmethod
+    def _dispatch(body):
+        if body["method"] == "getbalance":
+            return {"result": 1.5, "error": None, "id": body["id"]}, 200
+        if body["method"] == "echo":
+            return {"result": body["params"], "error": None, "id": body["id"]}, 200
+        if body["method"] == "sleep":
+            time.sleep(body["params"][0])
+            return {"result": True, "error": None, "id": body["id"]}, 200
+        if body["method"] == "warmup":
+            return {"result": None, "error": {"code": -28, "message": "Loading block index..."}, "id": body["id"]}, 500
+        return {"result": None, "error": {"code": -32601, "message": "Method not found"}, "id": body["id"]}, 404
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self.server.posts += 1
+        if isinstance(body, list):
+            # Core returns batch replies in any order; reverse them to prove we match by id
+            reply, status = [self._dispatch(item)[0] for item in reversed(body)], 200
+        else:
+            reply, status = self._dispatch(body)
+        data = json.dumps(reply).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def rpc_server():
+    """Run a minimal keep-alive JSON-RPC server on an ephemeral port."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    server.connections = 0
+    server.posts = 0
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+    reset_rpc_clients()
+
+
+def _client(server, **kwargs):
+    return RPCClient("127.0.0.1", server.server_address[1], "user", "pass", **kwargs)
+
+
+class TestRPCClient:
+    """Test single calls against a local server."""
+
+    def test_call_parses_floats_as_decimal(self, rpc_server):
+        """Test that numeric results match AuthServiceProxy's Decimal parsing."""
+        assert _client(rpc_server).getbalance() == Decimal("1.5")
+
+    def test_params_are_forwarded(self, rpc_server):
+        """Test that positional params (including Decimal) reach the node."""
+        assert _client(rpc_server).echo("a", 2, Decimal("0.1")) == ["a", 2, Decimal("0.1")]
+
+    def test_error_raises_jsonrpc_exception(self, rpc_server):
+        """Test that node errors surface as JSONRPCException with the error code."""
+        with pytest.raises(JSONRPCException) as exc:
+            _client(rpc_server).nosuchmethod()
+        assert exc.value.code == -32601
+
+    def test_connection_is_reused(self, rpc_server):
+        """Test that sequential calls share one keep-alive connection."""
+        client = _client(rpc_server)
+        for _ in range(5):
+            client.getbalance()
+        assert rpc_server.connections == 1
+
+    def test_transport_error_is_wrapped(self):
+        """Test that an unreachable node raises JSONRPCException, not a requests error."""
+        client = RPCClient("127.0.0.1", 1, "user", "pass", timeout=1)
+        with pytest.raises(JSONRPCException):
+            client.getbalance()
+
+
+class TestRPCBatch:
+    """Test JSON-RPC batch calls."""
+
+    def test_batch_returns_results_in_call_order(self, rpc_server):
+        """Test that results line up with calls and use one HTTP round trip."""
+        client = _client(rpc_server)
+        results = client.batch([("echo", ["a"]), ("getbalance", []), ("echo", [1, 2])])
+        assert results == [["a"], Decimal("1.5"), [1, 2]]
+        assert rpc_server.posts == 1
+
+    def test_batch_raises_first_error_by_default(self, rpc_server):
+        """Test that a failing call aborts the batch unless exceptions are returned."""
+        with pytest.raises(JSONRPCException):
+            _client(rpc_server).batch([("echo", ["a"]), ("nosuchmethod", [])])
+
+    def test_batch_return_exceptions(self, rpc_server):
+        """Test that return_exceptions keeps successful results alongside errors."""
+        results = _client(rpc_server).batch([("echo", ["a"]), ("nosuchmethod", [])], return_exceptions=True)
+        assert results[0] == ["a"]
+        assert isinstance(results[1], JSONRPCException)
+
+    def test_empty_batch_skips_network(self, rpc_server):
+        """Test that an empty batch does not hit the node."""
+        assert _client(rpc_server).batch([]) == []
+        assert rpc_server.posts == 0
+
+
+class TestRPCClientCache:
+    """Test that deterministic calls are served from the attached cache."""
+
+    def test_cached_call_skips_node(self, rpc_server):
+        """Test that a repeated cacheable call only reaches the node once."""
+        cache = ScriptCache(methods={"echo"})
+        client = _client(rpc_server, cache=cache)
+        assert client.echo("aa") == ["aa"]
+        assert client.echo("aa") == ["aa"]
+        assert rpc_server.posts == 1
+
+    def test_batch_only_sends_misses(self, rpc_server):
+        """Test that cached entries are filled in locally and misses are batched."""
+        cache = ScriptCache(methods={"echo"})
+        cache.set("echo", ["aa"], ["cached"])
+        client = _client(rpc_server, cache=cache)
+        assert client.batch([("echo", ["aa"]), ("echo", ["bb"])]) == [["cached"], ["bb"]]
+        assert client.batch([("echo", ["aa"]), ("echo", ["bb"])]) == [["cached"], ["bb"]]
+        assert rpc_server.posts == 1
+
+
+class TestGetRPCClient:
+    """Test the process-wide client cache."""
+
+    def test_same_wallet_returns_same_client(self):
+        """Test that repeated lookups reuse the cached client."""
+        a = get_rpc_client("127.0.0.1", 8332, "u", "p", "w1")
+        b = get_rpc_client("127.0.0.1", 8332, "u", "p", "w1")
+        c = get_rpc_client("127.0.0.1", 8332, "u", "p", "w2", pool_size=3)
+        try:
+            assert a is b
+            assert a is not c
+            assert c.pool_size == 3
+        finally:
+            reset_rpc_clients()
+
+
+class TestCircuitBreaker:
+    """Test breaker state transitions on their own."""
+
+    def test_opens_on_failure_rate(self):
+        """Test that the circuit opens once enough calls in the window fail."""
+        breaker = CircuitBreaker(window=4, min_calls=4, failure_threshold=0.5, reset_timeout=60)
+        for failed in (False, True, False):
+            breaker.before_call()
+            breaker.record(failed, 0.01)
+        assert breaker.state == CircuitBreaker.CLOSED
+        breaker.before_call()
+        breaker.record(True, 0.01)
+        assert breaker.state == CircuitBreaker.OPEN
+        with pytest.raises(RPCUnavailable) as exc:
+            breaker.before_call()
+        assert exc.value.retry_after > 0
+        assert breaker.stats()["rejected"] == 1
+
+    def test_opens_on_slow_calls(self):
+        """Test that successful but slow calls also trip the circuit."""
+        breaker = CircuitBreaker(min_calls=2, slow_call_seconds=1.0, slow_call_threshold=1.0)
+        breaker.record(False, 2.0)
+        breaker.record(False, 3.0)
+        assert breaker.state == CircuitBreaker.OPEN
+
+    def test_half_open_allows_a_single_probe(self):
+        """Test that one probe is admitted after the reset timeout and decides the state."""
+        breaker = CircuitBreaker(min_calls=1, reset_timeout=0.05)
+        breaker.record(True, 0.0)
+        time.sleep(0.06)
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        breaker.before_call()
+        with pytest.raises(RPCUnavailable):
+            breaker.before_call()
+        breaker.record(True, 0.0)
+        assert breaker.state == CircuitBreaker.OPEN
+
+        time.sleep(0.06)
+        breaker.before_call()
+        breaker.record(False, 0.0)
+        assert breaker.state == CircuitBreaker.CLOSED
+        breaker.before_call()
+
+    def test_release_frees_the_probe_without_a_verdict(self):
+        """Test that a probe released without an outcome leaves the circuit half-open for the next one."""
+        breaker = CircuitBreaker(min_calls=1, reset_timeout=0.05)
+        breaker.record(True, 0.0)
+        time.sleep(0.06)
+        breaker.before_call()
+        breaker.release()
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        breaker.before_call()
+
+
+class TestRPCClientBreaker:
+    """Test the breaker and deadlines wired into the client."""
+
+    def test_transport_errors_open_the_circuit(self):
+        """Test that an unreachable node is only retried after the reset timeout."""
+        client = RPCClient("127.0.0.1", 1, "u", "p", breaker=CircuitBreaker(min_calls=2, reset_timeout=60))
+        for _ in range(2):
+            with pytest.raises(JSONRPCException) as exc:
+                client.getbalance()
+            assert exc.value.code == -341
+        with pytest.raises(RPCUnavailable):
+            client.getbalance()
+
+    def test_node_errors_do_not_open_the_circuit(self, rpc_server):
+        """Test that ordinary RPC errors count as healthy replies."""
+        client = _client(rpc_server, breaker=CircuitBreaker(min_calls=2))
+        for _ in range(3):
+            with pytest.raises(JSONRPCException):
+                client.nosuchmethod()
+        assert client.breaker.state == CircuitBreaker.CLOSED
+
+    def test_warmup_replies_count_as_failures(self, rpc_server):
+        """Test that a node still loading (-28) trips the circuit."""
+        client = _client(rpc_server, breaker=CircuitBreaker(min_calls=2))
+        for _ in range(2):
+            with pytest.raises(JSONRPCException) as exc:
+                client.warmup()
+            assert exc.value.code == -28
+        assert client.breaker.state == CircuitBreaker.OPEN
+
+    def test_deadline_caps_the_http_timeout(self, rpc_server):
+        """Test that a request deadline cuts a slow call short."""
+        client = _client(rpc_server, timeout=30)
+        start = time.monotonic()
+        with rpc_deadline_scope(0.2):
+            with pytest.raises(RPCUnavailable) as exc:
+                client.sleep(2)
+        assert exc.value.reason == "deadline_exceeded"
+        assert time.monotonic() - start < 1.5
+
+    def test_deadline_timeouts_do_not_open_the_circuit(self, rpc_server):
+        """Test that calls cut short by the request's budget are not held against a healthy node."""
+        client = _client(rpc_server, timeout=30, breaker=CircuitBreaker(min_calls=2, reset_timeout=60))
+        for _ in range(3):
+            with rpc_deadline_scope(0.1):
+                with pytest.raises(RPCUnavailable):
+                    client.sleep(0.5)
+        assert client.breaker.state == CircuitBreaker.CLOSED
+        assert client.getbalance() == Decimal("1.5")
+
+    def test_full_timeout_still_counts_as_failure(self, rpc_server):
+        """Test that a node too slow for the client's own timeout still trips the circuit."""
+        client = _client(rpc_server, timeout=0.1, breaker=CircuitBreaker(min_calls=2, reset_timeout=60))
+        for _ in range(2):
+            with pytest.raises(JSONRPCException) as exc:
+                client.sleep(0.5)
+            assert exc.value.code == -341
+        assert client.breaker.state == CircuitBreaker.OPEN
+
+    def test_expired_deadline_skips_the_node(self, rpc_server):
+        """Test that no request is sent once the deadline has passed."""
+        client = _client(rpc_server)
+        with rpc_deadline_scope(0):
+            with pytest.raises(RPCUnavailable) as exc:
+                client.getbalance()
+        assert exc.value.reason == "deadline_exceeded"
+        assert rpc_server.posts == 0
+
+    def test_inner_scope_cannot_extend_outer_deadline(self):
+        """Test that nested scopes keep the earliest deadline."""
+        with rpc_deadline_scope(1) as outer:
+            with rpc_deadline_scope(60) as inner:
+                assert inner == outer
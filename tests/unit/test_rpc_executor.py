@@ -0,0 +1,111 @@
+"""
+Unit tests for the concurrent RPC fan-out executor.
+"""
+
+import contextvars
+import threading
+import time
+
+import pytest
+
+from app.rpc_executor import DeadlineExceeded, RPCExecutor, deadline_after
+
+REQUEST_ID = contextvars.ContextVar("request_id", default=None)
+
+
+@pytest.fixture
+def executor():
+    ex = RPCExecutor(max_workers=8, per_node_limit=3)
+    yield ex
+    ex.shutdown()
+
+
+class TestRPCExecutorRun:
+    """Test ordering, concurrency and error handling."""
+
+    def test_results_keep_task_order(self, executor):
+        """Test that results come back in submission order regardless of finish order."""
+        results = executor.map(lambda i: (time.sleep(0.02 * (5 - i)), i)[1], range(5))
+        assert results == [0, 1, 2, 3, 4]
+
+    def test_tasks_run_concurrently(self, executor):
+        """Test that independent calls overlap instead of running back to back."""
+        start = time.monotonic()
+        executor.map(lambda _: time.sleep(0.1), range(3), node="a")
+        assert time.monotonic() - start < 0.25
+
+    def test_per_node_limit(self, executor):
+        """Test that no more than per_node_limit tasks run at once for one node."""
+        active = []
+        peak = []
+        lock = threading.Lock()
+
+        def task(_):
+            with lock:
+                active.append(1)
+                peak.append(len(active))
+            time.sleep(0.03)
+            with lock:
+                active.pop()
+
+        executor.map(task, range(8), node="http://node/wallet/a")
+        assert max(peak) == 3
+
+    def test_exceptions_raise_or_are_returned(self, executor):
+        """Test both error modes."""
+
+        def task(i):
+            if i == 1:
+                raise ValueError("boom")
+            return i
+
+        with pytest.raises(ValueError):
+            executor.map(task, range(3))
+        results = executor.map(task, range(3), return_exceptions=True)
+        assert results[0] == 0 and results[2] == 2
+        assert isinstance(results[1], ValueError)
+
+    def test_context_is_propagated(self, executor):
+        """Test that contextvars set by the caller are visible inside tasks."""
+        REQUEST_ID.set("req-1")
+        assert executor.map(lambda _: REQUEST_ID.get(), range(2)) == ["req-1", "req-1"]
+
+    def test_nested_fanout_runs_inline(self):
+        """Test that fan-out from inside a worker does not deadlock a small pool."""
+        ex = RPCExecutor(max_workers=1, per_node_limit=4)
+        try:
+            assert ex.map(lambda i: sum(ex.map(lambda j: j, range(3), node="inner")) + i, range(2)) == [3, 4]
+            assert ex.stats()["inline"] == 6
+        finally:
+            ex.shutdown()
+
+
+class TestRPCExecutorDeadline:
+    """Test per-request deadlines."""
+
+    def test_deadline_exceeded_raises(self, executor):
+        """Test that a slow group fails fast once the deadline passes."""
+        start = time.monotonic()
+        with pytest.raises(DeadlineExceeded):
+            executor.map(lambda _: time.sleep(0.5), range(2), deadline=deadline_after(0.05))
+        assert time.monotonic() - start < 0.4
+        assert executor.stats()["deadline_misses"] == 1
+
+    def test_deadline_with_return_exceptions(self, executor):
+        """Test that finished results are kept and late ones become DeadlineExceeded."""
+        results = executor.map(
+            lambda d: (time.sleep(d), d)[1], [0.0, 0.5], deadline=deadline_after(0.1), return_exceptions=True
+        )
+        assert results[0] == 0.0
+        assert isinstance(results[1], DeadlineExceeded)
+
+    def test_expired_deadline_skips_calls(self, executor):
+        """Test that tasks are not started once the deadline has already passed."""
+        calls = []
+        results = executor.map(calls.append, range(3), deadline=time.monotonic() - 1, return_exceptions=True)
+        assert calls == []
+        assert all(isinstance(r, DeadlineExceeded) for r in results)
+
+    def test_no_deadline(self):
+        """Test the helper for an unbounded deadline."""
+        assert deadline_after(None) is None
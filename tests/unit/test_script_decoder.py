@@ -0,0 +1,159 @@
+"""
+Unit tests for the pure-Python decodescript.
+
+Expected values come from the BIP173/BIP350 address test vectors and from the
+script/ASM cases in Bitcoin Core's rpc_decodescript.py functional test.
+"""
+
+import hashlib
+
+import base58
+import pytest
+
+from app.script_decoder import decode_script, script_num, script_to_asm
+
+G = "0279be667ef9dcbbac55a06295ce870b07029bfcdb2dce28d959f2815b16f81798"
+G_UNCOMPRESSED = (
+    "0479be667ef9dcbbac55a06295ce870b07029bfcdb2dce28d959f2815b16f81798"
+    "483ada7726a3c4655da4fbfc0e1108a8fd17b448a68554199c47d08ffb10d4b8"
+)
+PKH = "751e76e8199196d454941c45d1b3a323f1433bd6"  # hash160(G)
+
+
+def _p2sh(script_hex: str) -> str:
+    h = hashlib.new("ripemd160", hashlib.sha256(bytes.fromhex(script_hex)).digest()).digest()
+    return base58.b58encode_check(b"\x05" + h).decode()
+
+
+# (script hex, expected subset of decodescript output)
+CORE_VECTORS = [
+    # P2PK wraps as P2WPKH (BIP173: bc1qw508d6qejxtdg4y5r3zarvary0c5xw7kv8f3t4)
+    (
+        f"21{G}ac",
+        {
+            "asm": f"{G} OP_CHECKSIG",
+            "type": "pubkey",
+            "segwit": {
+                "asm": f"0 {PKH}",
+                "hex": f"0014{PKH}",
+                "type": "witness_v0_keyhash",
+                "address": "bc1qw508d6qejxtdg4y5r3zarvary0c5xw7kv8f3t4",
+            },
+        },
+    ),
+    # P2WSH output (BIP173: bc1qrp33g0q5c5txsp9arysrx4k6zdkfs4nce4xj0gdcccefvpysxf3qccfmv3)
+    (
+        "00201863143c14c5166804bd19203356da136c985678cd4d27a1b8c6329604903262",
+        {
+            "asm": "0 1863143c14c5166804bd19203356da136c985678cd4d27a1b8c6329604903262",
+            "type": "witness_v0_scripthash",
+            "address": "bc1qrp33g0q5c5txsp9arysrx4k6zdkfs4nce4xj0gdcccefvpysxf3qccfmv3",
+        },
+    ),
+    # Taproot output (BIP350: bc1p0xlxvlhemja6c4dqv22uapctqupfhlxm9h8z3k2e72q4k9hcz7vqzk5jj0)
+    (
+        f"5120{G[2:]}",
+        {
+            "asm": f"1 {G[2:]}",
+            "type": "witness_v1_taproot",
+            "address": "bc1p0xlxvlhemja6c4dqv22uapctqupfhlxm9h8z3k2e72q4k9hcz7vqzk5jj0",
+        },
+    ),
+    # Pay-to-anchor
+    ("51024e73", {"asm": "1 29518", "type": "anchor", "address": "bc1pfeessrawgf"}),
+    # P2PKH
+    (
+        f"76a914{PKH}88ac",
+        {
+            "asm": f"OP_DUP OP_HASH160 {PKH} OP_EQUALVERIFY OP_CHECKSIG",
+            "type": "pubkeyhash",
+            "address": "1BgGZ9tcN4rm9KBzDn7KprQz87SZ26SAMH",
+        },
+    ),
+    # 2-of-3 multisig
+    (
+        f"5221{G}21{G}21{G}53ae",
+        {"asm": f"2 {G} {G} {G} 3 OP_CHECKMULTISIG", "type": "multisig"},
+    ),
+    # CLTV branch script from rpc_decodescript.py
+    (
+        f"6321{G}ad670320a107b1756821{G}ac",
+        {
+            "asm": f"OP_IF {G} OP_CHECKSIGVERIFY OP_ELSE 500000 OP_CHECKLOCKTIMEVERIFY OP_DROP OP_ENDIF {G} OP_CHECKSIG",
+            "type": "nonstandard",
+        },
+    ),
+    # OP_RETURN data carrier
+    ("6a0b68656c6c6f20776f726c64", {"asm": "OP_RETURN 68656c6c6f20776f726c64", "type": "nulldata"}),
+]
+
+
+class TestDecodeScript:
+    """Test field-by-field equivalence with Core's decodescript."""
+
+    @pytest.mark.parametrize("script_hex,expected", CORE_VECTORS)
+    def test_core_vectors(self, script_hex, expected):
+        """Test asm/type/address and the segwit wrapping for known scripts."""
+        decoded = decode_script(script_hex)
+        for key, value in expected.items():
+            if isinstance(value, dict):
+                assert {k: decoded[key][k] for k in value} == value
+            else:
+                assert decoded[key] == value
+
+    def test_covenant_wraps_as_p2wsh(self):
+        """Test the fields the app reads for a CSV covenant."""
+        script = f"63{'21' + G}ac67029000b275{'21' + G}ac68"
+        decoded = decode_script(script.upper())
+        assert decoded["asm"] == (
+            f"OP_IF {G} OP_CHECKSIG OP_ELSE 144 OP_CHECKSEQUENCEVERIFY OP_DROP {G} OP_CHECKSIG OP_ENDIF"
+        )
+        assert decoded["segwit"]["hex"] == "0020" + hashlib.sha256(bytes.fromhex(script)).hexdigest()
+        assert decoded["segwit"]["address"].startswith("bc1q") and len(decoded["segwit"]["address"]) == 62
+        assert decoded["p2sh"] == _p2sh(script)
+        assert decoded["segwit"]["p2sh-segwit"] == _p2sh(decoded["segwit"]["hex"])
+
+    def test_wrapping_rules(self):
+        """Test when Core omits p2sh/segwit."""
+        uncompressed = decode_script(f"41{G_UNCOMPRESSED}ac")
+        assert uncompressed["type"] == "pubkey" and "p2sh" in uncompressed and "segwit" not in uncompressed
+
+        p2wpkh = decode_script(f"0014{PKH}")
+        assert "p2sh" in p2wpkh and "segwit" not in p2wpkh
+
+        for script in (f"a914{PKH}87", f"5120{G[2:]}", "6a00"):
+            decoded = decode_script(script)
+            assert "p2sh" not in decoded and "segwit" not in decoded
+
+        assert "p2sh" not in decode_script("7e")  # OP_CAT is OP_SUCCESS in tapscript
+
+    def test_network_parameters(self):
+        """Test regtest HRP and base58 prefixes."""
+        decoded = decode_script(f"21{G}ac", network="regtest")
+        assert decoded["segwit"]["address"].startswith("bcrt1q")
+        assert decoded["p2sh"].startswith("2")
+
+    def test_invalid_hex_raises(self):
+        """Test that non-hex input is rejected like the RPC."""
+        with pytest.raises(ValueError):
+            decode_script("zz")
+
+
+class TestScriptToAsm:
+    """Test ScriptToAsmStr formatting rules."""
+
+    def test_small_pushes_are_numbers(self):
+        """Test script-number rendering of pushes up to 4 bytes."""
+        assert script_to_asm(bytes.fromhex("00 4f 51 60 0181 0100 04ffffff7f".replace(" ", ""))) == (
+            "0 -1 1 16 -1 0 2147483647"
+        )
+        assert script_num(bytes.fromhex("9000")) == 144
+
+    def test_pushdata_and_unknown_opcodes(self):
+        """Test PUSHDATA1 payloads and unnamed opcodes."""
+        assert script_to_asm(bytes.fromhex("4c05" + "aa" * 5 + "bb")) == "aaaaaaaaaa OP_UNKNOWN"
+
+    def test_truncated_push(self):
+        """Test that a truncated push ends the ASM with [error]."""
+        assert script_to_asm(bytes.fromhex("51" + "05aabb")) == "1 [error]"
+        assert decode_script("05aabb") == {"asm": "[error]", "type": "nonstandard"}
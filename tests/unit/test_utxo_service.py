@@ -0,0 +1,72 @@
+"""
+Unit tests for bulk UTXO lookups.
+"""
+
+from decimal import Decimal
+from unittest.mock import MagicMock
+
+from app.utxo_service import UTXOService, fetch_utxos_by_address
+
+WALLET_UTXOS = [
+    {"address": "bc1qa", "amount": Decimal("0.5")},
+    {"address": "bc1qa", "amount": Decimal("0.25")},
+    {"address": "bc1qb", "amount": Decimal("1")},
+]
+
+
+def _rpc():
+    rpc = MagicMock()
+
+    def batch(calls, return_exceptions=False):
+        return [[u for u in WALLET_UTXOS if u["address"] in params[2]] for _, params in calls]
+
+    rpc.batch.side_effect = batch
+    return rpc
+
+
+class TestFetchUTXOsByAddress:
+    """Test the grouped bulk fetch."""
+
+    def test_groups_by_address(self):
+        """Test that one call returns UTXOs grouped per address, including empty ones."""
+        rpc = _rpc()
+        grouped = fetch_utxos_by_address(rpc, ["bc1qa", "bc1qb", "bc1qc", "bc1qa"])
+        assert [u["amount"] for u in grouped["bc1qa"]] == [Decimal("0.5"), Decimal("0.25")]
+        assert len(grouped["bc1qb"]) == 1
+        assert grouped["bc1qc"] == []
+        rpc.batch.assert_called_once()
+
+    def test_chunks_share_one_batch(self):
+        """Test that large address lists are split into listunspent chunks in a single batch."""
+        rpc = _rpc()
+        fetch_utxos_by_address(rpc, [f"bc1q{i}" for i in range(5)], chunk_size=2)
+        calls = rpc.batch.call_args[0][0]
+        assert [len(params[2]) for _, params in calls] == [2, 2, 1]
+        assert rpc.batch.call_count == 1
+
+    def test_empty_input_skips_node(self):
+        """Test that no addresses means no RPC."""
+        rpc = _rpc()
+        assert fetch_utxos_by_address(rpc, []) == {}
+        rpc.batch.assert_not_called()
+
+
+class TestUTXOService:
+    """Test the per-request UTXO view."""
+
+    def test_prefetch_serves_later_lookups(self):
+        """Test that lookups after a prefetch never hit the node again."""
+        rpc = _rpc()
+        svc = UTXOService(rpc)
+        svc.prefetch(["bc1qa", "bc1qb"])
+        assert svc.balance("bc1qa") == Decimal("0.75")
+        assert svc.balance("bc1qb") == Decimal("1")
+        assert rpc.batch.call_count == 1
+
+    def test_unknown_address_fetched_on_demand(self):
+        """Test that an address outside the prefetch is loaded lazily, once."""
+        rpc = _rpc()
+        svc = UTXOService(rpc)
+        assert svc.utxos("bc1qc") == []
+        assert svc.utxos("bc1qc") == []
+        assert rpc.batch.call_count == 1
@@ -0,0 +1,84 @@
+"""
+Unit tests for wallet RPC result indexes.
+"""
+
+from decimal import Decimal
+
+from app.wallet_index import GroupingsIndex, LabelIndex, indexed_label
+
+SPK = "0020" + "ab" * 32
+
+GROUPINGS = [
+    [["bc1qcheck0", Decimal("0.1"), f"{SPK} [0]"], ["bc1qcheck1", Decimal("0.2"), f"{SPK} [1]"]],
+    [["bc1qsave", Decimal("1.5"), SPK]],
+    [["bc1qunlabeled", Decimal("0.3")]],
+]
+
+
+class TestGroupingsIndex:
+    """Test address and label lookups."""
+
+    def test_balance_and_label_by_address(self):
+        """Test O(1) balance/label lookups, including label-less entries."""
+        index = GroupingsIndex(GROUPINGS)
+        assert index.balance("bc1qsave") == Decimal("1.5")
+        assert index.label("bc1qcheck1") == f"{SPK} [1]"
+        assert index.balance("bc1qunlabeled") == Decimal("0.3")
+        assert index.label("bc1qunlabeled") == ""
+        assert index.balance("bc1qmissing") == Decimal("0")
+        assert index.label("bc1qmissing") is None
+        assert len(index) == 4
+
+    def test_addresses_for_label(self):
+        """Test the exact label → addresses map."""
+        index = GroupingsIndex(GROUPINGS)
+        assert index.addresses_for_label(SPK) == ["bc1qsave"]
+        assert index.addresses_for_label("nope") == []
+
+    def test_indexed_labels_round_trip(self):
+        """Test that labels written with indexed_label are found by LabelIndex."""
+        labels = LabelIndex([indexed_label(SPK, 3)])
+        assert labels.label(SPK.upper(), 3) == f"{SPK} [3]"
+        assert labels.indexes_for_covenant(SPK) == [3]
+
+    def test_malformed_entries_are_skipped(self):
+        """Test that junk rows do not break indexing."""
+        index = GroupingsIndex([[["bc1qok", "0.5"], ["bc1qbad"]]])
+        assert index.balance("bc1qok") == Decimal("0.5")
+        assert "bc1qbad" not in index.by_address
+
+
+class TestLabelIndex:
+    """Test covenant-keyed label lookups."""
+
+    LABELS = [SPK, f"{SPK} [0]", f"{SPK} [1]", f"{SPK} [2]", f"{SPK} [3]", "other [0]", "plain"]
+
+    def test_addresses_for_covenant(self):
+        """Test that the save address and every "[i]" address are returned."""
+        index = LabelIndex(self.LABELS, GroupingsIndex(GROUPINGS))
+        assert sorted(index.addresses_for_covenant(SPK.upper())) == [
+            ("bc1qcheck0", Decimal("0.1")),
+            ("bc1qcheck1", Decimal("0.2")),
+            ("bc1qsave", Decimal("1.5")),
+        ]
+        assert index.addresses_for_covenant("0020" + "cd" * 32) == []
+
+    def test_does_not_match_other_scripts_sharing_a_prefix(self):
+        """Test that only exact "<spk>" / "<spk> [i]" labels count."""
+        groupings = GroupingsIndex([[["bc1qlonger", Decimal("9"), f"{SPK}ff [0]"]]])
+        assert LabelIndex([], groupings).addresses_for_covenant(SPK) == []
+
+    def test_indexes_and_first_unused(self):
+        """Test that labels with history are skipped when picking the next index."""
+        index = LabelIndex(self.LABELS, GroupingsIndex(GROUPINGS))
+        assert index.indexes_for_covenant(SPK) == [0, 1, 2, 3]
+        assert index.unused_indexes(SPK) == [2, 3]
+        assert index.first_unused_index(SPK) == 2
+        assert index.first_unused_index(SPK, max_scan=2) is None
+        assert index.label(SPK, 3) == f"{SPK} [3]"
+
+    def test_groupings_index_builds_label_index_once(self):
+        """Test the label index derived from a groupings result."""
+        groupings = GroupingsIndex(GROUPINGS)
+        assert groupings.label_index() is groupings.label_index()
+        assert groupings.label_index().indexes_for_covenant(SPK) == [0, 1]